@@ -0,0 +1,243 @@
+# analysis.py
+
+import hashlib
+import html
+import queue
+import re
+import threading
+from collections import deque
+from typing import Callable, Container, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from config import (
+    ANALYSIS_WORKERS,
+    ANALYSIS_QUEUE_SIZE,
+    ANALYSIS_MAX_DISCOVERED,
+    DISCOVERED_BASE,
+)
+from calibration import count_words_lines
+from dictionary import DigestSet
+from result import ScanResult
+
+# Chuỗi "đáng chú ý" trong body: tên -> regex (bytes, không phân biệt hoa thường)
+INTERESTING_PATTERNS = (
+    ("aws-key", rb"\b(?:AKIA|ASIA)[0-9A-Z]{16}\b"),
+    ("private-key", rb"-----BEGIN (?:RSA |EC |DSA |OPENSSH |PGP )?PRIVATE KEY(?: BLOCK)?-----"),
+    ("api-key", rb"""(?:api[_-]?key|secret[_-]?key|access[_-]?token|client[_-]?secret)["']?\s*[:=]\s*["']?[\w\-]{16,}"""),
+    ("jwt", rb"\beyJ[\w-]{10,}\.eyJ[\w-]{10,}\.[\w-]{10,}"),
+    (
+        "stack-trace",
+        rb"Traceback \(most recent call last\)|Exception in thread \"|\n\s+at [\w$.]+\([\w$]+\.java:\d+\)"
+        rb"|(?:Fatal error|Parse error|Warning)</b>:.{0,200} on line <b>\d+"
+        rb"|Stack trace:\s*\n\s*#0|Server Error in '/' Application|Whitelabel Error Page",
+    ),
+    (
+        "dir-listing",
+        rb"<title>Index of /|<h1>Index of /|<title>Directory listing for /|\[To Parent Directory\]",
+    ),
+)
+
+_TITLE_RE = re.compile(rb"<title[^>]*>(.*?)</title>", re.I | re.S)
+_LINK_RE = re.compile(rb"""\b(?:href|src|action)\s*=\s*["']?([^"'\s<>#]+)""", re.I)
+_SKIP_SCHEMES = ("mailto:", "javascript:", "data:", "tel:")
+TITLE_MAX_CHARS = 120
+FINDING_MAX_CHARS = 80
+
+
+def page_title(body: bytes) -> Optional[str]:
+    """
+    Nội dung thẻ <title> (đã bỏ entity HTML, gộp khoảng trắng), None nếu không có.
+    """
+    m = _TITLE_RE.search(body)
+    if not m:
+        return None
+    title = " ".join(html.unescape(m.group(1).decode("utf-8", errors="replace")).split())
+    return title[:TITLE_MAX_CHARS] or None
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def find_links(body: bytes, page_url: str, base: str) -> List[str]:
+    """
+    Link trong body (href/src/action) trỏ vào cùng target, dạng path wordlist
+    ("/admin/login.php", tương đối so với `base`), bỏ query/fragment và link tới chính trang.
+    """
+    root = urlsplit(base)
+    prefix = root.path
+    links = []
+    seen = set()
+    for m in _LINK_RE.finditer(body):
+        raw = html.unescape(m.group(1).decode("utf-8", errors="ignore"))
+        if raw.lower().startswith(_SKIP_SCHEMES):
+            continue
+        parts = urlsplit(urljoin(page_url, raw))
+        if parts.netloc != root.netloc or parts.scheme != root.scheme:
+            continue
+        path = parts.path
+        if not path.startswith(prefix) or len(path) == len(prefix):
+            continue
+        path = "/" + path[len(prefix):]
+        if path not in seen:
+            seen.add(path)
+            links.append(path)
+    page = urlsplit(page_url).path
+    return [p for p in links if prefix + p[1:] != page]
+
+
+class Analyzer:
+    """
+    Các extractor chạy trên body 1 kết quả khớp (trong thread của AnalysisPool):
+    - số từ/dòng (nếu worker chưa đếm), hash nội dung, <title>
+    - chuỗi đáng chú ý (INTERESTING_PATTERNS): key, stack trace, trang liệt kê thư mục
+    - link cùng target (khi `discover`) để đưa lại vào hàng đợi scan
+    Kết quả gắn vào `res.analysis` = {"title", "hash", "findings": {tên: đoạn khớp}, "links"}.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, bytes]] = INTERESTING_PATTERNS, discover: bool = True):
+        self.patterns = [(name, re.compile(pattern, re.I)) for name, pattern in patterns]
+        self.discover = discover
+        self.analyzed = 0
+        self.findings = 0
+        self._lock = threading.Lock()
+
+    def analyze(self, res: ScanResult, body: Optional[bytes], base: str) -> List[str]:
+        """
+        Phân tích body, trả về danh sách link tìm được (path wordlist).
+        """
+        if body is None:
+            with self._lock:
+                self.analyzed += 1
+            return []
+        if res.words is None:
+            res.words, res.lines = count_words_lines(body)
+
+        findings: Dict[str, str] = {}
+        for name, pattern in self.patterns:
+            m = pattern.search(body)
+            if m:
+                text = " ".join(m.group(0).decode("utf-8", errors="replace").split())
+                findings[name] = text[:FINDING_MAX_CHARS]
+        links = find_links(body, res.url, base) if self.discover else []
+
+        res.analysis = {
+            "title": page_title(body),
+            "hash": content_hash(body),
+            "findings": findings,
+            "links": len(links),
+        }
+        with self._lock:
+            self.analyzed += 1
+            self.findings += len(findings)
+        return links
+
+
+class LinkFeed:
+    """
+    Path mới tìm được từ link trong body của 1 target, chờ được scan (ScanTarget.next_job
+    lấy trước path của wordlist). Bỏ path đã tìm thấy trước đó hoặc có trong luồng wordlist
+    (`wordlist`: PathLookup tra theo nhu cầu, hoặc DigestSet khi --top; dùng chung,
+    chỉ đọc; None = không tra); tối đa `limit` path mỗi target.
+    Index của path tìm được bắt đầu từ DISCOVERED_BASE (ngoài dải index wordlist,
+    không ghi vào checkpoint). Gọi dưới lock job của ScanEngine.
+    """
+
+    def __init__(self, wordlist: Optional[Container[str]] = None, limit: int = ANALYSIS_MAX_DISCOVERED):
+        self.wordlist = wordlist
+        self.limit = limit
+        self.count = 0  # số path đã nhận
+        self._seen = DigestSet()
+        self._queue: deque = deque()
+
+    def add(self, paths: Iterable[str]) -> int:
+        """
+        Thêm các path chưa gặp, trả về số path mới.
+        """
+        added = 0
+        for path in paths:
+            if self.count >= self.limit:
+                break
+            # lọc link đã gặp trước: link lặp lại trên nhiều trang không phải tra wordlist lại
+            if not self._seen.add(path):
+                continue
+            if self.wordlist is None or path not in self.wordlist:
+                self._queue.append((DISCOVERED_BASE + self.count, path))
+                self.count += 1
+                added += 1
+        return added
+
+    def take(self) -> Optional[Tuple[int, str]]:
+        queue_ = self._queue
+        return queue_.popleft() if queue_ else None
+
+
+class AnalysisPool:
+    """
+    Pool thread phân tích body, tách khỏi worker mạng: worker chỉ đưa việc vào queue
+    tối đa `queue_size` phần tử rồi quay lại gửi request, `handle(job)` chạy trên
+    `workers` thread riêng. Queue đầy (phân tích chậm hơn mạng) thì worker chờ
+    (put) hoặc tự lùi lại (offer, cho engine async): số body giữ trong bộ nhớ có giới hạn.
+    """
+
+    def __init__(
+        self,
+        handle: Callable[[Tuple], None],
+        workers: int = ANALYSIS_WORKERS,
+        queue_size: int = ANALYSIS_QUEUE_SIZE,
+    ):
+        self.handle = handle
+        self.full = 0    # số lần worker mạng gặp queue đầy
+        self.errors = 0  # số job mà handle() ném exception
+        self._queue: queue.Queue = queue.Queue(max(1, queue_size))
+        self._threads = [
+            threading.Thread(target=self._run, daemon=True) for _ in range(max(1, workers))
+        ]
+        self._lock = threading.Lock()
+
+    def start(self):
+        for t in self._threads:
+            t.start()
+
+    def put(self, job: Tuple):
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.full += 1
+            self._queue.put(job)
+
+    def offer(self, job: Tuple) -> bool:
+        """
+        Như put nhưng không chờ: False nếu queue đang đầy.
+        """
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.full += 1
+            return False
+
+    def close(self):
+        """
+        Chờ phân tích hết các việc còn trong queue rồi dừng các thread.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+
+    def _run(self):
+        get = self._queue.get
+        handle = self.handle
+        while True:
+            job = get()
+            if job is None:
+                return
+            try:
+                handle(job)
+            except Exception:
+                # 1 body lỗi không được làm chết thread (worker mạng sẽ chờ queue mãi)
+                with self._lock:
+                    self.errors += 1
@@ -0,0 +1,167 @@
+# async_client.py
+
+import asyncio
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp là dependency tuỳ chọn, chỉ cần cho --engine async
+    aiohttp = None
+
+from config import (
+    STREAM_CHUNK_SIZE,
+    STREAM_DRAIN_LIMIT,
+    HEAD_FALLBACK_CODES,
+    KEEPALIVE_TIMEOUT,
+    DEFAULT_KEEP_HEADERS,
+)
+from http_client import trusted_length
+from pooling import ConnectionStats
+from result import ScanResult, HeaderPolicy, make_result
+from session import SessionTemplate
+
+
+class AsyncHttpClient:
+    """
+    Client HTTP bất đồng bộ dùng aiohttp, cùng "hợp đồng" kết quả với HttpClient.
+    Một event loop có thể giữ hàng nghìn request cùng lúc.
+    Dùng trong `async with` để mở/đóng session.
+    Các tuỳ chọn stream/max_body/head_first/body_limit giống HttpClient.
+    `stats` đếm request / kết nối mới qua trace hook của aiohttp
+    (asyncio không cho gắn TLS session nên không có resume như HttpClient).
+    Mọi coroutine dùng chung 1 session dựng từ `template` (header/cookie/auth gán
+    1 lần, 1 User-Agent ngẫu nhiên cho cả session); proxy chỉ hỗ trợ HTTP(S).
+    """
+
+    is_async = True
+
+    def __init__(
+        self,
+        timeout: int = 10,
+        limit: int = 1000,
+        stream: bool = False,
+        max_body: Optional[int] = None,
+        head_first: bool = False,
+        body_limit: int = 0,
+        hosts: int = 1,
+        keep_headers: Optional[Sequence[str]] = DEFAULT_KEEP_HEADERS,
+        template: Optional[SessionTemplate] = None,
+    ):
+        if aiohttp is None:
+            raise RuntimeError(
+                "Engine async cần thư viện aiohttp: pip install aiohttp"
+            )
+        self.template = template or SessionTemplate()
+        if self.template.socks:
+            raise RuntimeError("SOCKS proxy chỉ hỗ trợ với --engine threads")
+        self.timeout = timeout
+        self.limit = limit
+        self.stream = stream or max_body is not None
+        self.max_body = max_body
+        self.head_first = head_first
+        self.body_limit = body_limit
+        self.stats = ConnectionStats()
+        self.header_policy = HeaderPolicy(keep_headers)
+        self.session = None
+
+    async def __aenter__(self) -> "AsyncHttpClient":
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit,
+            ttl_dns_cache=300,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        stats = self.stats
+
+        async def on_request_start(session, ctx, params):
+            stats.add(requests=1)
+
+        async def on_connection_create_end(session, ctx, params):
+            stats.add(connections=1)
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        template = self.template
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[trace],
+            headers=template.worker_headers(),
+            proxy=template.proxy,
+            # -b: gửi đúng cookie đã cho, không trộn cookie server đặt trong lúc scan
+            cookie_jar=aiohttp.DummyCookieJar() if template.has_cookies else None,
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.session = None
+
+    # Các exception mạng mà fetch() có thể ném ra (để engine retry/đếm lỗi); lỗi khác
+    # (bug khi dựng kết quả, giải mã...) không bị nuốt thành lỗi mạng
+    errors = (aiohttp.ClientError, aiohttp.InvalidURL, asyncio.TimeoutError) if aiohttp else ()
+
+    async def get(self, url: str) -> Optional[ScanResult]:
+        """
+        Gửi 1 request GET, trả về ScanResult hoặc None nếu lỗi.
+        """
+        try:
+            return await self.fetch(url)
+        except self.errors:
+            return None
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> ScanResult:
+        """
+        Giống get() nhưng ném exception khi lỗi mạng thay vì trả None.
+        `headers`: header thêm vào request (vd If-None-Match khi --diff).
+        """
+        if self.head_first:
+            start = time.time()
+            async with self.session.head(url, headers=headers, allow_redirects=False) as resp:
+                length = trusted_length(resp.headers)
+            if length is not None and resp.status not in HEAD_FALLBACK_CODES:
+                return self._result(url, resp, length, start)
+
+        start = time.time()
+        async with self.session.get(url, headers=headers, allow_redirects=False) as resp:
+            if not self.stream:
+                content = await resp.read()
+                length = len(content)
+                body = content[:self.body_limit] if self.body_limit else None
+            else:
+                length, body = await self._stream_body(resp)
+
+        return self._result(url, resp, length, start, body)
+
+    async def _stream_body(self, resp) -> Tuple[int, Optional[bytes]]:
+        """
+        Đếm kích thước body mà không giữ body trong bộ nhớ
+        (chỉ giữ `body_limit` byte đầu nếu được yêu cầu).
+        """
+        limit = self.body_limit
+        length = trusted_length(resp.headers)
+        if length is not None and not limit and length > STREAM_DRAIN_LIMIT:
+            resp.close()
+            return length, None
+
+        kept = bytearray()
+        counted = 0
+        async for chunk in resp.content.iter_chunked(STREAM_CHUNK_SIZE):
+            counted += len(chunk)
+            if len(kept) < limit:
+                kept += chunk[:limit - len(kept)]
+            if length is not None:
+                if len(kept) >= limit and length - counted > STREAM_DRAIN_LIMIT:
+                    resp.close()
+                    break
+            elif self.max_body is not None and counted >= self.max_body:
+                counted = self.max_body
+                resp.close()
+                break
+
+        return (length if length is not None else counted), (bytes(kept) if limit else None)
+
+    def _result(self, url: str, resp, length: int, start: float, body: bytes = None) -> ScanResult:
+        return make_result(url, resp.status, resp.headers, length, start, self.header_policy, body)
@@ -0,0 +1,59 @@
+# benchmarks/bench_engines.py
+#
+# So sánh engine "threads" (requests) và "async" (aiohttp) trên server giả lập.
+# Ví dụ: python benchmarks/bench_engines.py -n 5000 -latency 0.2 -c 20,200,1000
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_server import MockServer  # noqa: E402
+from filters import build_filter_config  # noqa: E402
+from scanner import ScanEngine, create_http_client  # noqa: E402
+
+
+def run_once(url: str, engine: str, concurrency: int, n: int, timeout: int) -> float:
+    """
+    Scan n path với engine/concurrency cho trước, trả về số request/giây.
+    """
+    paths = [f"/p{i}" for i in range(n)]
+    cfg = build_filter_config("all", None, None, None, None)
+    client = create_http_client(engine, timeout, concurrency)
+    scan = ScanEngine(client, cfg, threads=concurrency)
+
+    start = time.perf_counter()
+    scan.run(url, paths)
+    elapsed = time.perf_counter() - start
+    return scan.done / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark threads vs async engine")
+    parser.add_argument("-n", type=int, default=2000, help="Number of requests per run")
+    parser.add_argument("-latency", type=float, default=0.2, help="Server latency in seconds")
+    parser.add_argument("-c", default="20,100,500", help="Concurrency levels, comma separated")
+    parser.add_argument("-engines", default="threads,async", help="Engines to compare")
+    parser.add_argument("-timeout", type=int, default=30)
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.c.split(",") if c.strip()]
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+
+    with MockServer(latency=args.latency) as server:
+        print(f"[+] Mock server: {server.url} (latency {args.latency * 1000:.0f}ms, n={args.n})")
+        print(f"{'engine':<8} {'conc':>6} {'req/s':>10}")
+        for engine in engines:
+            for c in levels:
+                try:
+                    rps = run_once(server.url, engine, c, args.n, args.timeout)
+                except RuntimeError as e:
+                    print(f"{engine:<8} {c:>6} {'-':>10}  ({e})")
+                    break
+                print(f"{engine:<8} {c:>6} {rps:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,527 @@
+# benchmarks/bench_scan.py
+#
+# Bộ benchmark scan trên server giả lập (benchmarks/mock_server.py).
+# Mỗi kịch bản chạy trong tiến trình con riêng, qua 2 đường:
+#   - cli: chạy `gui.py -u ...` đúng như người dùng gọi từ dòng lệnh
+#   - gui: worker của GUI (ScanEngine + queue kết quả được rút theo lô như
+#          WebPathScanApp), không cần Tk/màn hình
+#   - shard: `gui.py -u ... --workers N` (N tiến trình shard, coordinator gộp kết quả);
+#            report gộp phải giống hệt report của 1 lần scan 1 tiến trình (cùng URL, cùng thứ tự)
+# Đo req/s, CPU (user+sys), RSS đỉnh, percentile độ trễ; kết quả lưu JSON trong
+# benchmarks/results/ (tên file kèm commit) để so sánh giữa các commit.
+#
+# Ví dụ:
+#   python benchmarks/bench_scan.py
+#   python benchmarks/bench_scan.py -s baseline,storm_429 -modes cli -r 3
+#   python benchmarks/bench_scan.py --compare benchmarks/results/<file cũ>.json
+#   python benchmarks/bench_scan.py --compare A.json B.json   # chỉ so 2 file, không chạy
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import queue
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_server import MockServer  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Kịch bản cố định: n path, tham số server giả lập, tuỳ chọn scan
+# (ac = -ac, rate = -rate, adaptive = -adaptive). Cứ HIT_EVERY path có 1 path trả 200.
+HIT_EVERY = 100
+SCENARIOS = {
+    "baseline": {
+        "n": 5000,
+        "server": {},
+        "scan": {},
+    },
+    "latency": {
+        "n": 3000,
+        "server": {"latency": 0.02, "jitter": 0.03},
+        "scan": {},
+    },
+    "wildcard": {
+        "n": 3000,
+        "server": {"wildcard": True},
+        "scan": {"ac": True},
+    },
+    "large_body": {
+        "n": 1000,
+        "server": {"body_size": 512 * 1024},
+        "scan": {},
+    },
+    "storm_429": {
+        "n": 3000,
+        "server": {"storm_period": 2.0, "storm_len": 0.3, "retry_after": 1},
+        "scan": {"rate": 100000, "adaptive": True},
+    },
+    "drops": {
+        "n": 3000,
+        "server": {"drop_every": 50},
+        "scan": {},
+    },
+}
+MODES = ("cli", "gui", "shard")
+
+
+# ---------- Tiến trình con ----------
+
+def make_wordlist(folder: str, n: int) -> str:
+    path = os.path.join(folder, f"bench_{n}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(f"bench-{i:06d}\n")
+    return path
+
+
+def hit_paths(n: int) -> set:
+    return {f"/bench-{i:06d}" for i in range(0, n, HIT_EVERY)}
+
+
+def cli_command(url: str, wordlist: str, opts: Dict, out: str, workers: int = 1) -> List[str]:
+    cmd = [
+        sys.executable,
+        os.path.join(ROOT, "gui.py"),
+        "-u", url,
+        "-w", wordlist,
+        "-t", str(opts["threads"]),
+        "--engine", opts["engine"],
+        "-timeout", str(opts["timeout"]),
+        "--stats-interval", "0",
+        "--stats-json", out,
+    ]
+    if opts.get("ac"):
+        cmd.append("-ac")
+    if opts.get("rate"):
+        cmd += ["-rate", str(opts["rate"])]
+    if opts.get("adaptive"):
+        cmd.append("-adaptive")
+    if workers > 1:
+        cmd += ["--workers", str(workers)]
+    return cmd
+
+
+def gui_worker(url: str, wordlist: str, opts: Dict, out: str):
+    """
+    Đường worker của GUI, giống WebPathScanApp.start_scan: ScanTarget có
+    checkpoint, on_result=queue.put; 1 thread đóng vai main loop Tk rút queue
+    tối đa UI_DRAIN_BUDGET_MS mỗi tick, nghỉ UI_POLL_MS khi queue rỗng.
+    """
+    from calibration import Calibration
+    from checkpoint import Checkpoint, wordlist_fingerprint, default_checkpoint_path
+    from config import (
+        CALIBRATION_BODY_LIMIT,
+        DEFAULT_MATCH_CODES,
+        UI_POLL_MS,
+        UI_DRAIN_BUDGET_MS,
+    )
+    from filters import build_filter_config
+    from ratelimit import TokenBucket, AdaptiveConcurrency
+    from scanner import ScanEngine, create_http_client
+    from targets import ScanTarget
+    from wordlist_index import open_wordlist
+
+    words = open_wordlist(wordlist)
+    cfg = build_filter_config(None, None, None, None, DEFAULT_MATCH_CODES)
+    checkpoint = Checkpoint(
+        path=default_checkpoint_path(url),
+        target=url,
+        wordlist=wordlist,
+        fingerprint=wordlist_fingerprint(wordlist),
+        filters={},
+        options={"ac": opts.get("ac", False), "stride": len(words)},
+    )
+    target = ScanTarget(
+        url,
+        words,
+        checkpoint=checkpoint,
+        calibration=Calibration() if opts.get("ac") else None,
+    )
+    client = create_http_client(
+        opts["engine"],
+        opts["timeout"],
+        opts["threads"],
+        body_limit=CALIBRATION_BODY_LIMIT if opts.get("ac") else 0,
+    )
+    engine = ScanEngine(
+        client,
+        cfg,
+        threads=opts["threads"],
+        rate_limiter=TokenBucket(opts["rate"]) if opts.get("rate") else None,
+        adaptive=AdaptiveConcurrency(opts["threads"]) if opts.get("adaptive") else None,
+    )
+
+    results: "queue.Queue" = queue.Queue()
+    shown = []
+    max_backlog = 0
+
+    def worker():
+        engine.run_many([target], on_result=results.put)
+        results.put(None)
+
+    threading.Thread(target=worker, daemon=True).start()
+    finished = False
+    while not finished:
+        max_backlog = max(max_backlog, results.qsize())
+        batch = []
+        deadline = time.perf_counter() + UI_DRAIN_BUDGET_MS / 1000.0
+        try:
+            while time.perf_counter() < deadline:
+                item = results.get_nowait()
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+        except queue.Empty:
+            pass
+        shown.extend(batch)
+        time.sleep((1 if not results.empty() else UI_POLL_MS) / 1000.0)
+
+    stats = engine.stats.snapshot(target.done, len(words))
+    stats.update(found=len(shown), max_backlog=max_backlog)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(stats, f)
+
+
+def run_child(cmd: List[str], cwd: str, log: str) -> Dict:
+    """
+    Chạy 1 tiến trình con, trả về wall time, CPU (user+sys) và RSS đỉnh của nó.
+    CPU/RSS cần os.wait4 (Linux/macOS); Windows để None. Với mode shard, CPU đã
+    gồm các tiến trình shard (đã được coordinator wait), RSS là của tiến trình lớn nhất.
+    """
+    start = time.perf_counter()
+    with open(log, "w", encoding="utf-8") as out:
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=out, stderr=subprocess.STDOUT)
+        cpu = rss = None
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            cpu = usage.ru_utime + usage.ru_stime
+            # ru_maxrss: KB trên Linux, byte trên macOS
+            rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        else:
+            proc.wait()
+    wall = time.perf_counter() - start
+    if proc.returncode:
+        with open(log, encoding="utf-8", errors="replace") as f:
+            tail = f.read()[-500:]
+        raise RuntimeError(f"exit code {proc.returncode}: {tail.strip()}")
+    return {
+        "wall_s": round(wall, 3),
+        "cpu_s": round(cpu, 3) if cpu is not None else None,
+        "peak_rss_mb": round(rss, 1) if rss is not None else None,
+    }
+
+
+def report_rows(cwd: str, log: str) -> List[Tuple[str, str, str]]:
+    """
+    (status, size, URL) từng dòng của report .txt mà lần chạy CLI ghi ra (bỏ thời gian
+    phản hồi), theo thứ tự trong report.
+    """
+    with open(log, encoding="utf-8", errors="replace") as f:
+        saved = re.search(r"\[\+\] Report saved to (.+)", f.read())
+    if not saved:
+        return []
+    with open(os.path.join(cwd, saved.group(1).strip()), encoding="utf-8") as f:
+        return [
+            (m.group(1), m.group(2), m.group(3))
+            for m in (re.match(r"\[(\d+)\] (\d+)B \S+ (\S+)", line) for line in f)
+            if m
+        ]
+
+
+def run_scenario(name: str, mode: str, opts: Dict) -> Dict:
+    scenario = SCENARIOS[name]
+    n = scenario["n"]
+    opts = dict(opts, **scenario["scan"])
+    with tempfile.TemporaryDirectory(prefix="kingsearch-bench-") as tmp, MockServer(
+        hits=hit_paths(n), seed=opts["seed"], **scenario["server"]
+    ) as server:
+        wordlist = make_wordlist(tmp, n)
+        stats_file = os.path.join(tmp, "stats.json")
+        log = os.path.join(tmp, "output.log")
+        if mode == "cli":
+            cmd = cli_command(server.url, wordlist, opts, stats_file)
+        elif mode == "shard":
+            cmd = cli_command(server.url, wordlist, opts, stats_file, workers=opts["workers"])
+        else:
+            cmd = [
+                sys.executable, os.path.abspath(__file__),
+                "--gui-worker", json.dumps(
+                    {"url": server.url, "wordlist": wordlist, "opts": opts, "out": stats_file}
+                ),
+            ]
+        usage = run_child(cmd, tmp, log)
+
+        with open(stats_file, encoding="utf-8") as f:
+            stats = json.load(f)
+        if mode != "gui":
+            with open(log, encoding="utf-8", errors="replace") as f:
+                found = re.search(r"\[\+\] Found (\d+) matching paths", f.read())
+            stats["found"] = int(found.group(1)) if found else None
+        server_stats = {
+            "requests": server.requests,
+            "throttled": server.throttled,
+            "dropped": server.dropped,
+        }
+        if mode == "shard":
+            # chạy lại bằng 1 tiến trình (không tính vào số đo) và so report gộp với nó
+            single = os.path.join(tmp, "single")
+            os.makedirs(single)
+            single_log = os.path.join(single, "output.log")
+            run_child(
+                cli_command(server.url, wordlist, opts, os.path.join(single, "stats.json")),
+                single,
+                single_log,
+            )
+            expected = report_rows(single, single_log)
+            stats["same_as_single"] = bool(expected) and report_rows(tmp, log) == expected
+
+    record = {
+        "scenario": name,
+        "mode": mode,
+        "n": n,
+        "req_per_s": stats["avg_req_per_s"],
+        "requests": stats["requests"],
+        "scan_s": stats["elapsed_s"],
+        "latency_ms": stats["latency_ms"],
+        "errors": stats["errors"],
+        "error_rate": stats["error_rate"],
+        "found": stats["found"],
+        "expected": len(hit_paths(n)),
+        "server": server_stats,
+    }
+    record.update(usage)
+    if "max_backlog" in stats:
+        record["max_backlog"] = stats["max_backlog"]
+    if "same_as_single" in stats:
+        record["same_as_single"] = stats["same_as_single"]
+    return record
+
+
+def problems(report: Dict) -> List[str]:
+    """
+    Kết quả sai (không phải số đo chậm đi): số path tìm thấy khác số path server giả lập trả 200,
+    report gộp của mode shard khác scan 1 tiến trình.
+    """
+    found = []
+    for r in report["results"]:
+        if r["found"] != r["expected"]:
+            found.append(f"{r['scenario']}/{r['mode']}: found {_fmt(r['found'], 'd')}, expected {r['expected']}")
+        if r.get("same_as_single") is False:
+            found.append(f"{r['scenario']}/{r['mode']}: merged report differs from a single-process scan")
+    return found
+
+
+def median_run(runs: List[Dict]) -> Dict:
+    runs = sorted(runs, key=lambda r: r["req_per_s"])
+    result = dict(runs[len(runs) // 2])
+    result["runs"] = len(runs)
+    result["req_per_s_all"] = [r["req_per_s"] for r in runs]
+    return result
+
+
+# ---------- Lưu & so sánh ----------
+
+def git_commit() -> Dict:
+    def git(*args) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    try:
+        return {
+            "commit": git("rev-parse", "--short", "HEAD"),
+            "subject": git("log", "-1", "--format=%s"),
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        }
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "subject": None, "dirty": None}
+
+
+def save_results(report: Dict, folder: str) -> str:
+    os.makedirs(folder, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    commit = report["git"]["commit"] or "nogit"
+    if report["git"]["dirty"]:
+        commit += "-dirty"
+    path = os.path.join(folder, f"bench_{stamp}_{commit}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def _fmt(value, spec: str = ".1f") -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def print_table(report: Dict):
+    print(
+        f"{'scenario':<11} {'mode':<4} {'req/s':>9} {'p50':>7} {'p95':>7} {'p99':>7} "
+        f"{'err%':>6} {'cpu s':>7} {'rss MB':>7} {'found':>9}"
+    )
+    for r in report["results"]:
+        lat = r["latency_ms"]
+        print(
+            f"{r['scenario']:<11} {r['mode']:<4} {_fmt(r['req_per_s']):>9} "
+            f"{_fmt(lat['p50']):>7} {_fmt(lat['p95']):>7} {_fmt(lat['p99']):>7} "
+            f"{r['error_rate'] * 100:>6.2f} {_fmt(r['cpu_s'], '.2f'):>7} "
+            f"{_fmt(r['peak_rss_mb']):>7} {_fmt(r['found'], 'd') + '/' + str(r['expected']):>9}"
+        )
+
+
+def _delta(old, new) -> str:
+    if old is None or new is None:
+        return "-"
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def print_compare(old: Dict, new: Dict):
+    """
+    So sánh 2 lần chạy theo từng (kịch bản, mode): req/s, p95, CPU, RSS.
+    """
+    def label(report):
+        git = report.get("git", {})
+        return f"{git.get('commit')}{'-dirty' if git.get('dirty') else ''}"
+
+    print(f"[+] Compare {label(old)} -> {label(new)}")
+    print(
+        f"{'scenario':<11} {'mode':<4} {'req/s':>21} {'p95 ms':>19} "
+        f"{'cpu s':>17} {'rss MB':>17}"
+    )
+    before = {(r["scenario"], r["mode"]): r for r in old["results"]}
+    for r in new["results"]:
+        o = before.get((r["scenario"], r["mode"]))
+        if o is None:
+            continue
+        cols = []
+        for get in (
+            lambda x: x["req_per_s"],
+            lambda x: x["latency_ms"]["p95"],
+            lambda x: x["cpu_s"],
+            lambda x: x["peak_rss_mb"],
+        ):
+            a, b = get(o), get(r)
+            cols.append(f"{_fmt(a)}->{_fmt(b)} {_delta(a, b):>7}")
+        print(
+            f"{r['scenario']:<11} {r['mode']:<4} {cols[0]:>21} {cols[1]:>19} "
+            f"{cols[2]:>17} {cols[3]:>17}"
+        )
+
+
+def load_report(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kingsearch scan benchmark suite")
+    parser.add_argument(
+        "-s", "--scenarios",
+        default=",".join(SCENARIOS),
+        help=f"Scenarios to run, comma separated (default: all = {','.join(SCENARIOS)})",
+    )
+    parser.add_argument("-modes", default=",".join(MODES), help="Paths to measure: cli,gui,shard")
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="Runs per scenario (median by req/s is kept)")
+    parser.add_argument("-t", "--threads", type=int, default=20)
+    parser.add_argument("--engine", default="threads", choices=("threads", "async"))
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes for the shard mode")
+    parser.add_argument("-timeout", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1, help="Seed for server-side jitter")
+    parser.add_argument("--save-dir", default=RESULTS_DIR, help="Folder for result JSON files")
+    parser.add_argument("--no-save", action="store_true", help="Do not write a result file")
+    parser.add_argument(
+        "--compare",
+        nargs="+",
+        metavar="FILE",
+        help="Compare with a previous result file; with 2 files only compare them",
+    )
+    parser.add_argument("--gui-worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.gui_worker:
+        job = json.loads(args.gui_worker)
+        gui_worker(job["url"], job["wordlist"], job["opts"], job["out"])
+        return
+
+    if args.compare and len(args.compare) == 2:
+        print_compare(load_report(args.compare[0]), load_report(args.compare[1]))
+        return
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r} (choose from {', '.join(SCENARIOS)})")
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"unknown mode {mode!r} (choose from {', '.join(MODES)})")
+
+    opts = {
+        "threads": args.threads,
+        "engine": args.engine,
+        "timeout": args.timeout,
+        "seed": args.seed,
+        "workers": args.workers,
+    }
+    report = {
+        "git": git_commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "options": dict(opts, repeat=args.repeat),
+        "results": [],
+    }
+    print(
+        f"[+] Commit {report['git']['commit']}{' (dirty)' if report['git']['dirty'] else ''}, "
+        f"engine {args.engine}, {args.threads} threads, {args.repeat} run(s) per scenario"
+    )
+    for name in scenarios:
+        for mode in modes:
+            runs = []
+            for _ in range(max(1, args.repeat)):
+                try:
+                    runs.append(run_scenario(name, mode, opts))
+                except RuntimeError as e:
+                    print(f"[!] {name}/{mode} failed: {e}")
+                    break
+            if runs:
+                result = median_run(runs)
+                report["results"].append(result)
+                print(
+                    f"[*] {name}/{mode}: {result['req_per_s']:.1f} req/s, "
+                    f"p95 {_fmt(result['latency_ms']['p95'])} ms, cpu {_fmt(result['cpu_s'], '.2f')} s"
+                )
+
+    print()
+    print_table(report)
+    if not args.no_save:
+        print(f"\n[+] Results saved to {save_results(report, args.save_dir)}")
+    if args.compare:
+        print()
+        print_compare(load_report(args.compare[0]), report)
+
+    wrong = problems(report)
+    if wrong:
+        print()
+        for line in wrong:
+            print(f"[!] {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_session.py
+#
+# Đo chi phí mỗi request phía client (engine threads, 1 thread, server cục bộ không trễ)
+# khi bật các tuỳ chọn session (-H, -b, --auth, --random-agent) so với không bật:
+# template gán sẵn vào session của worker thì vòng lặp nóng không được chậm hơn.
+# Ví dụ: python benchmarks/bench_session.py -n 2000 -r 5
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_server import MockServer  # noqa: E402
+from http_client import HttpClient  # noqa: E402
+from session import build_session_template  # noqa: E402
+
+SESSION_OPTIONS = dict(
+    headers=["X-Scan-Token: 0123456789abcdef", "Accept-Language: en-US"],
+    cookies="session=abcdef0123456789; theme=dark",
+    auth="admin:secret",
+    random_agent=True,
+)
+
+
+def per_request(url: str, client: HttpClient, n: int, headers: Optional[Dict[str, str]] = None) -> float:
+    """
+    Gửi n request tuần tự, trả về thời gian trung bình (µs) mỗi request.
+    """
+    fetch = client.fetch
+    fetch(url + "/warmup", headers)
+    start = time.perf_counter()
+    for i in range(n):
+        fetch(f"{url}/p{i}", headers)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def legacy_client() -> HttpClient:
+    # cách cũ: requests đọc lại proxy/.netrc/CA bundle từ môi trường cho từng request
+    client = HttpClient()
+    client.session.trust_env = True
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-request client overhead of session options")
+    parser.add_argument("-n", type=int, default=2000, help="Requests per run")
+    parser.add_argument("-r", type=int, default=5, help="Runs per variant")
+    args = parser.parse_args()
+
+    template = build_session_template(**SESSION_OPTIONS)
+    variants: Dict[str, Callable[[str, int], float]] = {
+        "no options": lambda url, n: per_request(url, HttpClient(), n),
+        "session template": lambda url, n: per_request(url, HttpClient(template=template), n),
+        "per-request headers": lambda url, n: per_request(url, HttpClient(), n, template.worker_headers()),
+        "trust_env per request": lambda url, n: per_request(url, legacy_client(), n),
+    }
+
+    with MockServer() as server:
+        print(f"[+] Mock server: {server.url} (n={args.n}, runs={args.r})")
+        print(f"{'variant':<22} {'min us':>8} {'median us':>10} {'vs base':>8}")
+        base = None
+        for name, run in variants.items():
+            times: List[float] = [run(server.url, max(1, args.n)) for _ in range(max(1, args.r))]
+            # so sánh theo min: ít bị nhiễu bởi tải khác trên máy hơn median
+            best = min(times)
+            base = base or best
+            print(f"{name:<22} {best:>8.1f} {statistics.median(times):>10.1f} {(best / base - 1) * 100:>+7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_startup.py
+#
+# Đo thời gian khởi động lạnh của CLI (mỗi lần là 1 tiến trình Python mới) và
+# kiểm tra đường CLI không nạp Tkinter/matplotlib.
+# Ví dụ: python benchmarks/bench_startup.py -n 20 --budget 80
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module GUI không được xuất hiện khi chạy CLI
+GUI_MODULES = ("tkinter", "_tkinter", "matplotlib")
+
+COMMANDS = {
+    "python": [sys.executable, "-c", "pass"],
+    "import cli": [sys.executable, "-c", "import cli"],
+    "gui.py -h": [sys.executable, "gui.py", "-h"],
+    "import gui_app": [sys.executable, "-c", "import gui_app"],
+}
+
+
+def time_command(cmd: List[str], n: int) -> List[float]:
+    """
+    Chạy `cmd` n lần, trả về thời gian (ms) của từng lần.
+    """
+    times = []
+    for _ in range(n):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000.0)
+    return times
+
+
+def gui_modules_loaded() -> List[str]:
+    """
+    Module GUI bị nạp khi import cli + scanner và tạo client (đường CLI).
+    """
+    code = (
+        "import sys, cli, scanner; scanner.create_http_client('threads', 5, 1); "
+        f"print(' '.join(sorted(m for m in sys.modules if m.split('.')[0] in {GUI_MODULES!r})))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return out.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Kingsearch CLI cold start time")
+    parser.add_argument("-n", type=int, default=10, help="Runs per command")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=100.0,
+        help="Max median ms that 'gui.py -h' may add on top of a bare interpreter (exit 1 if exceeded)",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'command':<16} {'min ms':>8} {'median ms':>10} {'max ms':>8}")
+    for name, cmd in COMMANDS.items():
+        try:
+            times = time_command(cmd, max(1, args.n))
+        except subprocess.CalledProcessError:
+            print(f"{name:<16} {'-':>8} {'-':>10} {'-':>8}  (failed)")
+            continue
+        results[name] = statistics.median(times)
+        print(f"{name:<16} {min(times):>8.1f} {results[name]:>10.1f} {max(times):>8.1f}")
+
+    ok = True
+    loaded = gui_modules_loaded()
+    if loaded:
+        print(f"\n[!] CLI path imports GUI modules: {', '.join(loaded)}")
+        ok = False
+
+    overhead = results["gui.py -h"] - results["python"]
+    print(f"\n[+] CLI start overhead: {overhead:.1f} ms over a bare interpreter (budget {args.budget:.0f} ms)")
+    if overhead > args.budget:
+        print("[!] CLI start is over budget")
+        ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# benchmarks/mock_server.py
+
+import asyncio
+import random
+import threading
+import time
+from typing import Optional
+
+
+class MockServer:
+    """
+    HTTP/1.1 server giả lập (asyncio, keep-alive) chạy trong thread riêng,
+    dùng làm target cục bộ cho benchmark.
+    - latency: độ trễ (giây) trước mỗi response, cộng thêm ngẫu nhiên [0, jitter)
+    - hits: tập path trả 200, còn lại trả 404
+    - wildcard: mọi path không thuộc `hits` cũng trả 200 (body chứa path, kiểu soft-404)
+    - body_size: độn body tới ít nhất body_size byte (response lớn)
+    - storm_period / storm_len: cứ mỗi storm_period giây thì trong storm_len giây đầu
+      mọi request trả 429 kèm `Retry-After: retry_after` (bão rate limit)
+    - drop_every: cứ mỗi drop_every request thì đóng kết nối không trả response
+    Jitter dùng `seed` cố định, drop tính theo thứ tự request, storm theo thời
+    gian kể từ lúc server chạy => chạy lại cho cùng kịch bản.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        hits: Optional[set] = None,
+        jitter: float = 0.0,
+        wildcard: bool = False,
+        body_size: int = 0,
+        storm_period: float = 0.0,
+        storm_len: float = 0.0,
+        retry_after: int = 1,
+        drop_every: int = 0,
+        seed: int = 0,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.hits = hits or set()
+        self.jitter = jitter
+        self.wildcard = wildcard
+        self.body_size = body_size
+        self.storm_period = storm_period
+        self.storm_len = storm_len
+        self.retry_after = retry_after
+        self.drop_every = drop_every
+        self._random = random.Random(seed)
+        self.started = time.monotonic()
+
+        # số liệu phía server (đọc sau khi benchmark xong)
+        self.requests = 0
+        self.throttled = 0
+        self.dropped = 0
+
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(5)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port, backlog=4096)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.started = time.monotonic()
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.close()
+
+    async def _shutdown(self):
+        # đóng server và huỷ các kết nối keep-alive còn treo
+        self._server.close()
+        current = asyncio.current_task()
+        tasks = [t for t in asyncio.all_tasks() if t is not current]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop.call_soon(self._loop.stop)
+
+    def respond(self, path: str, seq: int = 0):
+        """
+        Trả về (status, headers, body) cho request thứ `seq` tới `path`,
+        hoặc None nếu phải ngắt kết nối.
+        """
+        if self.drop_every and seq % self.drop_every == self.drop_every - 1:
+            self.dropped += 1
+            return None
+        uptime = time.monotonic() - self.started
+        if self.storm_period and uptime % self.storm_period < self.storm_len:
+            self.throttled += 1
+            return 429, {"Retry-After": str(self.retry_after)}, b"too many requests"
+
+        if path in self.hits:
+            status, body = 200, b"found " + path.encode()
+        elif self.wildcard:
+            status, body = 200, b"<html><body>Welcome! Page " + path.encode() + b" is here.</body></html>"
+        else:
+            status, body = 404, b"not found"
+        if len(body) < self.body_size:
+            body += b"\n" + b"x" * (self.body_size - len(body) - 1)
+        return status, {}, body
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                # bỏ qua header của request
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+
+                parts = request_line.decode("latin-1").split()
+                method = parts[0] if parts else "GET"
+                path = parts[1] if len(parts) > 1 else "/"
+
+                seq = self.requests
+                self.requests += 1
+                delay = self.latency
+                if self.jitter:
+                    delay += self._random.random() * self.jitter
+                if delay:
+                    await asyncio.sleep(delay)
+
+                response = self.respond(path, seq)
+                if response is None:
+                    break
+                status, headers, body = response
+                head = [f"HTTP/1.1 {status} X", f"Content-Length: {len(body)}"]
+                head += [f"{k}: {v}" for k, v in headers.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,185 @@
+# calibration.py
+
+import hashlib
+import re
+import secrets
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from config import (
+    CALIBRATION_PROBES,
+    CALIBRATION_SIZE_TOLERANCE,
+    CALIBRATION_SIZE_SLACK,
+    CALIBRATION_SIMHASH_DISTANCE,
+)
+from result import ScanResult
+
+_TOKEN_RE = re.compile(rb"[a-z0-9_]+")
+_DIGITS_RE = re.compile(rb"[0-9]+")
+# Giới hạn số token khác nhau đưa vào simhash để chi phí mỗi response có trần
+_SIMHASH_MAX_TOKENS = 2000
+
+
+def count_words_lines(body: bytes) -> Tuple[int, int]:
+    """
+    Số từ (tách theo khoảng trắng) và số dòng của body.
+    """
+    if not body:
+        return 0, 0
+    return len(body.split()), body.count(b"\n") + 1
+
+
+def simhash(body: bytes, echo: Optional[str] = None) -> int:
+    """
+    Simhash 64-bit của body đã chuẩn hoá: chữ thường, bỏ path được "vọng lại"
+    trong trang (soft-404 hay in lại URL), gộp mọi dãy số thành "0".
+    Hai trang gần giống nhau cho simhash chỉ khác vài bit.
+    """
+    text = body.lower()
+    if echo:
+        text = text.replace(echo.lower().encode("utf-8", "ignore"), b" ")
+    text = _DIGITS_RE.sub(b"0", text)
+
+    tokens = Counter(_TOKEN_RE.findall(text))
+    if not tokens:
+        return 0
+
+    weights = [0] * 64
+    for token, count in tokens.most_common(_SIMHASH_MAX_TOKENS):
+        h = int.from_bytes(hashlib.blake2b(token, digest_size=8).digest(), "little")
+        for bit in range(64):
+            if h >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    value = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            value |= 1 << bit
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _normalize_location(location: Optional[str], token: str) -> Optional[str]:
+    if not location:
+        return None
+    return location.replace(token, "{r}")
+
+
+@dataclass
+class Baseline:
+    """
+    Fingerprint của các response "không tồn tại" có cùng status code.
+    """
+    status: int
+    min_size: int
+    max_size: int
+    min_words: int = 0
+    max_words: int = 0
+    min_lines: int = 0
+    max_lines: int = 0
+    simhashes: List[int] = field(default_factory=list)
+    locations: set = field(default_factory=set)
+
+    def add(self, length: int, words: int, lines: int, sh: Optional[int], location):
+        self.min_size = min(self.min_size, length)
+        self.max_size = max(self.max_size, length)
+        self.min_words = min(self.min_words, words)
+        self.max_words = max(self.max_words, words)
+        self.min_lines = min(self.min_lines, lines)
+        self.max_lines = max(self.max_lines, lines)
+        if sh is not None and sh not in self.simhashes:
+            self.simhashes.append(sh)
+        if location:
+            self.locations.add(location)
+
+
+class Calibration:
+    """
+    Auto-calibration chống wildcard / soft-404:
+    1. probes(): sinh vài path ngẫu nhiên chắc chắn không tồn tại
+    2. learn(): ghi fingerprint (status, size, số từ/dòng, simhash, Location)
+    3. is_wildcard(): so sánh rẻ trước (status -> Location -> size -> từ/dòng),
+       chỉ tính simhash khi các phép so sánh rẻ chưa quyết định được.
+       Ngoài redirect, chỉ coi là wildcard khi cả size lẫn nội dung (số từ/dòng hoặc
+       simhash) đều giống: trang thật có size gần trang soft-404 không bị ẩn.
+    """
+
+    def __init__(self):
+        self.baselines: Dict[int, Baseline] = {}
+        self.filtered = 0
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.baselines)
+
+    def probes(self) -> List[Tuple[str, str]]:
+        """
+        Danh sách (path, token ngẫu nhiên) dùng để dò.
+        """
+        result = []
+        for pattern in CALIBRATION_PROBES:
+            token = secrets.token_hex(6)
+            result.append(("/" + pattern.format(r=token), token))
+        return result
+
+    def learn(self, res: ScanResult, body: Optional[bytes], token: str):
+        words, lines = count_words_lines(body) if body is not None else (0, 0)
+        sh = simhash(body, token) if body else None
+        location = _normalize_location(res.location, token)
+
+        status = res.status_code
+        base = self.baselines.get(status)
+        if base is None:
+            base = self.baselines[status] = Baseline(
+                status, res.length, res.length, words, words, lines, lines
+            )
+        base.add(res.length, words, lines, sh, location)
+
+    def is_wildcard(self, res: ScanResult, body: Optional[bytes], path: str) -> bool:
+        """
+        Response có khớp fingerprint "không tồn tại" không.
+        """
+        base = self.baselines.get(res.status_code)
+        if base is None:
+            return False
+
+        # redirect: chỉ Location mới phân biệt được (body thường rỗng)
+        location = res.location
+        if location or base.locations:
+            name = path.strip("/").rpartition("/")[2]
+            normalized = location.replace(name, "{r}") if location and name else location
+            return normalized in base.locations
+
+        length = res.length
+        # độ lệch cho path được in lại trong trang, nhỏ lại với baseline nhỏ
+        tolerance = max(
+            int(base.max_size * CALIBRATION_SIZE_TOLERANCE),
+            min(CALIBRATION_SIZE_SLACK, base.min_size // 4),
+        )
+        if not base.min_size - tolerance <= length <= base.max_size + tolerance:
+            return False
+        if body is None:
+            # client không giữ body: size là dấu hiệu duy nhất
+            return True
+
+        words, lines = res.words, res.lines
+        if words is None:
+            words, lines = count_words_lines(body)
+        if (
+            base.min_words <= words <= base.max_words
+            and base.min_lines <= lines <= base.max_lines
+        ):
+            return True
+
+        if not base.simhashes:
+            return False
+        sh = simhash(body, path.strip("/"))
+        return any(
+            hamming(sh, known) <= CALIBRATION_SIMHASH_DISTANCE for known in base.simhashes
+        )
@@ -0,0 +1,191 @@
+# checkpoint.py
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from config import CHECKPOINT_DIR, CHECKPOINT_INTERVAL
+from result import ScanResult
+
+CHECKPOINT_VERSION = 1
+
+
+def wordlist_fingerprint(path: str) -> str:
+    """
+    Dấu vân tay của file wordlist (size + sha1 nội dung), để khi resume
+    chắc chắn index trong checkpoint vẫn trỏ đúng path.
+    """
+    h = hashlib.sha1()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+            size += len(chunk)
+    return f"{size}:{h.hexdigest()}"
+
+
+def default_checkpoint_path(target_url: str) -> str:
+    safe_url = target_url.replace("://", "_").replace("/", "_").replace(":", "_")
+    return os.path.join(CHECKPOINT_DIR, f"{safe_url}.ckpt.json")
+
+
+class Checkpoint:
+    """
+    Trạng thái scan có thể resume:
+    - target, wordlist (+ fingerprint), tham số filter dạng chuỗi
+    - options: các tuỳ chọn làm thay đổi thứ tự/tập path (vd dedup)
+    - bitmap các index đã test xong (lỗi mạng không tính là xong)
+    - các kết quả khớp filter tới thời điểm lưu
+    - các thư mục con tìm được khi scan đệ quy (theo thứ tự, quyết định index job)
+    File được ghi nguyên tử (ghi file tạm rồi os.replace) mỗi `interval` giây,
+    trên thread nền (maybe_save) để không giữ lock của engine trong lúc nén/ghi.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        target: str,
+        wordlist: str,
+        fingerprint: str,
+        filters: Dict[str, Optional[str]],
+        options: Optional[Dict] = None,
+        interval: float = CHECKPOINT_INTERVAL,
+    ):
+        self.path = path
+        self.target = target
+        self.wordlist = wordlist
+        self.fingerprint = fingerprint
+        self.filters = filters
+        self.options = options or {}
+        self.interval = interval
+
+        self.done = bytearray()
+        self.done_count = 0
+        self.matches: List[Tuple[int, ScanResult]] = []
+        self.directories: List[str] = []
+        self._last_save = time.monotonic()
+        self._writer: Optional[threading.Thread] = None
+
+    # ---------- bitmap ----------
+
+    def is_done(self, idx: int) -> bool:
+        byte = idx >> 3
+        return byte < len(self.done) and bool(self.done[byte] & (1 << (idx & 7)))
+
+    def mark(self, idx: int, match: Optional[ScanResult] = None):
+        """
+        Đánh dấu index đã test xong (kèm kết quả nếu khớp filter).
+        """
+        byte = idx >> 3
+        if byte >= len(self.done):
+            self.done.extend(b"\0" * (byte + 1 - len(self.done)))
+        if not self.done[byte] & (1 << (idx & 7)):
+            self.done[byte] |= 1 << (idx & 7)
+            self.done_count += 1
+        if match is not None:
+            self.matches.append((idx, match))
+
+    # ---------- lưu / đọc ----------
+
+    def snapshot(self) -> Tuple[int, bytes, List[Tuple[int, ScanResult]], List[str]]:
+        """
+        Bản chụp phần thay đổi trong lúc scan (copy bitmap + danh sách), đủ rẻ để
+        gọi khi đang giữ lock kết quả của engine.
+        """
+        return self.done_count, bytes(self.done), list(self.matches), list(self.directories)
+
+    def maybe_save(self):
+        """
+        Tới hạn `interval` thì lưu: chỉ chụp trạng thái ở thread gọi (đang giữ lock
+        kết quả của engine), nén bitmap / JSON / ghi file chạy trên thread riêng.
+        Lần ghi trước chưa xong thì bỏ qua, lần sau ghi bù.
+        """
+        if time.monotonic() - self._last_save < self.interval:
+            return
+        if self._writer is not None and self._writer.is_alive():
+            return
+        self._last_save = time.monotonic()
+        self._writer = threading.Thread(target=self._write, args=(self.snapshot(),), daemon=True)
+        self._writer.start()
+
+    def save(self):
+        """
+        Lưu ngay (chờ lần ghi nền đang chạy xong trước).
+        """
+        if self._writer is not None:
+            self._writer.join()
+        self._last_save = time.monotonic()
+        self._write(self.snapshot())
+
+    def _write(self, snapshot: Tuple[int, bytes, List[Tuple[int, ScanResult]], List[str]]):
+        done_count, done, matches, directories = snapshot
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "target": self.target,
+            "wordlist": self.wordlist,
+            "fingerprint": self.fingerprint,
+            "filters": self.filters,
+            "options": self.options,
+            "done_count": done_count,
+            "done": base64.b64encode(zlib.compress(done)).decode("ascii"),
+            "matches": [[idx, res.to_dict()] for idx, res in matches],
+            "directories": directories,
+            "saved_at": time.time(),
+        }
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def remove(self):
+        """
+        Xoá file checkpoint (scan đã chạy hết, không cần resume nữa).
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        """
+        Đọc checkpoint từ file. Ném ValueError nếu file không hợp lệ.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                state = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid checkpoint file: {e}") from e
+
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {state.get('version')}")
+
+        ckpt = cls(
+            path=path,
+            target=state["target"],
+            wordlist=state["wordlist"],
+            fingerprint=state["fingerprint"],
+            filters=state["filters"],
+            options=state.get("options"),
+        )
+        ckpt.done = bytearray(zlib.decompress(base64.b64decode(state["done"])))
+        ckpt.done_count = state["done_count"]
+        ckpt.matches = [(idx, ScanResult.from_dict(res)) for idx, res in state["matches"]]
+        ckpt.directories = state.get("directories", [])
+        return ckpt
+
+    def verify_wordlist(self) -> bool:
+        """
+        Wordlist hiện tại còn giống lúc tạo checkpoint không.
+        """
+        try:
+            return wordlist_fingerprint(self.wordlist) == self.fingerprint
+        except OSError:
+            return False
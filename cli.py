@@ -0,0 +1,1166 @@
+# cli.py
+
+import argparse
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from config import (
+    DEFAULT_TIMEOUT,
+    DEFAULT_THREADS,
+    DEFAULT_ENGINE,
+    ENGINES,
+    DEFAULT_STREAM,
+    DEFAULT_MAX_BODY,
+    DEFAULT_RATE,
+    DEFAULT_RETRIES,
+    DEFAULT_RECURSION_DEPTH,
+    DEFAULT_PER_HOST,
+    DEFAULT_HTTP2,
+    DEFAULT_STATS_INTERVAL,
+    DEFAULT_KEEP_HEADERS,
+    CALIBRATION_BODY_LIMIT,
+    DEFAULT_MATCH_CODES,
+    DEFAULT_MATCH_SIZES,
+    DEFAULT_FILTER_CODES,
+    DEFAULT_FILTER_SIZES,
+    DEFAULT_WORDLIST,
+    DEFAULT_STORE,
+    DIFF_BODY_LIMIT,
+    HISTORY_MAX_HITS,
+    HISTORY_MAX_HIT_RATIO,
+    ANALYSIS_WORKERS,
+    ANALYSIS_BODY_LIMIT,
+    DEFAULT_ASYNC_CONCURRENCY,
+    DEDUP_MODES,
+    ORDER_MODES,
+    CASE_MODES,
+    OUTPUT_FORMATS,
+)
+
+if TYPE_CHECKING:
+    # chỉ dùng cho type hint: scanner (nạp requests), shard, ... được import trong
+    # run_cli sau parse_args, nên -h và lỗi tham số không tốn thời gian nạp chúng
+    from scanner import ScanEngine
+    from shard import ShardCoordinator, ShardEmitter
+    from targets import ScanTarget
+
+
+# ====================== PHẦN CLI ======================
+
+def run_cli() -> bool:
+    parser = argparse.ArgumentParser(
+        description="Kingsearch - Web Path Scanner"
+    )
+
+    # HTTP OPTIONS
+    parser.add_argument(
+        "-u",
+        help="URL target",
+    )
+    parser.add_argument(
+        "-l",
+        help="File with target URLs (one per line), scanned together on one worker pool",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=DEFAULT_PER_HOST,
+        help=(
+            "Maximum concurrent requests per host when scanning several targets. "
+            f"(default: {DEFAULT_PER_HOST})"
+        ),
+    )
+    parser.add_argument(
+        "-timeout",
+        type=int,
+        default=DEFAULT_TIMEOUT,
+        help=f"HTTP request timeout in seconds. (default: {DEFAULT_TIMEOUT})",
+    )
+    parser.add_argument(
+        "-t",
+        "--threads",
+        type=int,
+        help=(
+            "Number of concurrent workers (threads, or in-flight requests "
+            f"with --engine async). (default: {DEFAULT_THREADS} / "
+            f"{DEFAULT_ASYNC_CONCURRENCY})"
+        ),
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=DEFAULT_ENGINE,
+        help=f"HTTP engine: threads (requests) or async (aiohttp). (default: {DEFAULT_ENGINE})",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=DEFAULT_STREAM,
+        help="Count response bodies in chunks instead of buffering them in memory",
+    )
+    parser.add_argument(
+        "--max-body",
+        type=int,
+        default=DEFAULT_MAX_BODY,
+        help="Read at most this many bytes per response body (implies --stream)",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        default=DEFAULT_HTTP2,
+        help='Use HTTP/2 when the target supports it (threads engine, needs "httpx[http2]")',
+    )
+    parser.add_argument(
+        "--head",
+        action="store_true",
+        help="Probe with HEAD first, fall back to GET when HEAD gives no usable size",
+    )
+    parser.add_argument(
+        "-rate",
+        type=float,
+        default=DEFAULT_RATE,
+        help="Maximum requests per second, 0 for unlimited. (default: 0)",
+    )
+    parser.add_argument(
+        "-adaptive",
+        action="store_true",
+        help=(
+            "Adapt concurrency (up to -t) to target latency and 429/503/error "
+            "rates, honoring Retry-After"
+        ),
+    )
+
+    parser.add_argument(
+        "-retries",
+        help=(
+            'Retries per error class (timeout, reset, refused, dns, tls, other, and '
+            'throttled for 429/503), e.g. "3" or "timeout=3,throttled=5,dns=0". '
+            f"(default: {DEFAULT_RETRIES})"
+        ),
+    )
+
+    parser.add_argument(
+        "-ac",
+        action="store_true",
+        help=(
+            "Auto-calibrate: probe random paths first and filter responses that "
+            "look like the wildcard/soft-404 baseline"
+        ),
+    )
+
+    parser.add_argument(
+        "-recursion",
+        action="store_true",
+        help="Recursively scan directories found during the scan (301 to path/ or path/ hits)",
+    )
+    parser.add_argument(
+        "-depth",
+        type=int,
+        default=DEFAULT_RECURSION_DEPTH,
+        help=f"Maximum recursion depth for -recursion. (default: {DEFAULT_RECURSION_DEPTH})",
+    )
+
+    parser.add_argument(
+        "-H",
+        dest="headers",
+        action="append",
+        metavar="HEADER",
+        help='Extra request header "Name: value", can be repeated',
+    )
+    parser.add_argument(
+        "-b",
+        dest="cookies",
+        metavar="COOKIES",
+        help='Cookies sent with every request, e.g. "session=abc; lang=en"',
+    )
+    parser.add_argument(
+        "--auth",
+        metavar="USER:PASS",
+        help="HTTP Basic authentication credentials",
+    )
+    parser.add_argument(
+        "-x",
+        dest="proxy",
+        metavar="PROXY",
+        help="Proxy URL: http://host:port, https://... or socks5://host:port (SOCKS needs PySocks)",
+    )
+    parser.add_argument(
+        "--random-agent",
+        action="store_true",
+        help="Give each worker a random browser User-Agent",
+    )
+    parser.add_argument(
+        "--keep-headers",
+        help=(
+            'Response headers kept in each result, comma separated, "all" or "none". '
+            f"(default: {','.join(DEFAULT_KEEP_HEADERS)})"
+        ),
+    )
+
+    # OUTPUT OPTIONS
+    parser.add_argument(
+        "-o",
+        metavar="FILE",
+        help="Write matching results to FILE as they arrive (buffered, flushed every second)",
+    )
+    parser.add_argument(
+        "-of",
+        choices=OUTPUT_FORMATS,
+        help="Output format for -o: jsonl, csv, json or html. (default: from the file extension, else jsonl)",
+    )
+
+    # STATS OPTIONS
+    parser.add_argument(
+        "--stats-interval",
+        type=int,
+        default=DEFAULT_STATS_INTERVAL,
+        help=(
+            "Print a status line (req/s, latency p50/p95/p99, error rate, ETA) to stderr "
+            f"every N seconds, 0 to disable. (default: {DEFAULT_STATS_INTERVAL})"
+        ),
+    )
+    parser.add_argument(
+        "--stats-json",
+        metavar="FILE",
+        help="Write the final performance stats to a JSON file",
+    )
+
+    # MATCHER OPTIONS
+    parser.add_argument(
+        "-mc",
+        help=(
+            'Match HTTP status codes, or "all" for everything. '
+            f'(default: {DEFAULT_MATCH_CODES})'
+        ),
+    )
+    parser.add_argument(
+        "-ms",
+        help="Match HTTP response size (e.g. 100,200-300)",
+    )
+    parser.add_argument(
+        "-mw",
+        help="Match amount of words in response body (e.g. 10,20-30)",
+    )
+    parser.add_argument(
+        "-ml",
+        help="Match amount of lines in response body",
+    )
+    parser.add_argument(
+        "-mr",
+        help="Match regular expression in response body (case-insensitive)",
+    )
+    parser.add_argument(
+        "-mt",
+        help='Match response time in milliseconds, e.g. ">100" or "<500"',
+    )
+
+    # FILTER OPTIONS
+    parser.add_argument(
+        "-fc",
+        help="Filter HTTP status codes from response. Comma separated list of codes and ranges",
+    )
+    parser.add_argument(
+        "-fs",
+        help="Filter HTTP response size. Comma separated list of sizes and ranges",
+    )
+    parser.add_argument(
+        "-fw",
+        help="Filter by amount of words in response body. Comma separated list of counts and ranges",
+    )
+    parser.add_argument(
+        "-fl",
+        help="Filter by amount of lines in response body. Comma separated list of counts and ranges",
+    )
+    parser.add_argument(
+        "-fr",
+        help="Filter regular expression in response body (case-insensitive)",
+    )
+    parser.add_argument(
+        "-ft",
+        help='Filter by response time in milliseconds, e.g. ">1000"',
+    )
+
+    # INPUT OPTIONS
+    parser.add_argument(
+        "-w",
+        default=DEFAULT_WORDLIST,
+        help=f"Wordlist file path (default: {DEFAULT_WORDLIST})",
+    )
+    parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="Stream the wordlist text file directly instead of using the compiled index",
+    )
+    parser.add_argument(
+        "--dedup",
+        choices=DEDUP_MODES,
+        default="none",
+        help="Skip duplicate paths: exact (64-bit digest table) or bloom (fixed memory). (default: none)",
+    )
+    parser.add_argument(
+        "--order",
+        choices=ORDER_MODES,
+        default="file",
+        help=(
+            "Path order: file (wordlist order) or smart (paths found most often by past scans "
+            "of any target first, from the --store hit history). (default: file)"
+        ),
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        metavar="K",
+        help="Only test the first K paths (per directory) of the ordered path stream",
+    )
+    parser.add_argument(
+        "--max-time",
+        type=float,
+        metavar="SECONDS",
+        help="Stop the scan after this many seconds (checkpoint is kept for --resume)",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="Do not add the paths found by this scan to the hit history used by --order smart",
+    )
+
+    # EXPANSION OPTIONS
+    parser.add_argument(
+        "-e",
+        help="Extensions, comma separated (e.g. php,bak): replace %%EXT%% or append .ext to each word",
+    )
+    parser.add_argument(
+        "--case",
+        help=f"Extra case variants, comma separated: {','.join(CASE_MODES)}",
+    )
+    parser.add_argument(
+        "--prefixes",
+        help="Prefixes added before each word, comma separated (e.g. _,.)",
+    )
+    parser.add_argument(
+        "--suffixes",
+        help="Suffixes added after each file entry, comma separated (e.g. ~,/)",
+    )
+    parser.add_argument(
+        "--backup",
+        action="store_true",
+        help="Also try backup names for files (.bak, .old, .orig, .save, .swp, ~, .1)",
+    )
+
+    # RESUME OPTIONS
+    parser.add_argument(
+        "--checkpoint",
+        help=(
+            "Checkpoint file to write scan state to, single target only "
+            "(default: reports/checkpoints/<target>.ckpt.json)"
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="FILE",
+        help="Resume an interrupted scan from a checkpoint file (target, wordlist and filters come from the file)",
+    )
+
+    # DIFF OPTIONS
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help=(
+            "Compare with the previous scan of the same target: send conditional requests "
+            "(If-None-Match/If-Modified-Since) and report only new, changed and removed paths"
+        ),
+    )
+    parser.add_argument(
+        "--store",
+        default=DEFAULT_STORE,
+        metavar="FILE",
+        help=(
+            f"SQLite file with responses of previous scans (--diff) and the hit history "
+            f"(--order smart) (default: {DEFAULT_STORE})"
+        ),
+    )
+
+    # ANALYSIS OPTIONS
+    parser.add_argument(
+        "--analyze",
+        action="store_true",
+        help=(
+            "Analyze the body of every match on separate threads: title, word/line counts, "
+            "content hash, interesting strings (keys, stack traces, directory listings) and "
+            "same-site links, which are queued for scanning"
+        ),
+    )
+    parser.add_argument(
+        "--analysis-workers",
+        type=int,
+        default=ANALYSIS_WORKERS,
+        metavar="N",
+        help=f"Threads used by --analyze. (default: {ANALYSIS_WORKERS})",
+    )
+    parser.add_argument(
+        "--no-discover",
+        action="store_true",
+        help="With --analyze, do not scan the paths found in links",
+    )
+
+    # SHARDING OPTIONS
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Split the scan into N shards run by N local worker processes; results, "
+            "progress and stats are merged as they stream in (default: 1)"
+        ),
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Scan only shard I of N (paths whose index %% N == I-1), e.g. to spread one scan over N machines",
+    )
+    parser.add_argument(
+        "--shard-stream",
+        action="store_true",
+        help="Print JSON events instead of the normal output (used by --workers; save to a file for --merge)",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        metavar="FILE",
+        help="Merge --shard-stream event files from several shards into one report",
+    )
+
+    args = parser.parse_args()
+
+    if args.merge:
+        return merge_shards(args)
+
+    from dictionary import count_wordlist, DigestSet
+    from wordlist_index import open_wordlist
+    from expansion import (
+        ExpansionConfig,
+        build_expansion_config,
+        expansion_factor,
+        path_stream,
+        PathLookup,
+    )
+    from filters import build_filter_config, FILTER_KEYS
+    from output import print_result, save_report, save_diff, save_failed, save_stats
+    from scanner import ScanEngine, create_http_client, default_concurrency
+    from ratelimit import TokenBucket, AdaptiveConcurrency
+    from retry import RetryPolicy, parse_retries
+    from checkpoint import Checkpoint, wordlist_fingerprint, default_checkpoint_path
+    from calibration import Calibration
+    from frontier import Frontier
+    from targets import ScanTarget, load_targets
+    from result import parse_keep_headers, NEW, CHANGED, UNCHANGED, REMOVED
+    from metrics import status_line, summary_line
+    from writers import open_writer
+    from session import build_session_template
+    from shard import ShardEmitter, parse_shard, shard_checkpoint_path, shard_size
+
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            print(f"[!] {e}")
+            return True
+
+    checkpoint = None
+    if args.resume:
+        try:
+            checkpoint = Checkpoint.load(args.resume)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[!] Cannot load checkpoint {args.resume}: {e}")
+            return True
+        args.u = checkpoint.target
+        args.l = None
+        args.w = checkpoint.wordlist
+        for key, value in checkpoint.filters.items():
+            setattr(args, key, value)
+        args.dedup = checkpoint.options.get("dedup", "none")
+        args.top = checkpoint.options.get("top")
+        args.ac = checkpoint.options.get("ac", False)
+        args.depth = checkpoint.options.get("recursion", 0)
+        args.recursion = args.depth > 0
+        if checkpoint.options.get("shard"):
+            shard = tuple(checkpoint.options["shard"])
+        if checkpoint.options.get("store"):
+            args.diff = True
+            args.store = checkpoint.options["store"]
+        if checkpoint.options.get("analyze"):
+            args.analyze = True
+            args.no_discover = not checkpoint.options.get("discover", True)
+        expansion_cfg = ExpansionConfig.from_dict(checkpoint.options.get("expansion"))
+    else:
+        expansion_cfg = build_expansion_config(
+            args.e, args.case, args.prefixes, args.suffixes, args.backup
+        )
+
+    # Nếu không có -u/-l => không chạy CLI, trả về False để mở GUI
+    if not args.u and not args.l:
+        return False
+
+    # header/cookie/auth/proxy/User-Agent không lưu trong checkpoint: khi resume cần truyền lại
+    try:
+        template = build_session_template(
+            args.headers, args.cookies, args.auth, args.proxy, args.random_agent
+        )
+    except ValueError as e:
+        print(f"[!] {e}")
+        return True
+
+    if args.u:
+        targets = [args.u]
+    else:
+        try:
+            targets = load_targets(args.l)
+        except OSError as e:
+            print(f"[!] Cannot read target list {args.l}: {e}")
+            return True
+        if not targets:
+            print(f"[!] Target list {args.l} is empty.")
+            return True
+
+    if args.threads is None:
+        args.threads = default_concurrency(args.engine)
+
+    if (shard or args.workers > 1) and args.recursion:
+        print("[!] --shard/--workers cannot be combined with -recursion")
+        return True
+    if args.diff and (shard or args.workers > 1):
+        print("[!] --diff cannot be combined with --shard/--workers")
+        return True
+    if args.workers > 1 and args.resume:
+        print("[!] --workers cannot resume a scan; resume each shard checkpoint with --resume FILE")
+        return True
+
+    # Chạy CLI
+    if len(targets) == 1:
+        print(f"[+] Target URL: {targets[0]}")
+    else:
+        print(f"[+] Targets    : {len(targets)} (from {args.l}, {args.per_host} conns/host)")
+    print(f"[+] Wordlist   : {args.w}")
+    print(f"[+] Timeout    : {args.timeout}s")
+    print(f"[+] Threads    : {args.threads} ({args.engine})")
+    if args.rate > 0:
+        print(f"[+] Rate limit : {args.rate:g} req/s")
+    if args.adaptive:
+        print("[+] Adaptive   : on")
+    if not template.is_empty():
+        print(f"[+] Session    : {template.describe()}")
+    if args.ac:
+        print("[+] Calibrate  : on")
+    if args.recursion:
+        print(f"[+] Recursion  : depth {args.depth}")
+    if args.diff:
+        print(f"[+] Diff       : against {args.store}")
+    if args.analyze:
+        links = "off" if args.no_discover else "scanned"
+        print(f"[+] Analyze    : {args.analysis_workers} threads, links {links}")
+    if shard:
+        print(f"[+] Shard      : {shard[0] + 1}/{shard[1]}")
+    elif args.workers > 1:
+        print(f"[+] Workers    : {args.workers} processes")
+
+    try:
+        if args.lazy:
+            total = count_wordlist(args.w)
+            words = None
+        else:
+            # index nhị phân cạnh wordlist (tự tạo lần đầu), mở qua mmap
+            words = open_wordlist(args.w)
+            total = len(words)
+    except FileNotFoundError:
+        print(f"[!] Wordlist not found: {args.w}")
+        return True
+
+    if not total:
+        print("[!] Wordlist is empty.")
+        return True
+
+    if not expansion_cfg.is_empty():
+        total *= expansion_factor(expansion_cfg)
+        print(f"[+] Expansion  : ~{total} paths")
+
+    capacity = total
+
+    # --order smart: danh sách path đưa lên đầu được lưu trong checkpoint,
+    # resume dùng lại đúng thứ tự dù thống kê trúng đã thay đổi
+    priority = checkpoint.options.get("priority") if checkpoint else None
+    if checkpoint is None and args.order == "smart":
+        priority = smart_priority(
+            args.store, path_stream(args.w, words, expansion_cfg, args.dedup, capacity)
+        )
+        if priority is None:
+            return True
+    elif priority:
+        print(f"[+] Order      : smart ({len(priority)} paths first, from checkpoint)")
+
+    def make_paths():
+        # luồng mới mỗi lần gọi: mỗi target (và mỗi thư mục con khi đệ quy) duyệt lại wordlist
+        return path_stream(args.w, words, expansion_cfg, args.dedup, capacity, priority, args.top)
+
+    if args.top:
+        total = min(total, args.top)
+        print(f"[+] Top        : first {total} paths")
+
+    if checkpoint:
+        if not checkpoint.verify_wordlist():
+            print(f"[!] Wordlist {args.w} changed since the checkpoint was written.")
+            return True
+        print(
+            f"[+] Resuming   : {checkpoint.done_count}/{shard_size(total, shard) * (1 + len(checkpoint.directories))} done, "
+            f"{len(checkpoint.matches)} matches so far"
+        )
+
+    feed_paths = None
+    discover = False
+    if args.analyze:
+        # import trễ: regex/html của analysis chỉ cần khi bật --analyze
+        from analysis import Analyzer, LinkFeed
+
+        if not args.no_discover and (shard or args.workers == 1):
+            # path đã có trong luồng wordlist: link trỏ tới chúng không cần scan thêm lần nữa.
+            # Tra khi tìm thấy link (bảng băm của .kwi), không duyệt trước cả luồng path;
+            # --top: luồng chỉ có --top path nên dựng tập trước; --lazy: không có index để tra
+            if args.top:
+                feed_paths = DigestSet(total)
+                for path in make_paths():
+                    feed_paths.add(path)
+            elif words is not None:
+                feed_paths = PathLookup(words, expansion_cfg)
+            discover = True
+
+    store = None
+    if args.diff:
+        # import trễ: sqlite3 chỉ cần khi bật --diff
+        import sqlite3
+        from store import ResponseStore
+
+        try:
+            store = ResponseStore(args.store)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[!] Cannot open response store {args.store}: {e}")
+            return True
+
+    scan_targets = []
+    for url in targets:
+        if checkpoint is None:
+            checkpoint_path = (args.checkpoint if len(targets) == 1 else None) or default_checkpoint_path(url)
+            if shard:
+                checkpoint_path = shard_checkpoint_path(checkpoint_path, shard)
+            target_checkpoint = Checkpoint(
+                path=checkpoint_path,
+                target=url,
+                wordlist=args.w,
+                fingerprint=wordlist_fingerprint(args.w),
+                filters={key: getattr(args, key) for key in FILTER_KEYS},
+                options={
+                    "dedup": args.dedup,
+                    "expansion": expansion_cfg.to_dict(),
+                    "ac": args.ac,
+                    "recursion": args.depth if args.recursion else 0,
+                    "stride": total,
+                    "shard": list(shard) if shard else None,
+                    "store": args.store if args.diff else None,
+                    "priority": priority,
+                    "top": args.top,
+                    "analyze": args.analyze,
+                    "discover": not args.no_discover,
+                },
+            )
+        else:
+            target_checkpoint = checkpoint
+
+        if args.recursion:
+            # stride (số index dành cho mỗi thư mục) phải giữ nguyên khi resume
+            stride = target_checkpoint.options.get("stride", total)
+            paths = Frontier(make_paths, stride=stride, max_depth=args.depth)
+        else:
+            paths = make_paths()
+
+        scan_targets.append(
+            ScanTarget(
+                url,
+                paths,
+                checkpoint=target_checkpoint,
+                calibration=Calibration() if args.ac else None,
+                shard=shard,
+                diff=store.load(url) if store else None,
+                feed=LinkFeed(feed_paths) if discover else None,
+            )
+        )
+    if store:
+        previous = sum(len(t.diff.previous) for t in scan_targets)
+        print(f"[+] Previous   : {previous} paths found by earlier scans")
+
+    try:
+        cfg = build_filter_config(
+            mc_str=args.mc,
+            ms_str=args.ms or DEFAULT_MATCH_SIZES,
+            fc_str=args.fc or DEFAULT_FILTER_CODES,
+            fs_str=args.fs or DEFAULT_FILTER_SIZES,
+            default_mc_str=DEFAULT_MATCH_CODES,
+            mw_str=args.mw,
+            ml_str=args.ml,
+            fw_str=args.fw,
+            fl_str=args.fl,
+            mr_str=args.mr,
+            fr_str=args.fr,
+            mt_str=args.mt,
+            ft_str=args.ft,
+        )
+    except ValueError as e:
+        print(f"[!] {e}")
+        return True
+
+    if args.workers > 1 and not shard:
+        # coordinator: mỗi tiến trình con scan 1 shard, ở đây chỉ gộp kết quả
+        return run_sharded(args, targets)
+
+    keep_headers = parse_keep_headers(args.keep_headers)
+    body_limit = CALIBRATION_BODY_LIMIT if args.ac or cfg.needs_body else 0
+    if args.diff:
+        # ETag/Last-Modified cho conditional request lần sau, đầu body để so hash nội dung
+        if keep_headers is not None:
+            keep_headers += ("ETag", "Last-Modified")
+        body_limit = max(body_limit, DIFF_BODY_LIMIT)
+    if args.analyze:
+        body_limit = max(body_limit, ANALYSIS_BODY_LIMIT)
+
+    try:
+        client = create_http_client(
+            args.engine,
+            args.timeout,
+            args.threads,
+            stream=args.stream,
+            max_body=args.max_body,
+            http2=args.http2,
+            head_first=args.head,
+            # -ac, --diff, --analyze và tiêu chí theo body (-mw/-ml/-mr/...) cần phần đầu body
+            body_limit=body_limit,
+            hosts=len(targets),
+            keep_headers=keep_headers,
+            template=template,
+        )
+    except RuntimeError as e:
+        print(f"[!] {e}")
+        return True
+
+    # --shard-stream: gửi event JSON cho coordinator thay cho output thường
+    emitter = ShardEmitter(shard or (0, 1)) if args.shard_stream else None
+    if emitter:
+        args.o = args.stats_json = None
+
+    writer = None
+    if args.o:
+        try:
+            writer = open_writer(args.o, args.of, targets)
+        except (OSError, ValueError) as e:
+            print(f"[!] Cannot open output file {args.o}: {e}")
+            return True
+        print(f"[+] Output     : {args.o} ({writer.fmt})")
+        # resume: ghi lại các kết quả đã có trong checkpoint trước
+        for target in scan_targets:
+            for res in target.results:
+                if res.change != UNCHANGED:
+                    writer.write(res)
+
+    def was(res):
+        # giá trị lần trước của path changed (--diff)
+        for target in scan_targets:
+            if target.diff and res.url in target.diff.was:
+                return target.diff.was[res.url]
+        return None
+
+    def on_result(res):
+        if emitter:
+            return  # ticker gửi kết quả theo lô
+        if res.change == UNCHANGED:
+            return  # --diff: chỉ báo path new/changed/removed
+        print_result(res, was(res) if res.change == CHANGED else None)
+        if writer:
+            writer.write(res)
+
+    engine = ScanEngine(
+        client,
+        cfg,
+        threads=args.threads,
+        rate_limiter=TokenBucket(args.rate) if args.rate > 0 else None,
+        adaptive=AdaptiveConcurrency(args.threads) if args.adaptive else None,
+        retry_policy=RetryPolicy(parse_retries(args.retries)),
+        analyzer=Analyzer(discover=not args.no_discover) if args.analyze else None,
+        analysis_workers=args.analysis_workers,
+    )
+    def scan_total() -> int:
+        # path tìm được từ link (--analyze) cộng thêm vào tổng
+        discovered = sum(t.feed.count for t in scan_targets if t.feed)
+        if args.recursion:
+            # mỗi thư mục con tìm được thêm 1 lượt wordlist
+            return total * sum(1 + len(t.frontier.directories) for t in scan_targets) + discovered
+        return shard_size(total, shard) * len(scan_targets) + discovered
+
+    if emitter:
+        emitter.emit("start", time=time.time(), targets=targets, total=total)
+
+    stop_ticker = threading.Event()
+
+    def ticker():
+        # mỗi giây: flush file -o nếu có kết quả chưa ghi; mỗi --stats-interval giây: in trạng thái
+        ticks = 0
+        while not stop_ticker.wait(1):
+            ticks += 1
+            if emitter:
+                emitter.emit_found(scan_targets)
+                emitter.emit("stats", done=engine.done, stats=engine.stats.export())
+                continue
+            if writer:
+                writer.maybe_flush()
+            if args.stats_interval > 0 and ticks % args.stats_interval == 0:
+                # dòng trạng thái ra stderr để stdout chỉ có kết quả
+                snap = engine.stats.snapshot(engine.done, scan_total())
+                print(status_line(snap), file=sys.stderr, flush=True)
+
+    if writer or emitter or args.stats_interval > 0:
+        threading.Thread(target=ticker, daemon=True).start()
+
+    # --max-time: dừng engine khi hết giờ (như Ctrl+C, checkpoint được giữ lại)
+    timer = threading.Timer(args.max_time, engine.stop) if args.max_time else None
+    if timer:
+        timer.daemon = True
+        timer.start()
+
+    # nhiều target: 1 pool chung, round-robin, giới hạn request đồng thời mỗi host
+    try:
+        engine.run_many(
+            scan_targets,
+            on_result=on_result,
+            per_host=args.per_host if len(scan_targets) > 1 else None,
+        )
+    finally:
+        stop_ticker.set()
+        if timer:
+            timer.cancel()
+
+    if engine.stopped and not engine.interrupted:
+        print(f"\n[!] Time budget of {args.max_time:g}s reached, scan stopped.")
+    if not engine.stopped and not args.no_history and not emitter:
+        # --shard-stream: coordinator ghi 1 lần từ kết quả đã gộp (report_merged)
+        record_history(args.store, [(t.found_paths(), t.done) for t in scan_targets])
+
+    if emitter:
+        finish_shard(emitter, engine, client, scan_targets)
+        return True
+
+    if engine.interrupted:
+        print("\n[!] Scan interrupted by user.")
+    if engine.adaptive:
+        print(f"[+] Final adaptive concurrency: {int(engine.adaptive.limit)}")
+
+    if store:
+        for target in scan_targets:
+            diff = target.diff
+            # path lần trước khớp nay không còn: in + ghi -o như 1 kết quả "removed"
+            for _, old in sorted(diff.removed, key=lambda item: item[1].url):
+                old.change = REMOVED
+                print_result(old)
+                if writer:
+                    writer.write(old)
+
+    print(f"\n[+] Found {sum(len(t.found) for t in scan_targets)} matching paths.")
+    if args.recursion:
+        directories = sum(len(t.frontier.directories) for t in scan_targets)
+        print(f"[+] Directories scanned recursively: {directories}")
+    if engine.analyzer:
+        print(f"[+] Analysis: {analysis_summary(engine, scan_targets)}")
+    if store:
+        for target in scan_targets:
+            prefix = f"{target.url}: " if len(scan_targets) > 1 else ""
+            print(f"[+] Diff: {prefix}{target.diff.summary()}")
+            store.save(target.diff)
+        store.close()
+    print(f"[+] Errors: {engine.error_summary()}")
+    print(f"[+] Connections: {client.stats.summary()}")
+    stats = engine.stats.snapshot(engine.done, scan_total())
+    print(f"[+] Stats: {summary_line(stats)}")
+    if args.stats_json:
+        print(f"[+] Stats saved to {save_stats(stats, args.stats_json)}")
+    if writer:
+        writer.close(stats)
+        print(f"[+] {writer.count} results written to {writer.path} ({writer.fmt})")
+    if args.ac:
+        print(f"[+] Filtered {engine.wildcards} wildcard responses")
+
+    for target in scan_targets:
+        # report + danh sách lỗi riêng cho từng target
+        results = target.results
+        if target.diff:
+            # --diff: report chỉ gồm path new/changed/removed
+            diff = target.diff
+            changes = [r for r in results if r.change in (NEW, CHANGED)]
+            changes += sorted((old for _, old in diff.removed), key=lambda r: r.url)
+            report_file = save_diff(changes, target.url, diff.summary(), diff.was)
+            results = changes
+        else:
+            report_file = save_report(results, target.url)
+        if len(scan_targets) == 1:
+            print(f"[+] Report saved to {report_file}")
+        else:
+            kind = "changes" if target.diff else "matches"
+            print(f"[+] {target.url}: {len(results)} {kind}, report saved to {report_file}")
+        failures = target.failures
+        if failures:
+            failed_file = save_failed(failures, report_file)
+            print(f"[!] {len(failures)} paths still failed, saved to {failed_file}")
+
+        ckpt = target.checkpoint
+        if engine.stopped or failures:
+            print(f"[+] Checkpoint saved to {ckpt.path} (continue with --resume {ckpt.path})")
+        else:
+            ckpt.remove()
+
+    return True  # đã chạy CLI
+
+
+def analysis_summary(engine: "ScanEngine", scan_targets: List["ScanTarget"]) -> str:
+    """
+    Tổng kết --analyze: số body đã phân tích, chuỗi đáng chú ý, path tìm từ link,
+    số lần queue phân tích đầy (worker mạng phải chờ).
+    """
+    analyzer, pool = engine.analyzer, engine.analysis
+    text = f"{analyzer.analyzed} bodies, {analyzer.findings} interesting strings"
+    if analyzer.discover:
+        text += f", {sum(t.feed.count for t in scan_targets if t.feed)} paths from links"
+    text += f", queue full {pool.full} times"
+    if pool.errors:
+        text += f", {pool.errors} failed"
+    return text
+
+
+def smart_priority(store_path: str, paths) -> Optional[List[str]]:
+    """
+    --order smart: các path của luồng `paths` từng được tìm thấy ở lần scan trước
+    (mọi target), xếp theo số lần trúng giảm dần. None nếu không đọc được thống kê.
+    """
+    # import trễ: sqlite3 chỉ cần khi dùng thống kê trúng
+    import sqlite3
+    from dictionary import ranked_paths
+    from store import HitHistory
+
+    try:
+        history = HitHistory(store_path)
+        try:
+            ranking, scans = history.ranking(), history.scans
+        finally:
+            history.close()
+    except (OSError, sqlite3.Error) as e:
+        print(f"[!] Cannot read hit history {store_path}: {e}")
+        return None
+    priority = ranked_paths(paths, ranking)
+    print(f"[+] Order      : smart ({len(priority)} paths found before, from {scans} past scans)")
+    return priority
+
+
+def record_history(store_path: str, scans: List[Tuple[List[str], int]]):
+    """
+    Ghi path tìm thấy của từng target đã scan xong vào thống kê trúng (--order smart).
+    `scans`: (path tìm thấy, số path đã test) của mỗi target. Target khớp quá nhiều
+    path (nhiều khả năng wildcard chưa lọc) bị bỏ qua.
+    """
+    import sqlite3
+    from store import HitHistory
+
+    found = [
+        paths
+        for paths, done in scans
+        if len(paths) <= max(HISTORY_MAX_HITS, done * HISTORY_MAX_HIT_RATIO)
+    ]
+    if not found:
+        return
+    try:
+        history = HitHistory(store_path)
+        try:
+            for paths in found:
+                history.record(paths)
+        finally:
+            history.close()
+    except (OSError, sqlite3.Error) as e:
+        print(f"[!] Cannot update hit history {store_path}: {e}")
+
+
+# ====================== CHIA SHARD ======================
+
+def finish_shard(emitter: "ShardEmitter", engine: "ScanEngine", client, scan_targets: List["ScanTarget"]):
+    """
+    Kết thúc 1 shard chạy với --shard-stream: gửi nốt kết quả, giữ/xoá checkpoint
+    như scan thường rồi gửi event end cho coordinator.
+    """
+    emitter.emit_found(scan_targets)
+    checkpoints = []
+    for target in scan_targets:
+        if engine.stopped or target.failed:
+            checkpoints.append(target.checkpoint.path)
+        else:
+            target.checkpoint.remove()
+    conn = client.stats
+    emitter.emit(
+        "end",
+        time=time.time(),
+        done=engine.done,
+        stats=engine.stats.export(),
+        interrupted=engine.interrupted,
+        stopped=engine.stopped,
+        target_done={target.url: target.done for target in scan_targets},
+        errors=dict(engine.errors),
+        retried=engine.retried,
+        wildcards=engine.wildcards,
+        connections={
+            "requests": conn.requests,
+            "connections": conn.connections,
+            "tls_handshakes": conn.tls_handshakes,
+            "tls_resumed": conn.tls_resumed,
+        },
+        failed=[
+            {"target": target.url, "idx": idx, "failure": item}
+            for target in scan_targets
+            for idx, item in target.failed
+        ],
+        checkpoints=checkpoints,
+    )
+
+
+def run_sharded(args, targets: List[str]) -> bool:
+    """
+    --workers N: chạy N tiến trình `--shard i/N --shard-stream` trên máy này và gộp
+    luồng kết quả: in/ghi -o ngay khi có, dòng trạng thái gộp, report cuối giống
+    scan 1 tiến trình.
+    """
+    from metrics import status_line
+    from output import print_result
+    from shard import ShardCoordinator, run_workers
+    from writers import open_writer
+
+    writer = None
+    if args.o:
+        try:
+            writer = open_writer(args.o, args.of, targets)
+        except (OSError, ValueError) as e:
+            print(f"[!] Cannot open output file {args.o}: {e}")
+            return True
+        print(f"[+] Output     : {args.o} ({writer.fmt})")
+
+    def on_result(res):
+        print_result(res)
+        if writer:
+            writer.write(res)
+
+    coordinator = ShardCoordinator(on_result=on_result)
+    stop_ticker = threading.Event()
+
+    def ticker():
+        ticks = 0
+        while not stop_ticker.wait(1):
+            ticks += 1
+            if writer:
+                writer.maybe_flush()
+            if args.stats_interval > 0 and ticks % args.stats_interval == 0:
+                print(status_line(coordinator.snapshot()), file=sys.stderr, flush=True)
+
+    threading.Thread(target=ticker, daemon=True).start()
+    try:
+        codes = run_workers(sys.argv[1:], args.workers, coordinator)
+    finally:
+        stop_ticker.set()
+
+    for i, code in enumerate(codes):
+        if code:
+            print(f"[!] Worker {i + 1}/{args.workers} exited with code {code}")
+    return report_merged(args, coordinator, writer)
+
+
+def merge_shards(args) -> bool:
+    """
+    --merge: gộp file event (--shard-stream) của các shard chạy trên nhiều máy.
+    """
+    from shard import ShardCoordinator, read_event_files
+    from writers import open_writer
+
+    coordinator = ShardCoordinator()
+    try:
+        read_event_files(args.merge, coordinator)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[!] Cannot read shard events: {e}")
+        return True
+    if not coordinator.targets:
+        print("[!] No shard events found.")
+        return True
+    print(f"[+] Merging    : {len(args.merge)} files, {len(coordinator.targets)} target(s)")
+
+    writer = None
+    if args.o:
+        try:
+            writer = open_writer(args.o, args.of, coordinator.targets)
+        except (OSError, ValueError) as e:
+            print(f"[!] Cannot open output file {args.o}: {e}")
+            return True
+        print(f"[+] Output     : {args.o} ({writer.fmt})")
+        for url in coordinator.targets:
+            for res in coordinator.results(url):
+                writer.write(res)
+    return report_merged(args, coordinator, writer)
+
+
+def report_merged(args, coordinator: "ShardCoordinator", writer) -> bool:
+    """
+    Tổng kết + report từ kết quả đã gộp, cùng định dạng với scan 1 tiến trình.
+    """
+    from metrics import summary_line
+    from output import save_report, save_failed, save_stats
+
+    for message in coordinator.messages:
+        print(message)
+    if coordinator.interrupted:
+        print("\n[!] Scan interrupted by user.")
+    missing = coordinator.missing
+    if missing:
+        print(f"[!] No final event from shard(s) {', '.join(map(str, missing))}: results are incomplete")
+    if not coordinator.stopped and not missing and not args.no_history:
+        # shard không ghi thống kê trúng: ghi 1 lần cho cả scan, từ kết quả đã gộp
+        record_history(args.store, coordinator.history())
+
+    print(f"\n[+] Found {coordinator.found_count()} matching paths.")
+    print(f"[+] Errors: {coordinator.error_summary()}")
+    print(f"[+] Connections: {coordinator.connection_summary()}")
+    stats = coordinator.snapshot()
+    print(f"[+] Stats: {summary_line(stats)}")
+    if args.stats_json:
+        print(f"[+] Stats saved to {save_stats(stats, args.stats_json)}")
+    if writer:
+        writer.close(stats)
+        print(f"[+] {writer.count} results written to {writer.path} ({writer.fmt})")
+    wildcards = coordinator.wildcards()
+    if args.ac or wildcards:
+        print(f"[+] Filtered {wildcards} wildcard responses")
+
+    for url in coordinator.targets:
+        results = coordinator.results(url)
+        report_file = save_report(results, url)
+        if len(coordinator.targets) == 1:
+            print(f"[+] Report saved to {report_file}")
+        else:
+            print(f"[+] {url}: {len(results)} matches, report saved to {report_file}")
+        failures = coordinator.failures(url)
+        if failures:
+            failed_file = save_failed(failures, report_file)
+            print(f"[!] {len(failures)} paths still failed, saved to {failed_file}")
+
+    checkpoints = coordinator.checkpoints()
+    if checkpoints:
+        print("[+] Shard checkpoints saved (continue each with --resume FILE):")
+        for path in checkpoints:
+            print(f"    {path}")
+    return True
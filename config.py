@@ -3,6 +3,76 @@
 # HTTP
 DEFAULT_TIMEOUT = 10  # giây
 
+# Số thread gửi request song song
+DEFAULT_THREADS = 20
+
+# Engine gửi request: "threads" (requests) hoặc "async" (aiohttp)
+DEFAULT_ENGINE = "threads"
+ENGINES = ("threads", "async")
+# Số request đồng thời mặc định cho engine async
+DEFAULT_ASYNC_CONCURRENCY = 500
+# Kết nối: giữ kết nối (keep-alive) để không phải bắt tay TCP/TLS lại mỗi request
+TCP_KEEPALIVE = True          # bật SO_KEEPALIVE cho socket
+KEEPALIVE_TIMEOUT = 30        # giây giữ kết nối rảnh trong pool (aiohttp / HTTP/2)
+DEFAULT_HTTP2 = False         # --http2: dùng httpx + h2 (multiplex nhiều request/kết nối)
+
+# Nhiều target (-l): số request đồng thời tối đa mỗi host trên pool chung
+DEFAULT_PER_HOST = 10
+
+# Thống kê hiệu năng (req/s, percentile độ trễ, tỉ lệ lỗi, ETA)
+STATS_WINDOW = 10              # giây, cửa sổ trượt tính req/s và ETA
+STATS_PRECISION_BITS = 7       # độ chính xác histogram độ trễ (7 => sai số < 1.6%)
+DEFAULT_STATS_INTERVAL = 10    # giây giữa 2 dòng trạng thái CLI, 0 = tắt
+
+# Header giữ lại trong mỗi kết quả (--keep-headers), các header khác bị bỏ để tiết kiệm bộ nhớ
+DEFAULT_KEEP_HEADERS = ("Content-Type",)
+HEADER_CACHE_SIZE = 4096  # số bộ header khác nhau tối đa được dùng chung
+# Header có ít giá trị khác nhau: giá trị được intern (dùng chung giữa các kết quả).
+# Giá trị của header khác (Date, Set-Cookie, ETag, ...) thay đổi theo từng response, không intern
+INTERN_HEADER_VALUES = (
+    "Content-Type",
+    "Server",
+    "X-Powered-By",
+    "Content-Encoding",
+    "Cache-Control",
+    "Vary",
+    "Connection",
+)
+
+# Ghi kết quả ra file (-o/-of) ngay trong lúc scan
+WRITER_BUFFER_SIZE = 64 * 1024  # byte buffer ghi file
+WRITER_FLUSH_INTERVAL = 1.0     # giây, flush buffer xuống đĩa tối đa sau khoảng này
+OUTPUT_FORMATS = ("jsonl", "csv", "json", "html")
+
+# Đọc body dạng stream: chỉ đếm byte theo từng chunk, không giữ lại body
+DEFAULT_STREAM = False
+STREAM_CHUNK_SIZE = 64 * 1024  # byte
+# Body có Content-Length tin cậy <= ngưỡng này thì vẫn đọc bỏ đi để
+# giữ kết nối keep-alive; lớn hơn thì đóng kết nối luôn cho đỡ tốn băng thông
+STREAM_DRAIN_LIMIT = 64 * 1024  # byte
+# Giới hạn số byte đọc mỗi body (None = không giới hạn)
+DEFAULT_MAX_BODY = None
+# Status code của HEAD mà server không hỗ trợ => gửi lại bằng GET
+HEAD_FALLBACK_CODES = (405, 501)
+
+# Giới hạn tốc độ (request/giây), 0 = không giới hạn
+DEFAULT_RATE = 0
+# Điều chỉnh số request đồng thời kiểu AIMD theo phản hồi của target
+ADAPTIVE_MIN_WINDOW = 10          # số mẫu tối thiểu mỗi lần điều chỉnh
+ADAPTIVE_ERROR_THRESHOLD = 0.05   # tỉ lệ 429/503/lỗi vượt ngưỡng => giảm một nửa
+ADAPTIVE_LATENCY_FACTOR = 3.0     # p95 > baseline * factor => giảm
+ADAPTIVE_LATENCY_SLACK_MS = 100.0
+THROTTLE_CODES = (429, 503)
+# Retry-After lớn hơn mức này thì chỉ chờ tối đa bấy nhiêu giây
+MAX_RETRY_AFTER = 60.0
+
+# Số lần retry theo loại lỗi mạng (timeout, reset, refused, dns, tls, other)
+# và response 429/503 (throttled, chờ theo Retry-After)
+# Có thể ghi đè bằng -retries, vd "3" hoặc "timeout=3,dns=0"
+DEFAULT_RETRIES = "timeout=2,reset=2,refused=1,dns=0,tls=0,other=1,throttled=3"
+RETRY_BACKOFF_BASE = 0.5   # giây, nhân đôi sau mỗi lần thử
+RETRY_BACKOFF_MAX = 30.0
+
 # Match HTTP status codes, hoặc "all" để match tất cả
 # Mặc định: 200-299,301,302,307,401,403,405,500
 DEFAULT_MATCH_CODES = "200-299,301,302,307,401,403,405,500"
@@ -12,6 +82,73 @@ DEFAULT_MATCH_SIZES = None
 DEFAULT_FILTER_CODES = None
 DEFAULT_FILTER_SIZES = None
 
+# Auto-calibration (-ac): dò wildcard / soft-404 bằng các path ngẫu nhiên
+CALIBRATION_PROBES = ("{r}", "{r}/", "{r}.php", "{r}.html", ".{r}")
+CALIBRATION_BODY_LIMIT = 256 * 1024  # byte đầu body giữ lại để lấy fingerprint
+CALIBRATION_SIZE_TOLERANCE = 0.02    # size lệch <= 2% coi là giống
+CALIBRATION_SIZE_SLACK = 32          # ... hoặc <= 32 byte (path in lại trong trang), tối đa 1/4 size baseline
+CALIBRATION_SIMHASH_DISTANCE = 6     # số bit khác nhau tối đa giữa 2 simhash
+
+# Scan đệ quy (-recursion)
+DEFAULT_RECURSION_DEPTH = 2     # số tầng thư mục con tối đa khi bật -recursion
+REDIRECT_CODES = (301, 302, 307, 308)
+DIRECTORY_CODES = (200, 204, 401, 403)  # path kết thúc "/" trả về các code này => thư mục
+# Thư mục "đáng giá" được chia nhiều lượt worker hơn các thư mục cùng tầng
+HIGH_VALUE_DIRS = (
+    "admin", "administrator", "api", "backup", "backups", "config", "conf",
+    "private", "internal", "dev", "debug", "old", "test", "uploads", ".git",
+)
+
+# Hậu tố file backup khi bật --backup (vd config.php -> config.php.bak)
+BACKUP_SUFFIXES = (".bak", ".old", ".orig", ".save", ".swp", "~", ".1")
+# --case: biến thể chữ hoa/thường thêm vào mỗi word
+CASE_MODES = ("lower", "upper", "capital")
+
+# --dedup: bỏ path trùng; --order: thứ tự path (smart = path trúng nhiều ở lần scan trước lên đầu)
+DEDUP_MODES = ("none", "exact", "bloom")
+ORDER_MODES = ("file", "smart")
+
+# --random-agent: mỗi worker chọn ngẫu nhiên 1 User-Agent trình duyệt phổ biến
+USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1",
+)
+
 # Đường dẫn mặc định
 DEFAULT_WORDLIST = "wordlists/common.txt"
 REPORTS_DIR = "reports"
+CHECKPOINT_DIR = "reports/checkpoints"
+DEFAULT_STORE = "reports/responses.db"  # SQLite: response lần scan trước (--diff) + thống kê trúng (--order smart)
+
+# --diff: số byte đầu body dùng để tính hash nội dung
+DIFF_BODY_LIMIT = 64 * 1024
+
+# --order smart: số path tối đa lấy từ thống kê trúng để đưa lên đầu
+HISTORY_RANK_LIMIT = 100000
+# Target khớp > 20 path và > 20% số path đã test (nhiều khả năng wildcard chưa lọc)
+# thì không ghi vào thống kê trúng
+HISTORY_MAX_HITS = 20
+HISTORY_MAX_HIT_RATIO = 0.2
+
+# --analyze: phân tích body kết quả khớp trên pool thread riêng (analysis.py)
+ANALYSIS_WORKERS = 2               # số thread phân tích
+ANALYSIS_QUEUE_SIZE = 256          # số kết quả tối đa chờ phân tích (đầy => worker mạng chờ)
+ANALYSIS_BODY_LIMIT = 256 * 1024   # byte đầu body giữ lại để phân tích
+ANALYSIS_MAX_DISCOVERED = 10000    # số path tối đa tìm được từ link, mỗi target
+# Index của path tìm được từ link bắt đầu từ đây (ngoài dải index wordlist/thư mục con)
+DISCOVERED_BASE = 1 << 48
+
+# Checkpoint: ghi trạng thái scan ra đĩa mỗi bấy nhiêu giây
+CHECKPOINT_INTERVAL = 10
+
+# GUI: lấy kết quả từ queue theo lô có giới hạn thời gian, vẽ lại biểu đồ theo FPS cố định
+UI_POLL_MS = 50            # chu kỳ đọc queue khi đang scan
+UI_DRAIN_BUDGET_MS = 15    # thời gian tối đa mỗi lần đọc queue (phần còn lại để tick sau)
+UI_CHART_FPS = 4           # số lần vẽ lại biểu đồ tối đa mỗi giây
+UI_ROW_HEIGHT = 20         # chiều cao 1 dòng bảng kết quả (pixel)
@@ -1,6 +1,25 @@
 # dictionary.py
 
-from typing import List
+import hashlib
+import math
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+# Kích thước buffer khi đọc wordlist dạng stream
+READ_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+def normalize_path(line: str) -> Optional[str]:
+    """
+    Chuẩn hoá 1 dòng wordlist: bỏ khoảng trắng, bỏ dòng trống/comment,
+    thêm "/" ở đầu. Trả về None nếu dòng bị bỏ.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if not line.startswith("/"):
+        line = "/" + line
+    return line
 
 
 def load_wordlist(path: str) -> List[str]:
@@ -8,15 +27,184 @@ def load_wordlist(path: str) -> List[str]:
     Đọc file wordlist, bỏ dòng trống và comment.
     Đảm bảo mỗi path bắt đầu bằng "/".
     """
-    paths: List[str] = []
+    return list(iter_wordlist(path))
+
+
+def iter_wordlist(path: str, dedup: Optional["DigestSet"] = None) -> Iterator[str]:
+    """
+    Đọc wordlist dạng generator: đọc file theo buffer lớn và trả dần từng path
+    đã chuẩn hoá, không dựng cả list trong bộ nhớ.
+    - dedup: bộ lọc trùng (DigestSet / BloomFilter) hoặc None
+    File được mở ngay khi gọi, nên FileNotFoundError được ném ra sớm.
+    """
+    f = open(path, "rb", buffering=READ_CHUNK_SIZE)
+
+    def generate():
+        with f:
+            for raw in f:
+                line = normalize_path(raw.decode("utf-8", errors="ignore"))
+                if line is not None:
+                    yield line
+
+    return dedup_paths(generate(), dedup)
+
+
+def dedup_paths(paths: Iterable[str], dedup) -> Iterator[str]:
+    """
+    Bỏ các path trùng khỏi một luồng path (dedup=None thì giữ nguyên).
+    """
+    if dedup is None:
+        return iter(paths)
+    return (p for p in paths if dedup.add(p))
+
+
+def ranked_paths(paths: Iterable[str], ranking: Sequence[str]) -> List[str]:
+    """
+    Các path của `ranking` (xếp theo khả năng trúng giảm dần) có trong luồng `paths`,
+    giữ thứ tự của ranking. Duyệt `paths` 1 lượt, dừng sớm khi đã gặp đủ.
+    """
+    wanted = set(ranking)
+    present = set()
+    for path in paths:
+        if path in wanted:
+            present.add(path)
+            if len(present) == len(wanted):
+                break
+    return [path for path in ranking if path in present]
+
+
+def prioritize(paths: Iterable[str], first: Sequence[str]) -> Iterator[str]:
+    """
+    Trả `first` trước, rồi phần còn lại của `paths` theo thứ tự cũ (bỏ các path đã trả).
+    Tập path không đổi nên tổng số path / index checkpoint vẫn ổn định.
+    """
+    seen = set(first)
+    yield from first
+    for path in paths:
+        if path not in seen:
+            yield path
+
+
+def count_wordlist(path: str) -> int:
+    """
+    Đếm nhanh số dòng của wordlist (đếm byte xuống dòng theo chunk).
+    Đây là cận trên: dòng trống/comment/trùng cũng được tính.
+    """
+    count = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+            count += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last != b"\n":
+        count += 1  # dòng cuối không có "\n"
+    return count
+
+
+def _digest(path: str, size: int) -> bytes:
+    return hashlib.blake2b(path.encode("utf-8"), digest_size=size).digest()
+
+
+class DigestSet:
+    """
+    Lọc trùng chính xác (xác suất đụng hash ~ n^2 / 2^65) bằng bảng băm
+    địa chỉ mở chứa digest 64-bit trong array('Q'): ~12-24 byte mỗi path,
+    thay vì giữ nguyên chuỗi path hoặc object int trong set().
+    """
+
+    def __init__(self, capacity: int = 1024):
+        size = 1024
+        while size < capacity * 2:
+            size <<= 1
+        self._table = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    def add(self, path: str) -> bool:
+        """
+        Thêm path, trả về True nếu path chưa gặp trước đó.
+        """
+        key = int.from_bytes(_digest(path, 8), "little") or 1  # 0 = ô trống
+        table, mask = self._table, self._mask
+        i = key & mask
+        while True:
+            slot = table[i]
+            if slot == 0:
+                break
+            if slot == key:
+                return False
+            i = (i + 1) & mask
+
+        table[i] = key
+        self._count += 1
+        if self._count * 3 > len(table) * 2:
+            self._grow()
+        return True
+
+    def __contains__(self, path: str) -> bool:
+        key = int.from_bytes(_digest(path, 8), "little") or 1
+        table, mask = self._table, self._mask
+        i = key & mask
+        while True:
+            slot = table[i]
+            if slot == 0:
+                return False
+            if slot == key:
+                return True
+            i = (i + 1) & mask
+
+    def _grow(self):
+        old = self._table
+        self._table = array("Q", bytes(16 * len(old)))
+        self._mask = len(self._table) - 1
+        table, mask = self._table, self._mask
+        for key in old:
+            if key:
+                i = key & mask
+                while table[i]:
+                    i = (i + 1) & mask
+                table[i] = key
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class BloomFilter:
+    """
+    Bloom filter: bộ nhớ cố định, có thể bỏ nhầm một số ít path
+    (tỉ lệ ~ error_rate) nhưng không bao giờ cho lọt path trùng.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 1e-3):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, path: str) -> bool:
+        """
+        Thêm path, trả về True nếu path (có lẽ) chưa gặp trước đó.
+        """
+        digest = _digest(path, 16)
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        size, bits = self.size, self._bits
 
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            if not line.startswith("/"):
-                line = "/" + line
-            paths.append(line)
+        positions = [(h1 + i * h2) % size for i in range(self.hashes)]
+        if all(bits[p >> 3] & (1 << (p & 7)) for p in positions):
+            return False
+        for p in positions:
+            bits[p >> 3] |= 1 << (p & 7)
+        return True
 
-    return paths
+
+def make_dedup(mode: str, capacity: int):
+    """
+    Tạo bộ lọc trùng theo tên: "none" -> None, "exact" -> DigestSet,
+    "bloom" -> BloomFilter đủ chỗ cho `capacity` path.
+    """
+    if mode == "exact":
+        return DigestSet(capacity)
+    if mode == "bloom":
+        return BloomFilter(capacity)
+    return None
@@ -0,0 +1,223 @@
+# expansion.py
+
+from dataclasses import dataclass, field, asdict
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+from config import BACKUP_SUFFIXES, CASE_MODES
+from dictionary import iter_wordlist, dedup_paths, make_dedup, prioritize
+
+EXT_PLACEHOLDER = "%EXT%"
+
+
+def parse_list(spec: Optional[str]) -> List[str]:
+    """
+    Parse chuỗi "php, bak,,txt" thành ["php", "bak", "txt"].
+    """
+    if not spec:
+        return []
+    return [part.strip() for part in spec.split(",") if part.strip()]
+
+
+@dataclass
+class ExpansionConfig:
+    """
+    Cấu hình sinh biến thể path từ mỗi từ trong wordlist:
+    - extensions: -e php,bak => thay %EXT%, hoặc thêm ".php", ".bak" vào từ
+    - case: các biến thể chữ hoa/thường ("lower", "upper", "capital")
+    - prefixes / suffixes: thêm vào trước tên / sau cùng (suffix bỏ qua thư mục)
+    - backup: thêm các hậu tố file backup (BACKUP_SUFFIXES) cho path là file
+    """
+    extensions: List[str] = field(default_factory=list)
+    case: List[str] = field(default_factory=list)
+    prefixes: List[str] = field(default_factory=list)
+    suffixes: List[str] = field(default_factory=list)
+    backup: bool = False
+
+    def is_empty(self) -> bool:
+        return not (
+            self.extensions or self.case or self.prefixes or self.suffixes or self.backup
+        )
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> "ExpansionConfig":
+        return cls(**(data or {}))
+
+
+def build_expansion_config(
+    ext_str: Optional[str],
+    case_str: Optional[str],
+    prefixes_str: Optional[str],
+    suffixes_str: Optional[str],
+    backup: bool,
+) -> ExpansionConfig:
+    """
+    Tạo ExpansionConfig từ chuỗi tham số CLI/GUI.
+    """
+    return ExpansionConfig(
+        extensions=[e.lstrip(".") for e in parse_list(ext_str)],
+        case=[c.lower() for c in parse_list(case_str) if c.lower() in CASE_MODES],
+        prefixes=parse_list(prefixes_str),
+        suffixes=parse_list(suffixes_str),
+        backup=backup,
+    )
+
+
+def _apply_case(path: str, mode: str) -> str:
+    if mode == "lower":
+        return path.lower()
+    if mode == "upper":
+        return path.upper()
+    # capital: viết hoa chữ cái đầu của phần tên cuối
+    head, _, name = path.rpartition("/")
+    return f"{head}/{name[:1].upper()}{name[1:]}"
+
+
+def _has_extension(path: str) -> bool:
+    name = path.rstrip("/").rpartition("/")[2]
+    return "." in name.lstrip(".")
+
+
+def expand_path(path: str, cfg: ExpansionConfig) -> Iterator[str]:
+    """
+    Sinh các biến thể của 1 path (path gốc luôn đứng đầu), không trùng lặp.
+    """
+    # 1. extension: %EXT% hoặc thêm đuôi cho từ không phải thư mục
+    if EXT_PLACEHOLDER in path:
+        base = [path.replace(EXT_PLACEHOLDER, ext) for ext in cfg.extensions]
+    else:
+        base = [path]
+        if not path.endswith("/"):
+            base += [f"{path}.{ext}" for ext in cfg.extensions]
+
+    # 2. biến thể chữ hoa/thường
+    variants = list(base)
+    for mode in cfg.case:
+        variants += [_apply_case(p, mode) for p in base]
+
+    seen = set()
+    for p in variants:
+        trail = "/" if p.endswith("/") else ""
+        head, _, name = p.rstrip("/").rpartition("/")
+        candidates = [p]
+        candidates += [f"{head}/{prefix}{name}{trail}" for prefix in cfg.prefixes]
+        if not trail:
+            candidates += [p + suffix for suffix in cfg.suffixes]
+        if (
+            cfg.backup
+            and not trail
+            and _has_extension(p)
+            and not p.endswith(BACKUP_SUFFIXES)
+        ):
+            candidates += [p + suffix for suffix in BACKUP_SUFFIXES]
+
+        for c in candidates:
+            if c not in seen:
+                seen.add(c)
+                yield c
+
+
+def expand(paths: Iterable[str], cfg: ExpansionConfig, dedup=None) -> Iterator[str]:
+    """
+    Stream path đã mở rộng: sinh dần theo từng từ, không dựng keyspace trong bộ nhớ.
+    - dedup: bộ lọc trùng toàn cục (DigestSet/BloomFilter), None = chỉ lọc trùng trong từng từ
+    """
+    for path in paths:
+        for variant in expand_path(path, cfg):
+            if dedup is None or dedup.add(variant):
+                yield variant
+
+
+def path_stream(
+    wordlist: str,
+    words: Optional[Sequence[str]],
+    cfg: ExpansionConfig,
+    dedup: str = "none",
+    capacity: int = 0,
+    priority: Optional[Sequence[str]] = None,
+    top: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Luồng path của 1 lượt scan, dùng chung cho CLI và GUI: wordlist -> bỏ trùng (--dedup,
+    bộ lọc đủ chỗ cho `capacity` path) -> mở rộng `cfg` -> path của `priority` lên đầu
+    (--order smart) -> `top` path đầu (--top).
+    Index trong checkpoint là vị trí trong luồng này, nên resume (ở CLI hay GUI) phải
+    dựng lại đúng luồng với các tuỳ chọn đã lưu.
+    - words: wordlist đã mở (open_wordlist), None = đọc thẳng file text `wordlist` (--lazy)
+    """
+    source = iter_wordlist(wordlist) if words is None else words
+    seen = make_dedup(dedup, capacity)
+    if cfg.is_empty():
+        paths = dedup_paths(source, seen)
+    else:
+        paths = expand(source, cfg, dedup=seen)
+    if priority:
+        paths = prioritize(paths, priority)
+    if top:
+        paths = islice(paths, top)
+    return paths
+
+
+def expansion_factor(cfg: ExpansionConfig) -> int:
+    """
+    Ước lượng số biến thể trung bình mỗi từ (để tính tổng cho progress).
+    """
+    if cfg.is_empty():
+        return 1
+    return max(
+        len(list(expand_path("/word", cfg))),
+        len(list(expand_path("/word.txt", cfg))),
+    )
+
+
+def source_words(path: str, cfg: ExpansionConfig) -> Set[str]:
+    """
+    Các từ gốc có thể sinh ra `path` qua expand_path (ngược lại các bước extension,
+    prefix, suffix, backup; biến thể chữ hoa/thường chỉ nhận ra khi từ gốc viết thường).
+    Có thể thừa: kiểm tra lại bằng expand_path.
+    """
+    words = {path, path.lower()} if cfg.case else {path}
+    for p in list(words):
+        trail = "/" if p.endswith("/") else ""
+        head, _, name = p.rstrip("/").rpartition("/")
+        for prefix in cfg.prefixes:
+            if len(name) > len(prefix) and name.startswith(prefix):
+                words.add(f"{head}/{name[len(prefix):]}{trail}")
+        if not trail:
+            suffixes = list(cfg.suffixes) + (list(BACKUP_SUFFIXES) if cfg.backup else [])
+            for suffix in suffixes:
+                if len(p) > len(suffix) and p.endswith(suffix):
+                    words.add(p[:-len(suffix)])
+    for word in list(words):
+        for ext in cfg.extensions:
+            if word.endswith("." + ext):
+                words.add(word[:-len(ext) - 1])
+            if ext in word:
+                words.add(word.replace(ext, EXT_PLACEHOLDER))
+    return words
+
+
+class PathLookup:
+    """
+    `path in lookup`: path có nằm trong luồng path sinh từ wordlist `words` (kể cả
+    biến thể của `cfg`) không. Tra theo nhu cầu, không duyệt trước cả luồng: chỉ các
+    từ gốc có thể sinh ra path (source_words) được tra trong `words`
+    (CompiledWordlist tra bảng băm của file .kwi; list thì đổi sang set 1 lần).
+    Path chỉ khớp qua biến thể chữ hoa/thường của từ không viết thường bị coi là không có
+    (link đó được scan thêm 1 lần, không bị bỏ sót).
+    """
+
+    def __init__(self, words: Sequence[str], cfg: ExpansionConfig):
+        self.words = words if hasattr(words, "find") else set(words)
+        self.cfg = cfg
+
+    def __contains__(self, path: str) -> bool:
+        words, cfg = self.words, self.cfg
+        if cfg.is_empty():
+            return path in words
+        return any(
+            word in words and path in expand_path(word, cfg) for word in source_words(path, cfg)
+        )
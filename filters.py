@@ -1,7 +1,89 @@
 # filters.py
 
+import operator
+import re
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Optional, Set, Dict
+from typing import Callable, List, Optional, Pattern, Tuple
+
+from calibration import count_words_lines
+from result import ScanResult
+
+# Status code hợp lệ nằm trong [0, 1000): tra bitmap thay vì tìm khoảng
+_STATUS_LIMIT = 1000
+
+# Tên tham số matcher/filter (CLI, lưu trong checkpoint)
+FILTER_KEYS = ("mc", "ms", "mw", "ml", "mr", "mt", "fc", "fs", "fw", "fl", "fr", "ft")
+
+# Toán tử của -mt / -ft
+_TIME_OPS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+# 1 điều kiện: (kết quả, đầu body hoặc None) -> có qua không
+Predicate = Callable[[ScanResult, Optional[bytes]], bool]
+
+
+class IntervalSet:
+    """
+    Tập số nguyên lưu dạng các khoảng [start, end] đã sắp xếp và gộp,
+    kiểm tra `x in s` bằng bisect: "-fs 0-10000000" chỉ tốn 1 khoảng.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals: List[Tuple[int, int]] = ()):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __contains__(self, value: int) -> bool:
+        i = bisect_right(self.starts, value) - 1
+        return i >= 0 and value <= self.ends[i]
+
+    def __bool__(self) -> bool:
+        return bool(self.starts)
+
+    def __iter__(self):
+        for start, end in zip(self.starts, self.ends):
+            yield from range(start, end + 1)
+
+    def __repr__(self) -> str:
+        parts = [
+            str(s) if s == e else f"{s}-{e}" for s, e in zip(self.starts, self.ends)
+        ]
+        return f"IntervalSet({','.join(parts)})"
+
+
+class StatusSet:
+    """
+    Tập status code dạng bitmap 1000 byte (tra bằng index), code ngoài
+    [0, 1000) rơi về IntervalSet.
+    """
+
+    __slots__ = ("bits", "intervals")
+
+    def __init__(self, intervals: IntervalSet):
+        self.intervals = intervals
+        bits = bytearray(_STATUS_LIMIT)
+        for start, end in zip(intervals.starts, intervals.ends):
+            for code in range(max(0, start), min(end, _STATUS_LIMIT - 1) + 1):
+                bits[code] = 1
+        self.bits = bytes(bits)
+
+    def __contains__(self, code: int) -> bool:
+        if 0 <= code < _STATUS_LIMIT:
+            return bool(self.bits[code])
+        return code in self.intervals
+
+    def __bool__(self) -> bool:
+        return bool(self.intervals)
+
+    def __iter__(self):
+        return iter(self.intervals)
 
 
 @dataclass
@@ -13,20 +95,59 @@ class FilterConfig:
     - match_sizes: chỉ chấp nhận những response size này (hoặc None)
     - filter_codes: loại bỏ những status code này (hoặc None)
     - filter_sizes: loại bỏ những size này (hoặc None)
+    - match_words / match_lines / filter_words / filter_lines: theo số từ / dòng của body
+    - match_regex / filter_regex: regex trên body (bytes)
+    - match_time / filter_time: (toán tử, ms) trên thời gian response, vd (">", 100.0)
+    - predicates: các điều kiện dựng sẵn 1 lần trong build_filter_config (chỉ tiêu chí
+      được bật), xếp từ rẻ tới đắt: status -> size -> thời gian -> số từ/dòng -> regex body
     """
-    match_codes: Optional[Set[int]] = None
-    match_sizes: Optional[Set[int]] = None
-    filter_codes: Optional[Set[int]] = None
-    filter_sizes: Optional[Set[int]] = None
+    match_codes: Optional[StatusSet] = None
+    match_sizes: Optional[IntervalSet] = None
+    filter_codes: Optional[StatusSet] = None
+    filter_sizes: Optional[IntervalSet] = None
+    match_words: Optional[IntervalSet] = None
+    match_lines: Optional[IntervalSet] = None
+    filter_words: Optional[IntervalSet] = None
+    filter_lines: Optional[IntervalSet] = None
+    match_regex: Optional[Pattern] = None
+    filter_regex: Optional[Pattern] = None
+    match_time: Optional[Tuple[str, float]] = None
+    filter_time: Optional[Tuple[str, float]] = None
+    predicates: Tuple[Predicate, ...] = ()
+
+    def match(self, result: ScanResult, body: Optional[bytes] = None) -> bool:
+        """
+        Kết quả qua mọi điều kiện (match và filter) không; dừng ở điều kiện đầu tiên trượt.
+        Số từ/dòng chỉ được đếm khi tới bước đó. body None thì tiêu chí theo body:
+        match => trượt, filter => bỏ qua.
+        """
+        for check in self.predicates:
+            if not check(result, body):
+                return False
+        return True
 
+    @property
+    def needs_body(self) -> bool:
+        """
+        Có tiêu chí cần body (số từ/dòng, regex) => client phải giữ phần đầu body.
+        """
+        return any(
+            value is not None
+            for value in (
+                self.match_words, self.match_lines, self.filter_words,
+                self.filter_lines, self.match_regex, self.filter_regex,
+            )
+        )
 
-def parse_range_list(spec: str) -> Set[int]:
+
+def parse_range_list(spec: str) -> IntervalSet:
     """
-    Parse chuỗi dạng "200,301-303,400-404" thành set[int]
+    Parse chuỗi dạng "200,301-303,400-404" thành IntervalSet
+    (phần không hợp lệ bị bỏ qua).
     """
-    result: Set[int] = set()
+    intervals: List[Tuple[int, int]] = []
     if not spec:
-        return result
+        return IntervalSet()
 
     for part in spec.split(","):
         part = part.strip()
@@ -42,15 +163,38 @@ def parse_range_list(spec: str) -> Set[int]:
                 continue
             if start > end:
                 start, end = end, start
-            for v in range(start, end + 1):
-                result.add(v)
+            intervals.append((start, end))
         else:
             try:
-                result.add(int(part))
+                value = int(part)
             except ValueError:
                 continue
+            intervals.append((value, value))
+
+    return IntervalSet(intervals)
+
+
+_TIME_RE = re.compile(r"^\s*(>=|<=|>|<)\s*(\d+(?:\.\d+)?)\s*$")
+
+
+def parse_time_filter(spec: str) -> Tuple[str, float]:
+    """
+    ">100" / "<=500" -> (toán tử, ms), vd (">", 100.0). Sai cú pháp => ValueError.
+    """
+    m = _TIME_RE.match(spec)
+    if not m:
+        raise ValueError(f'invalid response time filter {spec!r} (use e.g. ">100" or "<500")')
+    return m.group(1), float(m.group(2))
 
-    return result
+
+def parse_regex(spec: str) -> Pattern:
+    """
+    Biên dịch regex để chạy trên body (bytes). Sai cú pháp => ValueError.
+    """
+    try:
+        return re.compile(spec.encode("utf-8"), re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"invalid regex {spec!r}: {e}") from e
 
 
 def build_filter_config(
@@ -59,6 +203,14 @@ def build_filter_config(
     fc_str: Optional[str],
     fs_str: Optional[str],
     default_mc_str: Optional[str],
+    mw_str: Optional[str] = None,
+    ml_str: Optional[str] = None,
+    fw_str: Optional[str] = None,
+    fl_str: Optional[str] = None,
+    mr_str: Optional[str] = None,
+    fr_str: Optional[str] = None,
+    mt_str: Optional[str] = None,
+    ft_str: Optional[str] = None,
 ) -> FilterConfig:
     """
     Tạo FilterConfig từ chuỗi tham số.
@@ -67,6 +219,10 @@ def build_filter_config(
     - fc_str: -fc
     - fs_str: -fs
     - default_mc_str: chuỗi match code mặc định (từ config)
+    - mw/ml/fw/fl: -mw -ml -fw -fl (số từ / dòng)
+    - mr/fr: -mr -fr (regex trên body)
+    - mt/ft: -mt -ft (thời gian response, vd ">100")
+    Regex / thời gian sai cú pháp => ValueError.
     """
 
     # MATCH CODES
@@ -78,44 +234,100 @@ def build_filter_config(
     if mc_str and mc_str.lower() == "all":
         match_codes = None  # match tất cả
     else:
-        match_codes = parse_range_list(mc_str) if mc_str else None
+        match_codes = StatusSet(parse_range_list(mc_str)) if mc_str else None
 
     # MATCH SIZES
     match_sizes = parse_range_list(ms_str) if ms_str else None
 
     # FILTER CODES
-    filter_codes = parse_range_list(fc_str) if fc_str else None
+    filter_codes = StatusSet(parse_range_list(fc_str)) if fc_str else None
 
     # FILTER SIZES
     filter_sizes = parse_range_list(fs_str) if fs_str else None
 
-    return FilterConfig(
+    cfg = FilterConfig(
         match_codes=match_codes,
         match_sizes=match_sizes,
         filter_codes=filter_codes,
         filter_sizes=filter_sizes,
+        match_words=parse_range_list(mw_str) if mw_str else None,
+        match_lines=parse_range_list(ml_str) if ml_str else None,
+        filter_words=parse_range_list(fw_str) if fw_str else None,
+        filter_lines=parse_range_list(fl_str) if fl_str else None,
+        match_regex=parse_regex(mr_str) if mr_str else None,
+        filter_regex=parse_regex(fr_str) if fr_str else None,
+        match_time=parse_time_filter(mt_str) if mt_str else None,
+        filter_time=parse_time_filter(ft_str) if ft_str else None,
     )
+    cfg.predicates = build_predicates(cfg)
+    return cfg
 
 
-def should_show(result: Dict, cfg: FilterConfig) -> bool:
+def build_predicates(cfg: FilterConfig) -> Tuple[Predicate, ...]:
     """
-    Áp dụng matcher và filter lên 1 kết quả HTTP.
+    Danh sách điều kiện của `cfg`, chỉ gồm tiêu chí được bật, xếp từ rẻ tới đắt.
+    Match có tập giá trị rỗng (vd "-ms abc") => không kết quả nào qua; filter rỗng => bỏ qua.
     """
-    status = result["status_code"]
-    length = result["length"]
+    checks: List[Predicate] = []
+
+    # 1. status code (bitmap) và 2. size (bisect trên các khoảng)
+    if cfg.match_codes is not None:
+        checks.append(_value_check(lambda r: r.status_code, cfg.match_codes, keep=True))
+    if cfg.filter_codes:
+        checks.append(_value_check(lambda r: r.status_code, cfg.filter_codes, keep=False))
+    if cfg.match_sizes is not None:
+        checks.append(_value_check(lambda r: r.length, cfg.match_sizes, keep=True))
+    if cfg.filter_sizes:
+        checks.append(_value_check(lambda r: r.length, cfg.filter_sizes, keep=False))
+
+    # 3. thời gian response
+    if cfg.match_time is not None:
+        checks.append(_time_check(*cfg.match_time, keep=True))
+    if cfg.filter_time is not None:
+        checks.append(_time_check(*cfg.filter_time, keep=False))
+
+    # 4. số từ / dòng (đếm 1 lần, chỉ khi tới bước này)
+    for attr, values, keep in (
+        ("words", cfg.match_words, True),
+        ("lines", cfg.match_lines, True),
+        ("words", cfg.filter_words, False),
+        ("lines", cfg.filter_lines, False),
+    ):
+        if values is not None and (keep or values):
+            checks.append(_count_check(attr, values, keep))
+
+    # 5. regex trên body: đắt nhất, chạy cuối
+    if cfg.match_regex is not None:
+        checks.append(_regex_check(cfg.match_regex, keep=True))
+    if cfg.filter_regex is not None:
+        checks.append(_regex_check(cfg.filter_regex, keep=False))
+    return tuple(checks)
+
+
+def _value_check(get: Callable[[ScanResult], int], values, keep: bool) -> Predicate:
+    # keep: match (giá trị phải thuộc `values`), không thì filter (không được thuộc)
+    return lambda r, b: (get(r) in values) == keep
+
+
+def _time_check(op: str, ms: float, keep: bool) -> Predicate:
+    compare = _TIME_OPS[op]
+    return lambda r, b: compare(r.elapsed_ms, ms) == keep
 
-    # MATCH
-    if cfg.match_codes is not None and status not in cfg.match_codes:
-        return False
 
-    if cfg.match_sizes is not None and length not in cfg.match_sizes:
-        return False
+def _count_check(attr: str, values: IntervalSet, keep: bool) -> Predicate:
+    def check(r: ScanResult, b: Optional[bytes]) -> bool:
+        if r.words is None and b is not None:
+            r.words, r.lines = count_words_lines(b)
+        value = getattr(r, attr)
+        if value is None:
+            return not keep  # không có body: match => trượt, filter => bỏ qua
+        return (value in values) == keep
 
-    # FILTER
-    if cfg.filter_codes is not None and status in cfg.filter_codes:
-        return False
+    return check
 
-    if cfg.filter_sizes is not None and length in cfg.filter_sizes:
-        return False
 
-    return True
+def _regex_check(regex: Pattern, keep: bool) -> Predicate:
+    search = regex.search
+    if keep:
+        return lambda r, b: b is not None and search(b) is not None
+    return lambda r, b: b is None or search(b) is None
@@ -0,0 +1,136 @@
+# frontier.py
+
+import heapq
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from config import REDIRECT_CODES, DIRECTORY_CODES, HIGH_VALUE_DIRS
+from result import ScanResult
+
+
+def directory_of(path: str, res: ScanResult) -> Optional[str]:
+    """
+    Trả về path thư mục (kết thúc bằng "/") nếu response cho thấy `path` là thư mục:
+    - redirect tới chính nó + "/" (vd /admin -> /admin/)
+    - path kết thúc "/" và trả về 200/204/401/403
+    Ngược lại trả về None.
+    """
+    status = res.status_code
+    if status in REDIRECT_CODES:
+        location = res.location
+        if not location or path.endswith("/"):
+            return None
+        target = urlsplit(urljoin(res.url, location))
+        if target.path == urlsplit(res.url).path + "/":
+            return path + "/"
+        return None
+    if path.endswith("/") and status in DIRECTORY_CODES:
+        return path
+    return None
+
+
+def _depth(directory: str) -> int:
+    """
+    Độ sâu thư mục so với gốc: "/" -> 0, "/admin/" -> 1, "/admin/x/" -> 2.
+    """
+    return directory.strip("/").count("/") + 1 if directory != "/" else 0
+
+
+class _Cursor:
+    """
+    Con trỏ duyệt wordlist trong 1 thư mục.
+    """
+
+    __slots__ = ("dir_id", "prefix", "depth", "weight", "words")
+
+    def __init__(self, dir_id: int, prefix: str, depth: int, weight: int, words: Iterator):
+        self.dir_id = dir_id
+        self.prefix = prefix
+        self.depth = depth
+        self.weight = weight
+        self.words = words
+
+
+class Frontier:
+    """
+    Hàng đợi job dùng chung cho scan đệ quy: thư mục gốc + các thư mục con
+    tìm được trong lúc scan, tất cả chạy xen kẽ trên cùng pool worker.
+
+    - Lập lịch kiểu stride: mỗi thư mục có "pass" tăng thêm `weight` sau mỗi job,
+      luôn lấy thư mục có pass nhỏ nhất. weight = 2^depth (thư mục nông được nhiều
+      lượt hơn), thư mục trong HIGH_VALUE_DIRS được chia đôi weight.
+      Thư mục mới bắt đầu từ pass hiện tại nên chen vào ngay mà không làm đói các thư mục khác.
+    - Index job = dir_id * stride + vị trí từ trong wordlist, nên thư mục gốc giữ
+      nguyên index như scan thường và checkpoint/thứ tự kết quả vẫn dùng được.
+      `stride` phải >= số path tối đa mỗi thư mục.
+    - Mỗi thư mục chỉ được thêm 1 lần (chống vòng lặp), sâu tối đa `max_depth`.
+
+    Không tự khoá: ScanEngine gọi dưới lock của nó.
+    """
+
+    def __init__(self, words: Callable[[], Iterable[str]], stride: int, max_depth: int):
+        self.words = words
+        self.stride = max(1, stride)
+        self.max_depth = max_depth
+        self.directories: List[str] = []  # dir_id - 1 -> path thư mục con (theo thứ tự tìm thấy)
+        self._seen = {"/"}
+        self._heap: List[Tuple[int, int, _Cursor]] = []
+        self._pass = 0
+        self._push(0, "/")
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Tuple[int, str]:
+        """
+        Job kế tiếp (idx, path). StopIteration chỉ có nghĩa là *hiện tại* hết job;
+        các thư mục tìm được sau đó vẫn gọi tiếp được.
+        """
+        heap = self._heap
+        while heap:
+            pass_, dir_id, cursor = heap[0]
+            item = next(cursor.words, None)
+            if item is None:
+                heapq.heappop(heap)
+                continue
+            self._pass = pass_
+            heapq.heapreplace(heap, (pass_ + cursor.weight, dir_id, cursor))
+            pos, word = item
+            if pos >= self.stride:
+                continue  # vượt quá stride sẽ đè index thư mục kế tiếp
+            return dir_id * self.stride + pos, cursor.prefix + word.lstrip("/")
+        raise StopIteration
+
+    def discover(self, path: str, res: ScanResult) -> Optional[str]:
+        """
+        Thêm thư mục con nếu `res` (của job `path`) là thư mục mới và chưa quá sâu.
+        Trả về path thư mục đã thêm, hoặc None.
+        """
+        directory = directory_of(path, res)
+        if directory is None or directory in self._seen:
+            return None
+        if _depth(directory) > self.max_depth:
+            return None
+        self.directories.append(directory)
+        self._push(len(self.directories), directory)
+        return directory
+
+    def restore(self, directories: Iterable[str]):
+        """
+        Nạp lại danh sách thư mục con từ checkpoint, giữ nguyên dir_id (và do đó index job).
+        """
+        for directory in directories:
+            if directory in self._seen:
+                continue
+            self.directories.append(directory)
+            self._push(len(self.directories), directory)
+
+    def _push(self, dir_id: int, directory: str):
+        self._seen.add(directory)
+        depth = _depth(directory)
+        name = directory.rstrip("/").rpartition("/")[2].lower()
+        weight = 1 << depth
+        if name in HIGH_VALUE_DIRS:
+            weight = max(1, weight // 2)
+        cursor = _Cursor(dir_id, directory, depth, weight, enumerate(self.words()))
+        heapq.heappush(self._heap, (self._pass, dir_id, cursor))
@@ -0,0 +1,724 @@
+# gui_app.py
+
+import os
+import threading
+import queue
+import time
+from collections import Counter
+from typing import List, Dict, Optional
+
+# Tkinter + matplotlib cho GUI
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+from config import (
+    DEFAULT_TIMEOUT,
+    DEFAULT_THREADS,
+    DEFAULT_ENGINE,
+    ENGINES,
+    DEFAULT_RATE,
+    DEFAULT_PER_HOST,
+    CALIBRATION_BODY_LIMIT,
+    DEFAULT_MATCH_CODES,
+    DEFAULT_WORDLIST,
+    UI_POLL_MS,
+    UI_DRAIN_BUDGET_MS,
+    UI_CHART_FPS,
+)
+from wordlist_index import open_wordlist
+from expansion import (
+    ExpansionConfig,
+    build_expansion_config,
+    expansion_factor,
+    path_stream,
+)
+from filters import build_filter_config, FILTER_KEYS
+from output import save_report, save_failed, save_stats
+from scanner import ScanEngine, create_http_client
+from ratelimit import TokenBucket, AdaptiveConcurrency
+from checkpoint import Checkpoint, wordlist_fingerprint, default_checkpoint_path
+from calibration import Calibration
+from frontier import Frontier
+from targets import ScanTarget, load_targets, parse_targets
+from shard import shard_size
+from results_view import VirtualResultsView
+from result import ScanResult
+from metrics import summary_line, format_duration
+
+
+# ====================== PHẦN GUI TKINTER ======================
+
+class WebPathScanApp:
+    def __init__(self, root: tk.Tk):
+        self.root = root
+        self.root.title("Kingsearch - Web Path Scanner")
+        self.root.geometry("1100x650")
+
+        self.status_counter: Counter = Counter()
+        self.engine = None
+        self.scan_targets: List[ScanTarget] = []
+
+        # queue để nhận kết quả từ thread scan
+        self.result_queue: "queue.Queue[ScanResult]" = queue.Queue()
+        self.is_scanning = False
+        self.scan_error: Optional[str] = None  # lỗi làm thread scan dừng giữa chừng
+
+        # progress
+        self.total_paths = 0
+        self.done_paths = 0
+
+        self._build_ui()
+        self._setup_chart()
+
+        # loop đọc queue định kỳ + vẽ biểu đồ theo FPS cố định
+        self.chart_dirty = False
+        self.root.after(UI_POLL_MS, self._process_results_from_queue)
+        self.root.after(int(1000 / UI_CHART_FPS), self._redraw_chart)
+
+    # ---------- UI ----------
+
+    def _build_ui(self):
+        main_frame = ttk.Frame(self.root)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Khung cấu hình
+        config_frame = ttk.LabelFrame(main_frame, text="Cấu hình")
+        config_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        # Progress string
+        self.progress_var = tk.StringVar(value="Progress: [0/0]")
+
+        # URL
+        ttk.Label(config_frame, text="URL:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
+        self.url_var = tk.StringVar()
+        ttk.Entry(config_frame, textvariable=self.url_var, width=50).grid(
+            row=0, column=1, padx=5, pady=2, sticky=tk.W
+        )
+        # Nhiều target: nhập cách nhau bởi dấu phẩy/khoảng trắng hoặc nạp từ file
+        ttk.Button(config_frame, text="Danh sách target...", command=self._browse_targets).grid(
+            row=1, column=3, padx=5, pady=2, sticky=tk.W
+        )
+
+        # Wordlist
+        ttk.Label(config_frame, text="Wordlist:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=2)
+        self.wordlist_var = tk.StringVar(value=DEFAULT_WORDLIST)
+        ttk.Entry(config_frame, textvariable=self.wordlist_var, width=40).grid(
+            row=1, column=1, padx=5, pady=2, sticky=tk.W
+        )
+        ttk.Button(config_frame, text="Chọn...", command=self._browse_wordlist).grid(
+            row=1, column=2, padx=5, pady=2
+        )
+
+        # Timeout
+        ttk.Label(config_frame, text="Timeout (s):").grid(row=0, column=2, sticky=tk.W, padx=5, pady=2)
+        self.timeout_var = tk.IntVar(value=DEFAULT_TIMEOUT)
+        ttk.Spinbox(
+            config_frame,
+            from_=1,
+            to=60,
+            textvariable=self.timeout_var,
+            width=5,
+        ).grid(row=0, column=3, padx=5, pady=2, sticky=tk.W)
+
+        # Threads
+        ttk.Label(config_frame, text="Threads (-t):").grid(
+            row=4, column=0, sticky=tk.W, padx=5, pady=2
+        )
+        self.threads_var = tk.IntVar(value=DEFAULT_THREADS)
+        ttk.Spinbox(
+            config_frame,
+            from_=1,
+            to=5000,
+            textvariable=self.threads_var,
+            width=5,
+        ).grid(row=4, column=1, padx=5, pady=2, sticky=tk.W)
+
+        # Engine
+        ttk.Label(config_frame, text="Engine:").grid(
+            row=4, column=2, sticky=tk.W, padx=5, pady=2
+        )
+        self.engine_var = tk.StringVar(value=DEFAULT_ENGINE)
+        ttk.Combobox(
+            config_frame,
+            values=ENGINES,
+            textvariable=self.engine_var,
+            state="readonly",
+            width=8,
+        ).grid(row=4, column=3, padx=5, pady=2, sticky=tk.W)
+
+        # Rate limit + adaptive
+        ttk.Label(config_frame, text="Rate (req/s, 0 = ∞):").grid(
+            row=5, column=0, sticky=tk.W, padx=5, pady=2
+        )
+        self.rate_var = tk.DoubleVar(value=DEFAULT_RATE)
+        ttk.Spinbox(
+            config_frame,
+            from_=0,
+            to=10000,
+            textvariable=self.rate_var,
+            width=7,
+        ).grid(row=5, column=1, padx=5, pady=2, sticky=tk.W)
+
+        self.adaptive_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            config_frame,
+            text="Adaptive (AIMD)",
+            variable=self.adaptive_var,
+        ).grid(row=5, column=2, columnspan=2, padx=5, pady=2, sticky=tk.W)
+
+        # Match codes
+        ttk.Label(config_frame, text="Match codes (-mc):").grid(
+            row=2, column=0, sticky=tk.W, padx=5, pady=2
+        )
+        self.mc_var = tk.StringVar(value=DEFAULT_MATCH_CODES)
+        ttk.Entry(config_frame, textvariable=self.mc_var, width=40).grid(
+            row=2, column=1, padx=5, pady=2, sticky=tk.W
+        )
+
+        # Filter codes
+        ttk.Label(config_frame, text="Filter codes (-fc):").grid(
+            row=3, column=0, sticky=tk.W, padx=5, pady=2
+        )
+        self.fc_var = tk.StringVar()
+        ttk.Entry(config_frame, textvariable=self.fc_var, width=40).grid(
+            row=3, column=1, padx=5, pady=2, sticky=tk.W
+        )
+
+        # Match sizes
+        ttk.Label(config_frame, text="Match sizes (-ms):").grid(
+            row=2, column=2, sticky=tk.W, padx=5, pady=2
+        )
+        self.ms_var = tk.StringVar()
+        ttk.Entry(config_frame, textvariable=self.ms_var, width=20).grid(
+            row=2, column=3, padx=5, pady=2, sticky=tk.W
+        )
+
+        # Filter sizes
+        ttk.Label(config_frame, text="Filter sizes (-fs):").grid(
+            row=3, column=2, sticky=tk.W, padx=5, pady=2
+        )
+        self.fs_var = tk.StringVar()
+        ttk.Entry(config_frame, textvariable=self.fs_var, width=20).grid(
+            row=3, column=3, padx=5, pady=2, sticky=tk.W
+        )
+
+        # Nút
+        self.start_button = ttk.Button(config_frame, text="Bắt đầu scan", command=self.start_scan)
+        self.start_button.grid(row=0, column=4, padx=10, pady=2, sticky=tk.E)
+
+        self.save_button = ttk.Button(config_frame, text="Lưu báo cáo", command=self.save_report_gui)
+        self.save_button.grid(row=1, column=4, padx=10, pady=2, sticky=tk.E)
+
+        self.stop_button = ttk.Button(
+            config_frame, text="Dừng", command=self.stop_scan, state=tk.DISABLED
+        )
+        self.stop_button.grid(row=2, column=4, padx=10, pady=2, sticky=tk.E)
+
+        self.resume_button = ttk.Button(config_frame, text="Resume...", command=self.resume_scan)
+        self.resume_button.grid(row=3, column=4, padx=10, pady=2, sticky=tk.E)
+
+        # Progress Label
+        # Extensions + backup
+        ttk.Label(config_frame, text="Extensions (-e):").grid(
+            row=6, column=0, sticky=tk.W, padx=5, pady=2
+        )
+        self.ext_var = tk.StringVar()
+        ttk.Entry(config_frame, textvariable=self.ext_var, width=40).grid(
+            row=6, column=1, padx=5, pady=2, sticky=tk.W
+        )
+
+        self.backup_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            config_frame,
+            text="Thử file backup (.bak, ~, ...)",
+            variable=self.backup_var,
+        ).grid(row=6, column=2, columnspan=2, padx=5, pady=2, sticky=tk.W)
+
+        self.ac_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            config_frame,
+            text="Tự hiệu chỉnh (-ac)",
+            variable=self.ac_var,
+        ).grid(row=6, column=4, padx=10, pady=2, sticky=tk.W)
+
+        # Scan đệ quy
+        ttk.Label(config_frame, text="Đệ quy (depth, 0 = tắt):").grid(
+            row=7, column=0, sticky=tk.W, padx=5, pady=2
+        )
+        self.depth_var = tk.IntVar(value=0)
+        ttk.Spinbox(
+            config_frame,
+            from_=0,
+            to=10,
+            textvariable=self.depth_var,
+            width=7,
+        ).grid(row=7, column=1, padx=5, pady=2, sticky=tk.W)
+
+        ttk.Label(config_frame, textvariable=self.progress_var).grid(
+            row=8, column=0, columnspan=5, sticky=tk.W, padx=5, pady=2
+        )
+
+        # Khung dưới chia đôi: trái (kết quả), phải (biểu đồ)
+        bottom_frame = ttk.Frame(main_frame)
+        bottom_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        # Kết quả
+        results_frame = ttk.LabelFrame(bottom_frame, text="Kết quả")
+        results_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
+
+        # bảng ảo: chỉ các dòng đang nhìn thấy mới thành item của Treeview
+        self.results_view = VirtualResultsView(
+            results_frame,
+            columns=(
+                ("status", "Status", 70, tk.CENTER),
+                ("length", "Length (B)", 90, tk.E),
+                ("time", "Time (ms)", 90, tk.E),
+                ("url", "URL", 400, tk.W),
+            ),
+            formatter=lambda res: (
+                res.status_code,
+                res.length,
+                f"{res.elapsed_ms:.1f}",
+                res.url,
+            ),
+        )
+        self.results_view.pack(fill=tk.BOTH, expand=True)
+        # danh sách kết quả chính là model của bảng (không giữ 2 bản)
+        self.results: List[ScanResult] = self.results_view.rows
+
+        # Khung biểu đồ
+        right_frame = ttk.Frame(bottom_frame)
+        right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+
+        # Khung hiệu năng: req/s, độ trễ, lỗi, ETA (cập nhật cùng nhịp với biểu đồ)
+        perf_frame = ttk.LabelFrame(right_frame, text="Hiệu năng")
+        perf_frame.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+        self.perf_vars: Dict[str, tk.StringVar] = {}
+        perf_fields = (
+            ("rate", "Tốc độ:"),
+            ("latency", "Độ trễ p50/p95/p99:"),
+            ("errors", "Lỗi / timeout / throttle:"),
+            ("eta", "Đã chạy / ETA:"),
+        )
+        for row, (key, label) in enumerate(perf_fields):
+            ttk.Label(perf_frame, text=label).grid(row=row, column=0, sticky=tk.W, padx=5)
+            self.perf_vars[key] = tk.StringVar(value="-")
+            ttk.Label(perf_frame, textvariable=self.perf_vars[key]).grid(
+                row=row, column=1, sticky=tk.W, padx=5
+            )
+
+        chart_frame = ttk.LabelFrame(right_frame, text="Thống kê status code")
+        chart_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+        self.chart_frame = chart_frame
+
+    def _setup_chart(self):
+        self.figure = Figure(figsize=(4, 3), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_title("Số lượng path theo status code")
+        self.ax.set_xlabel("Status code")
+        self.ax.set_ylabel("Count")
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.chart_frame)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    # ---------- Hành vi GUI ----------
+
+    def _browse_wordlist(self):
+        filename = filedialog.askopenfilename(
+            title="Chọn wordlist",
+            filetypes=(("Text files", "*.txt"), ("All files", "*.*")),
+        )
+        if filename:
+            self.wordlist_var.set(filename)
+
+    def _browse_targets(self):
+        filename = filedialog.askopenfilename(
+            title="Chọn file danh sách target",
+            filetypes=(("Text files", "*.txt"), ("All files", "*.*")),
+        )
+        if not filename:
+            return
+        try:
+            targets = load_targets(filename)
+        except OSError as e:
+            messagebox.showerror("Lỗi", f"Không đọc được file target: {e}")
+            return
+        self.url_var.set(", ".join(targets))
+
+    def _update_progress_label(self):
+        text = f"Progress: [{self.done_paths}/{self.total_paths}]"
+        if self.engine and self.engine.errors:
+            text += f"  |  Errors: {self.engine.error_summary()}"
+        if self.engine and self.engine.wildcards:
+            text += f"  |  Wildcard: {self.engine.wildcards}"
+        self.progress_var.set(text)
+
+    def stop_scan(self):
+        """
+        Dừng scan đang chạy; trạng thái được lưu vào checkpoint để resume sau.
+        """
+        self.is_scanning = False
+        if self.engine:
+            self.engine.stop()
+
+    def resume_scan(self):
+        if self.is_scanning:
+            return
+
+        filename = filedialog.askopenfilename(
+            title="Chọn file checkpoint",
+            filetypes=(("Checkpoint", "*.ckpt.json"), ("All files", "*.*")),
+        )
+        if not filename:
+            return
+
+        try:
+            checkpoint = Checkpoint.load(filename)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Lỗi", f"Không đọc được checkpoint: {e}")
+            return
+
+        # Khôi phục cấu hình từ checkpoint
+        self.url_var.set(checkpoint.target)
+        self.wordlist_var.set(checkpoint.wordlist)
+        self.mc_var.set(checkpoint.filters.get("mc") or "")
+        self.ms_var.set(checkpoint.filters.get("ms") or "")
+        self.fc_var.set(checkpoint.filters.get("fc") or "")
+        self.fs_var.set(checkpoint.filters.get("fs") or "")
+        expansion_cfg = ExpansionConfig.from_dict(checkpoint.options.get("expansion"))
+        self.ext_var.set(",".join(expansion_cfg.extensions))
+        self.backup_var.set(expansion_cfg.backup)
+        self.ac_var.set(checkpoint.options.get("ac", False))
+        self.depth_var.set(checkpoint.options.get("recursion", 0))
+
+        self.start_scan(checkpoint=checkpoint)
+
+    def start_scan(self, checkpoint: Optional[Checkpoint] = None):
+        if self.is_scanning:
+            return  # đang scan thì bỏ
+
+        targets = parse_targets(self.url_var.get())
+        if not targets:
+            messagebox.showwarning("Thiếu URL", "Vui lòng nhập URL mục tiêu.")
+            return
+
+        # Wordlist mở qua index nhị phân (mmap), không nạp cả list vào RAM
+        wordlist_path = self.wordlist_var.get().strip()
+        try:
+            words = open_wordlist(wordlist_path)
+            total = len(words)
+        except FileNotFoundError:
+            messagebox.showerror("Lỗi", f"Không tìm thấy wordlist: {wordlist_path}")
+            return
+
+        if not total:
+            messagebox.showwarning("Wordlist rỗng", "Wordlist không có đường dẫn nào.")
+            return
+
+        if checkpoint is None:
+            expansion_cfg = build_expansion_config(
+                self.ext_var.get().strip() or None,
+                None,
+                None,
+                None,
+                self.backup_var.get(),
+            )
+        else:
+            expansion_cfg = ExpansionConfig.from_dict(checkpoint.options.get("expansion"))
+        if not expansion_cfg.is_empty():
+            total *= expansion_factor(expansion_cfg)
+        capacity = total
+
+        # checkpoint của CLI: dựng lại đúng luồng path (--dedup, --order smart, --top, --shard)
+        # để index trong bitmap trỏ đúng path đã scan
+        options = checkpoint.options if checkpoint is not None else {}
+        dedup = options.get("dedup") or "none"
+        priority = options.get("priority")
+        top = options.get("top")
+        shard = tuple(options["shard"]) if options.get("shard") else None
+        if top:
+            total = min(total, top)
+
+        def make_paths():
+            return path_stream(wordlist_path, words, expansion_cfg, dedup, capacity, priority, top)
+
+        depth = self.depth_var.get()
+        calibrate = self.ac_var.get()
+        filters = {
+            "mc": self.mc_var.get().strip() or None,
+            "ms": self.ms_var.get().strip() or None,
+            "fc": self.fc_var.get().strip() or None,
+            "fs": self.fs_var.get().strip() or None,
+        }
+        if checkpoint is not None:
+            # giữ các filter chỉ có trên CLI (-mw, -mr, -mt, ...) của checkpoint
+            filters = dict(checkpoint.filters, **filters)
+
+        if checkpoint is not None and not checkpoint.verify_wordlist():
+            messagebox.showerror("Lỗi", "Wordlist đã thay đổi so với lúc lưu checkpoint.")
+            return
+
+        # Mỗi target có checkpoint, frontier và calibration riêng
+        scan_targets = []
+        for url in targets:
+            target_checkpoint = checkpoint or Checkpoint(
+                path=default_checkpoint_path(url),
+                target=url,
+                wordlist=wordlist_path,
+                fingerprint=wordlist_fingerprint(wordlist_path),
+                filters=filters,
+                options={
+                    "dedup": "none",
+                    "expansion": expansion_cfg.to_dict(),
+                    "ac": calibrate,
+                    "recursion": depth,
+                    "stride": total,
+                },
+            )
+            if depth > 0:
+                stride = target_checkpoint.options.get("stride", total)
+                paths = Frontier(make_paths, stride=stride, max_depth=depth)
+            else:
+                paths = make_paths()
+            scan_targets.append(
+                ScanTarget(
+                    url,
+                    paths,
+                    checkpoint=target_checkpoint,
+                    calibration=Calibration() if calibrate else None,
+                    shard=shard,
+                )
+            )
+
+        # Tạo cấu hình matcher/filter
+        try:
+            cfg = build_filter_config(
+                default_mc_str=DEFAULT_MATCH_CODES,
+                **{f"{key}_str": filters.get(key) for key in FILTER_KEYS},
+            )
+        except ValueError as e:
+            messagebox.showerror("Lỗi", str(e))
+            return
+
+        threads = self.threads_var.get()
+        try:
+            client = create_http_client(
+                self.engine_var.get(),
+                self.timeout_var.get(),
+                threads,
+                body_limit=CALIBRATION_BODY_LIMIT if calibrate or cfg.needs_body else 0,
+                hosts=len(targets),
+            )
+        except RuntimeError as e:
+            messagebox.showerror("Lỗi", str(e))
+            return
+        rate = self.rate_var.get()
+        self.engine = ScanEngine(
+            client,
+            cfg,
+            threads=threads,
+            rate_limiter=TokenBucket(rate) if rate > 0 else None,
+            adaptive=AdaptiveConcurrency(threads) if self.adaptive_var.get() else None,
+        )
+
+        # Reset dữ liệu cũ
+        self.status_counter.clear()
+        self.results_view.clear()
+        self._update_chart()
+
+        # thiết lập progress
+        self.total_paths = shard_size(total, shard) * len(scan_targets)
+        self.done_paths = sum(target.done for target in scan_targets)
+        self._update_progress_label()
+
+        self.scan_targets = scan_targets
+
+        # kết quả đã có từ lần scan trước (khi resume)
+        for target in scan_targets:
+            for _, res in target.found:
+                self.result_queue.put(res)
+
+        self.is_scanning = True
+        self.scan_error = None
+        self.start_button.config(state=tk.DISABLED)
+        self.resume_button.config(state=tk.DISABLED)
+        self.stop_button.config(state=tk.NORMAL)
+
+        def on_progress(done: int):
+            self.done_paths = done  # cập nhật số đã xử lý
+            if depth > 0:
+                # mỗi thư mục con tìm được thêm 1 lượt wordlist
+                self.total_paths = total * sum(
+                    1 + len(target.frontier.directories) for target in scan_targets
+                )
+            if not self.is_scanning:
+                self.engine.stop()
+
+        def worker():
+            try:
+                self.engine.run_many(
+                    scan_targets,
+                    on_result=self.result_queue.put,
+                    on_progress=on_progress,
+                    per_host=DEFAULT_PER_HOST if len(scan_targets) > 1 else None,
+                )
+                for target in scan_targets:
+                    if not self.engine.stopped and not target.failed:
+                        target.checkpoint.remove()
+            except Exception as e:
+                # target/wordlist lỗi, client thiếu thư viện...: báo lên UI thay vì treo ở trạng thái scan
+                self.scan_error = str(e) or type(e).__name__
+            finally:
+                # báo kết thúc (luôn gửi, kể cả khi lỗi)
+                self.result_queue.put(None)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _process_results_from_queue(self):
+        """
+        Hàm này chạy trong main thread, lấy kết quả từ queue & update UI.
+        Được gọi định kỳ bằng root.after().
+        Mỗi tick chỉ lấy trong UI_DRAIN_BUDGET_MS rồi thêm cả lô vào bảng 1 lần;
+        biểu đồ chỉ đánh dấu cần vẽ lại, _redraw_chart vẽ theo UI_CHART_FPS.
+        """
+        batch = []
+        finished = False
+        deadline = time.perf_counter() + UI_DRAIN_BUDGET_MS / 1000.0
+        try:
+            while time.perf_counter() < deadline:
+                item = self.result_queue.get_nowait()
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+                self.status_counter[item.status_code] += 1
+        except queue.Empty:
+            pass
+
+        if batch:
+            self.results_view.extend(batch)
+            self.chart_dirty = True
+
+        if finished:
+            self._on_scan_finished()
+
+        # cập nhật progress mỗi lần tick
+        self._update_progress_label()
+
+        # còn kết quả trong queue (hết budget) => tick tiếp ngay khi Tk rảnh
+        if not self.result_queue.empty():
+            delay = 1
+        else:
+            # nếu vẫn đang scan thì poll nhanh hơn
+            delay = UI_POLL_MS if self.is_scanning else 200
+        self.root.after(delay, self._process_results_from_queue)
+
+    def _on_scan_finished(self):
+        self.is_scanning = False
+        self.start_button.config(state=tk.NORMAL)
+        self.resume_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        if self.engine and not self.engine.stopped and self.scan_error is None:
+            # total đếm trước là cận trên (dòng trống/comment) => chốt số thật
+            self.total_paths = self.done_paths
+
+        # vẽ biểu đồ lần cuối trước khi hiện hộp thoại (hộp thoại chặn vòng lặp Tk)
+        self._redraw_chart(reschedule=False)
+        self._update_progress_label()
+
+        if self.scan_error is not None:
+            messagebox.showerror(
+                "Lỗi",
+                f"Scan bị dừng do lỗi: {self.scan_error}\n"
+                f"Tìm được {len(self.results)} kết quả trước khi lỗi.",
+            )
+        elif self.engine and self.engine.stopped:
+            paths = "\n".join(t.checkpoint.path for t in self.scan_targets)
+            messagebox.showinfo(
+                "Đã dừng",
+                f"Đã dừng scan. Tìm được {len(self.results)} kết quả.\n"
+                f"Checkpoint:\n{paths}",
+            )
+        else:
+            messagebox.showinfo(
+                "Hoàn thành",
+                f"Scan xong. Tìm được {len(self.results)} kết quả.\n"
+                f"Kết nối: {self.engine.http_client.stats.summary()}\n"
+                f"Hiệu năng: {summary_line(self.engine.stats.snapshot(self.done_paths, self.total_paths))}",
+            )
+
+    def _redraw_chart(self, reschedule: bool = True):
+        """
+        Vẽ lại biểu đồ nếu có kết quả mới, tối đa UI_CHART_FPS lần/giây
+        (vẽ matplotlib tốn vài chục ms, không thể vẽ theo từng kết quả).
+        """
+        if self.chart_dirty:
+            self.chart_dirty = False
+            self._update_chart()
+        if self.is_scanning or not reschedule:
+            self._update_perf_panel()
+        if reschedule:
+            self.root.after(int(1000 / UI_CHART_FPS), self._redraw_chart)
+
+    def _update_perf_panel(self):
+        if not self.engine:
+            return
+        snap = self.engine.stats.snapshot(self.done_paths, self.total_paths)
+        lat = snap["latency_ms"]
+        self.perf_vars["rate"].set(
+            f"{snap['req_per_s']:.1f} req/s (TB {snap['avg_req_per_s']:.1f}), {snap['requests']} request"
+        )
+        self.perf_vars["latency"].set(
+            "chưa có" if lat["p50"] is None
+            else f"{lat['p50']:.1f} / {lat['p95']:.1f} / {lat['p99']:.1f} ms (max {lat['max']:.1f})"
+        )
+        self.perf_vars["errors"].set(
+            f"{snap['error_rate'] * 100:.2f}% / {snap['timeout_rate'] * 100:.2f}% / "
+            f"{snap['throttled_rate'] * 100:.2f}% ({snap['errors']} / {snap['timeouts']} / {snap['throttled']})"
+        )
+        self.perf_vars["eta"].set(
+            f"{format_duration(snap['elapsed_s'])} / {format_duration(snap['eta_s'])}"
+        )
+
+    def _update_chart(self):
+        self.ax.clear()
+        self.ax.set_title("Số lượng path theo status code")
+        self.ax.set_xlabel("Status code")
+        self.ax.set_ylabel("Count")
+
+        if self.status_counter:
+            codes = sorted(self.status_counter.keys())
+            counts = [self.status_counter[c] for c in codes]
+            self.ax.bar([str(c) for c in codes], counts)
+
+        self.canvas.draw_idle()
+
+    def save_report_gui(self):
+        if not self.results:
+            messagebox.showwarning("Chưa có dữ liệu", "Chưa có kết quả để lưu.")
+            return
+
+        # mỗi target 1 report (+ danh sách path lỗi nếu có), theo thứ tự wordlist
+        # (target.results), không theo thứ tự kết quả về bảng
+        filenames = []
+        for target in self.scan_targets:
+            filename = save_report(target.results, target.url)
+            if target.failed:
+                save_failed(target.failures, filename)
+            filenames.append(filename)
+        stats_file = self._save_stats(filenames[0])
+        if len(filenames) > 1:
+            messagebox.showinfo("Đã lưu", "Đã lưu báo cáo:\n" + "\n".join(filenames + [stats_file]))
+        else:
+            messagebox.showinfo("Đã lưu", f"Đã lưu báo cáo: {filenames[0]}\nThống kê: {stats_file}")
+
+    def _save_stats(self, report_file: str) -> str:
+        """
+        Lưu số liệu hiệu năng cạnh report: report_xxx.txt -> report_xxx_stats.json.
+        """
+        snap = self.engine.stats.snapshot(self.done_paths, self.total_paths)
+        return save_stats(snap, os.path.splitext(report_file)[0] + "_stats.json")
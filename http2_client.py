@@ -0,0 +1,147 @@
+# http2_client.py
+
+import time
+from typing import Optional, Dict, Sequence, Tuple
+
+try:
+    import httpx
+except ImportError:  # httpx[http2] là dependency tuỳ chọn, chỉ cần cho --http2
+    httpx = None
+
+from config import (
+    STREAM_CHUNK_SIZE,
+    STREAM_DRAIN_LIMIT,
+    HEAD_FALLBACK_CODES,
+    KEEPALIVE_TIMEOUT,
+    DEFAULT_KEEP_HEADERS,
+)
+from http_client import HttpClient, trusted_length
+from pooling import ConnectionStats
+from result import ScanResult, HeaderPolicy
+from session import SessionTemplate
+
+
+class Http2Client:
+    """
+    Client HTTP/2 (httpx + h2) cho engine thread, cùng "hợp đồng" kết quả với HttpClient.
+    Với target hỗ trợ HTTP/2 (ALPN qua TLS), nhiều worker dùng chung một kết nối
+    và gửi request song song trên các stream; target chỉ có HTTP/1.1 vẫn chạy bình thường.
+    Các tuỳ chọn stream/max_body/head_first/body_limit giống HttpClient.
+    Mọi worker dùng chung 1 client (để multiplex) dựng từ `template`: header/cookie/auth
+    gán 1 lần, 1 User-Agent ngẫu nhiên cho cả client; SOCKS cần "httpx[socks]".
+    """
+
+    def __init__(
+        self,
+        timeout: int = 10,
+        pool_size: int = 10,
+        stream: bool = False,
+        max_body: Optional[int] = None,
+        head_first: bool = False,
+        body_limit: int = 0,
+        hosts: int = 1,
+        keep_headers: Optional[Sequence[str]] = DEFAULT_KEEP_HEADERS,
+        template: Optional[SessionTemplate] = None,
+    ):
+        if httpx is None:
+            raise RuntimeError(
+                'HTTP/2 cần thư viện httpx + h2: pip install "httpx[http2]"'
+            )
+        template = template or SessionTemplate()
+        if template.socks:
+            try:
+                import socksio  # noqa: F401
+            except ImportError:
+                raise RuntimeError('SOCKS proxy với --http2 cần: pip install "httpx[socks]"') from None
+        self.timeout = timeout
+        self.stream = stream or max_body is not None
+        self.max_body = max_body
+        self.head_first = head_first
+        self.body_limit = body_limit
+        self.stats = ConnectionStats()
+        self.header_policy = HeaderPolicy(keep_headers)
+        self.session = httpx.Client(
+            http2=True,
+            timeout=timeout,
+            follow_redirects=False,
+            headers=template.worker_headers(),
+            proxy=template.proxy,
+            limits=httpx.Limits(
+                max_connections=max(1, pool_size) * max(1, hosts),
+                max_keepalive_connections=max(1, pool_size) * max(1, hosts),
+                keepalive_expiry=KEEPALIVE_TIMEOUT,
+            ),
+        )
+        # trace của httpcore báo từng bước kết nối => đếm kết nối TCP/TLS mới
+        self._extensions = {"trace": self._trace}
+
+    # Các exception mạng mà fetch() có thể ném ra (để engine retry/đếm lỗi)
+    errors = (httpx.HTTPError, httpx.StreamError) if httpx else ()
+
+    def _trace(self, event: str, info: Dict):
+        if event == "connection.connect_tcp.complete":
+            self.stats.add(connections=1)
+        elif event == "connection.start_tls.complete":
+            self.stats.add(tls_handshakes=1)
+
+    def get(self, url: str) -> Optional[ScanResult]:
+        """
+        Gửi 1 request GET, trả về ScanResult hoặc None nếu lỗi.
+        """
+        try:
+            return self.fetch(url)
+        except self.errors:
+            return None
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> ScanResult:
+        """
+        Giống get() nhưng ném exception khi lỗi mạng thay vì trả None.
+        `headers`: header thêm vào request (vd If-None-Match khi --diff).
+        """
+        if self.head_first:
+            start = time.time()
+            self.stats.add(requests=1)
+            resp = self.session.head(url, headers=headers, extensions=self._extensions)
+            length = trusted_length(resp.headers)
+            if length is not None and resp.status_code not in HEAD_FALLBACK_CODES:
+                return self._result(url, resp, length, start)
+
+        start = time.time()
+        self.stats.add(requests=1)
+        if not self.stream:
+            resp = self.session.get(url, headers=headers, extensions=self._extensions)
+            length = len(resp.content)
+            body = resp.content[:self.body_limit] if self.body_limit else None
+        else:
+            with self.session.stream("GET", url, headers=headers, extensions=self._extensions) as resp:
+                length, body = self._stream_body(resp)
+
+        return self._result(url, resp, length, start, body)
+
+    # cùng cách dựng ScanResult với HttpClient (httpx cũng có resp.status_code)
+    _result = HttpClient._result
+
+    def _stream_body(self, resp) -> Tuple[int, Optional[bytes]]:
+        """
+        Đếm kích thước body mà không giữ body trong bộ nhớ
+        (chỉ giữ `body_limit` byte đầu nếu được yêu cầu).
+        """
+        limit = self.body_limit
+        length = trusted_length(resp.headers)
+        if length is not None and not limit and length > STREAM_DRAIN_LIMIT:
+            return length, None
+
+        kept = bytearray()
+        counted = 0
+        for chunk in resp.iter_bytes(STREAM_CHUNK_SIZE):
+            counted += len(chunk)
+            if len(kept) < limit:
+                kept += chunk[:limit - len(kept)]
+            if length is not None:
+                if len(kept) >= limit and length - counted > STREAM_DRAIN_LIMIT:
+                    break
+            elif self.max_body is not None and counted >= self.max_body:
+                counted = self.max_body
+                break
+
+        return (length if length is not None else counted), (bytes(kept) if limit else None)
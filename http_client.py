@@ -1,36 +1,178 @@
 # http_client.py
 
+import os
+import threading
 import time
-from typing import Optional, Dict
+from typing import Dict, Optional, Sequence, Tuple
 
 import requests
 
+from config import (
+    STREAM_CHUNK_SIZE,
+    STREAM_DRAIN_LIMIT,
+    HEAD_FALLBACK_CODES,
+    DEFAULT_KEEP_HEADERS,
+)
+from pooling import ConnectionStats, TunedHTTPAdapter
+from result import ScanResult, HeaderPolicy, make_result
+from session import SessionTemplate
+
+
+def trusted_length(headers) -> Optional[int]:
+    """
+    Lấy kích thước body từ Content-Length nếu tin được.
+    Không tin khi body bị nén (Content-Encoding) vì length ta báo cáo là
+    số byte sau giải nén, giống len(resp.content).
+    """
+    value = headers.get("Content-Length")
+    if value is None or not value.strip().isdigit():
+        return None
+    encoding = headers.get("Content-Encoding", "identity").strip().lower()
+    if encoding not in ("", "identity"):
+        return None
+    return int(value)
+
 
 class HttpClient:
     """
-    Client HTTP đơn giản, không dùng thread ở đây.
+    Client HTTP đơn giản. Mỗi worker thread của ScanEngine có 1 requests.Session
+    riêng dựng từ `template` (header/cookie/auth/User-Agent/proxy gán 1 lần khi
+    worker gửi request đầu tiên), các session dùng chung 1 adapter nên pool kết nối
+    được nới theo số thread (`pool_size`) và số host (`hosts`); kết nối giữ keep-alive,
+    TLS session được resume. `stats` đếm request / kết nối mới / TLS handshake.
+    - stream: không buffer body, chỉ đếm số byte (hoặc dùng Content-Length)
+    - max_body: số byte tối đa đọc mỗi body ở chế độ stream
+    - head_first: thử HEAD trước, chỉ GET khi HEAD không cho biết size
+    - body_limit: > 0 thì giữ tối đa bấy nhiêu byte đầu body trong result.body
+      (cho auto-calibration / phân tích nội dung); engine bỏ body trước khi lưu kết quả
+    - keep_headers: header giữ lại trong kết quả (None = tất cả), xem HeaderPolicy
+    - template: SessionTemplate (-H, -b, --auth, -x, --random-agent), None = không thêm gì
     """
 
-    def __init__(self, timeout: int = 10):
+    def __init__(
+        self,
+        timeout: int = 10,
+        pool_size: int = 10,
+        stream: bool = False,
+        max_body: Optional[int] = None,
+        head_first: bool = False,
+        body_limit: int = 0,
+        hosts: int = 1,
+        keep_headers: Optional[Sequence[str]] = DEFAULT_KEEP_HEADERS,
+        template: Optional[SessionTemplate] = None,
+    ):
         self.timeout = timeout
-        self.session = requests.Session()
+        self.stream = stream or max_body is not None
+        self.max_body = max_body
+        self.head_first = head_first
+        self.body_limit = body_limit
+        self.stats = ConnectionStats()
+        self.header_policy = HeaderPolicy(keep_headers)
+        self.template = template or SessionTemplate()
+        if self.template.socks:
+            try:
+                import socks  # noqa: F401  (PySocks, urllib3 cần để nối qua SOCKS)
+            except ImportError:
+                raise RuntimeError('SOCKS proxy cần thư viện PySocks: pip install "requests[socks]"') from None
+
+        proxy = self.template.proxy
+        # requests đọc lại proxy / .netrc / CA bundle từ môi trường cho từng request khi
+        # trust_env; ở đây chỉ giữ cách đó khi môi trường có proxy (cần NO_PROXY theo host)
+        self._trust_env = not proxy and bool(requests.utils.getproxies())
+        self._proxies = {"http": proxy, "https": proxy} if proxy else {}
+        self._verify = os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get("CURL_CA_BUNDLE") or True
+        self._adapter = TunedHTTPAdapter(pool_size=pool_size, hosts=hosts, stats=self.stats)
+        self._local = threading.local()
 
-    def get(self, url: str) -> Optional[Dict]:
+    @property
+    def session(self) -> requests.Session:
         """
-        Gửi 1 request GET, trả về dict mô tả kết quả hoặc None nếu lỗi.
+        Session của worker thread đang gọi (tạo ở lần gọi đầu tiên).
         """
         try:
-            start = time.time()
-            resp = self.session.get(url, timeout=self.timeout, allow_redirects=False)
-            elapsed_ms = (time.time() - start) * 1000.0
-
-            return {
-                "url": url,
-                "status_code": resp.status_code,
-                "length": len(resp.content),
-                "headers": dict(resp.headers),
-                "elapsed_ms": elapsed_ms,
-                "location": resp.headers.get("Location"),
-            }
-        except requests.RequestException:
+            return self._local.session
+        except AttributeError:
+            session = self._local.session = self._new_session()
+            return session
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        session.mount("http://", self._adapter)
+        session.mount("https://", self._adapter)
+        session.headers.update(self.template.worker_headers())
+        session.trust_env = self._trust_env
+        if not self._trust_env:
+            session.proxies = self._proxies
+            session.verify = self._verify
+        return session
+
+    # Các exception mạng mà fetch() có thể ném ra (để engine retry/đếm lỗi)
+    errors = (requests.RequestException,)
+
+    def get(self, url: str) -> Optional[ScanResult]:
+        """
+        Gửi 1 request GET, trả về ScanResult hoặc None nếu lỗi.
+        """
+        try:
+            return self.fetch(url)
+        except self.errors:
             return None
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> ScanResult:
+        """
+        Giống get() nhưng ném exception khi lỗi mạng thay vì trả None.
+        `headers`: header thêm vào request (vd If-None-Match khi --diff).
+        """
+        session = self.session
+        if self.head_first:
+            start = time.time()
+            resp = session.head(url, headers=headers, timeout=self.timeout, allow_redirects=False)
+            resp.close()
+            length = trusted_length(resp.headers)
+            if length is not None and resp.status_code not in HEAD_FALLBACK_CODES:
+                return self._result(url, resp, length, start)
+
+        start = time.time()
+        if not self.stream:
+            resp = session.get(url, headers=headers, timeout=self.timeout, allow_redirects=False)
+            length = len(resp.content)
+            body = resp.content[:self.body_limit] if self.body_limit else None
+        else:
+            resp = session.get(
+                url, headers=headers, timeout=self.timeout, allow_redirects=False, stream=True
+            )
+            length, body = self._stream_body(resp)
+
+        return self._result(url, resp, length, start, body)
+
+    def _stream_body(self, resp) -> Tuple[int, Optional[bytes]]:
+        """
+        Đếm kích thước body mà không giữ body trong bộ nhớ
+        (chỉ giữ `body_limit` byte đầu nếu được yêu cầu).
+        """
+        limit = self.body_limit
+        length = trusted_length(resp.headers)
+        if length is not None and not limit and length > STREAM_DRAIN_LIMIT:
+            resp.close()
+            return length, None
+
+        kept = bytearray()
+        counted = 0
+        for chunk in resp.iter_content(STREAM_CHUNK_SIZE):
+            counted += len(chunk)
+            if len(kept) < limit:
+                kept += chunk[:limit - len(kept)]
+            if length is not None:
+                # size đã biết: chỉ đọc tới khi đủ phần body cần giữ,
+                # phần còn lại nhỏ thì đọc nốt để giữ kết nối keep-alive
+                if len(kept) >= limit and length - counted > STREAM_DRAIN_LIMIT:
+                    break
+            elif self.max_body is not None and counted >= self.max_body:
+                counted = self.max_body
+                break
+        resp.close()
+
+        return (length if length is not None else counted), (bytes(kept) if limit else None)
+
+    def _result(self, url: str, resp, length: int, start: float, body: bytes = None) -> ScanResult:
+        return make_result(url, resp.status_code, resp.headers, length, start, self.header_policy, body)
@@ -0,0 +1,301 @@
+# metrics.py
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import STATS_WINDOW, STATS_PRECISION_BITS, THROTTLE_CODES
+from result import ScanResult
+
+
+class LatencyHistogram:
+    """
+    Histogram độ trễ kiểu HDR: bucket log-tuyến tính trên giá trị micro giây.
+    Mỗi lũy thừa của 2 chia thành 2^(bits-1) bucket => sai số tương đối < 2^-(bits-1)
+    (bits=7: < 1.6%), bộ nhớ cố định vài KB dù ghi bao nhiêu mẫu.
+    Không tự khoá: ScanStats gọi dưới lock của nó.
+    """
+
+    def __init__(self, bits: int = STATS_PRECISION_BITS):
+        self.bits = bits
+        self.half = 1 << (bits - 1)
+        self.counts: List[int] = []
+        self.total = 0
+        self.max_us = 0
+
+    def _index(self, value: int) -> int:
+        exp = max(0, value.bit_length() - self.bits)
+        return exp * self.half + (value >> exp)
+
+    def _value(self, index: int) -> int:
+        # giá trị giữa bucket (dùng khi báo percentile)
+        exp = max(0, index // self.half - 1)
+        return ((index - exp * self.half) << exp) + ((1 << exp) >> 1)
+
+    def record(self, elapsed_ms: float):
+        value = max(0, int(elapsed_ms * 1000))
+        idx = self._index(value)
+        if idx >= len(self.counts):
+            self.counts.extend([0] * (idx + 1 - len(self.counts)))
+        self.counts[idx] += 1
+        self.total += 1
+        if value > self.max_us:
+            self.max_us = value
+
+    def merge(self, counts: List[int], max_us: int):
+        """
+        Cộng histogram khác (cùng `bits`, vd của 1 shard) vào histogram này.
+        """
+        if len(counts) > len(self.counts):
+            self.counts.extend([0] * (len(counts) - len(self.counts)))
+        for idx, count in enumerate(counts):
+            self.counts[idx] += count
+        self.total += sum(counts)
+        self.max_us = max(self.max_us, max_us)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Độ trễ (ms) mà q% request không vượt quá, None nếu chưa có mẫu.
+        """
+        if not self.total:
+            return None
+        rank = max(1, int(round(self.total * q / 100.0)))
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._value(idx), self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+
+class RollingRate:
+    """
+    Đếm sự kiện/giây trên cửa sổ trượt `window` giây (vòng bucket 1 giây).
+    """
+
+    def __init__(self, window: int = STATS_WINDOW):
+        self.window = window
+        self.start = time.monotonic()
+        self._seconds = [-1] * window
+        self._counts = [0] * window
+
+    def add(self, n: int = 1, now: Optional[float] = None):
+        sec = int(now if now is not None else time.monotonic())
+        i = sec % self.window
+        if self._seconds[i] != sec:
+            self._seconds[i] = sec
+            self._counts[i] = 0
+        self._counts[i] += n
+
+    def rate(self, now: Optional[float] = None) -> float:
+        now = now if now is not None else time.monotonic()
+        sec = int(now)
+        total = sum(
+            count
+            for second, count in zip(self._seconds, self._counts)
+            if sec - second < self.window
+        )
+        # giây hiện tại mới chạy được 1 phần; lúc mới bắt đầu thì cửa sổ ngắn hơn
+        span = min(now - self.start, self.window - 1 + (now - sec))
+        return total / span if span > 0 else 0.0
+
+
+class ScanStats:
+    """
+    Số liệu hiệu năng của 1 lượt scan, ghi từ nhiều worker:
+    - request/giây (cửa sổ trượt STATS_WINDOW giây) và trung bình cả lượt
+    - percentile độ trễ p50/p95/p99 (LatencyHistogram, từ `elapsed_ms`)
+    - tỉ lệ lỗi (lỗi mạng + response 429/503 bị throttle, như engine.error_summary),
+      timeout và throttle trên tổng số lần gửi (kể cả lần retry)
+    - ETA dựa trên tốc độ path xong gần đây
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.requests = 0      # số lần gửi (kể cả retry)
+        self.errors = 0        # lần gửi lỗi mạng hoặc bị throttle
+        self.timeouts = 0
+        self.throttled = 0     # response 429/503
+        self.latency = LatencyHistogram()
+        self.request_rate = RollingRate()
+        self.done_rate = RollingRate()
+        self._lock = threading.Lock()
+
+    def observe(self, res: Optional[ScanResult], error: Optional[str]):
+        """
+        Ghi 1 lần gửi request: response (lấy elapsed_ms) hoặc loại lỗi.
+        """
+        with self._lock:
+            self.requests += 1
+            self.request_rate.add()
+            if res is not None:
+                self.latency.record(res.elapsed_ms)
+                if res.status_code in THROTTLE_CODES:
+                    self.errors += 1
+                    self.throttled += 1
+            else:
+                self.errors += 1
+                if error == "timeout":
+                    self.timeouts += 1
+
+    def complete(self):
+        """
+        Ghi 1 path đã xong (dùng cho ETA).
+        """
+        with self._lock:
+            self.done_rate.add()
+
+    def snapshot(self, done: int = 0, total: int = 0) -> Dict:
+        """
+        Dict số liệu hiện tại (cũng là nội dung file JSON xuất cuối scan).
+        """
+        with self._lock:
+            return _snapshot(
+                time.time() - self.started,
+                self.requests,
+                self.request_rate.rate(),
+                self.done_rate.rate(),
+                self.latency,
+                self.errors,
+                self.timeouts,
+                self.throttled,
+                done,
+                total,
+            )
+
+    def export(self) -> Dict:
+        """
+        Trạng thái cộng dồn (đếm, tốc độ, histogram) để tiến trình khác gộp lại
+        bằng merge_stats (scan chia shard).
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "throttled": self.throttled,
+                "req_per_s": self.request_rate.rate(),
+                "done_per_s": self.done_rate.rate(),
+                "latency": {"counts": list(self.latency.counts), "max_us": self.latency.max_us},
+            }
+
+
+def merge_stats(states: List[Dict], elapsed: float, done: int = 0, total: int = 0) -> Dict:
+    """
+    Gộp ScanStats.export() của nhiều shard thành 1 snapshot (cùng dạng
+    ScanStats.snapshot): cộng số đếm và tốc độ, gộp histogram độ trễ.
+    `elapsed`: thời gian chạy (giây) của cả lượt scan.
+    """
+    latency = LatencyHistogram()
+    for state in states:
+        latency.merge(state["latency"]["counts"], state["latency"]["max_us"])
+    return _snapshot(
+        elapsed,
+        sum(state["requests"] for state in states),
+        sum(state["req_per_s"] for state in states),
+        sum(state["done_per_s"] for state in states),
+        latency,
+        sum(state["errors"] for state in states),
+        sum(state["timeouts"] for state in states),
+        sum(state["throttled"] for state in states),
+        done,
+        total,
+    )
+
+
+def _snapshot(
+    elapsed: float,
+    requests: int,
+    req_per_s: float,
+    done_rate: float,
+    latency: LatencyHistogram,
+    errors: int,
+    timeouts: int,
+    throttled: int,
+    done: int,
+    total: int,
+) -> Dict:
+    remaining = max(0, total - done)
+    if not remaining:
+        eta = 0.0 if total else None
+    else:
+        eta = remaining / done_rate if done_rate > 0 else None
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "done": done,
+        "total": total,
+        "requests": requests,
+        "req_per_s": round(req_per_s, 1),
+        "avg_req_per_s": round(requests / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": _round(latency.percentile(50)),
+            "p95": _round(latency.percentile(95)),
+            "p99": _round(latency.percentile(99)),
+            "max": _round(latency.max_us / 1000.0 if latency.total else None),
+        },
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "timeouts": timeouts,
+        "timeout_rate": round(timeouts / requests, 4) if requests else 0.0,
+        "throttled": throttled,
+        "throttled_rate": round(throttled / requests, 4) if requests else 0.0,
+        "eta_s": round(eta, 1) if eta is not None else None,
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """
+    65 -> "01:05", 3725 -> "1:02:05", None -> "--:--".
+    """
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value:.1f}" if value is not None else "-"
+
+
+def _errors(snap: Dict) -> str:
+    # tỉ lệ lỗi chung (lỗi mạng + 429/503), trong đó timeout / throttle
+    return (
+        f"{snap['error_rate'] * 100:.2f}% (timeout {snap['timeout_rate'] * 100:.2f}%, "
+        f"throttled {snap['throttled_rate'] * 100:.2f}%)"
+    )
+
+
+def status_line(snap: Dict) -> str:
+    """
+    1 dòng trạng thái cho CLI, vd
+    "[*] 1200/5000 | 350.2 req/s | p50 12.0 p95 40.1 p99 80.3 ms | err 0.10% (timeout 0.00%, throttled 0.05%) | ETA 00:11".
+    """
+    lat = snap["latency_ms"]
+    return (
+        f"[*] {snap['done']}/{snap['total']} | {snap['req_per_s']:.1f} req/s | "
+        f"p50 {_ms(lat['p50'])} p95 {_ms(lat['p95'])} p99 {_ms(lat['p99'])} ms | "
+        f"err {_errors(snap)} | ETA {format_duration(snap['eta_s'])}"
+    )
+
+
+def summary_line(snap: Dict) -> str:
+    """
+    Tóm tắt cuối scan, vd
+    "5000 requests in 00:12 (406.5 req/s) | p50 12.0 p95 40.1 p99 80.3 max 210.0 ms | err 0.10% (timeout 0.00%, throttled 0.05%)".
+    """
+    lat = snap["latency_ms"]
+    return (
+        f"{snap['requests']} requests in {format_duration(snap['elapsed_s'])} "
+        f"({snap['avg_req_per_s']:.1f} req/s) | "
+        f"p50 {_ms(lat['p50'])} p95 {_ms(lat['p95'])} p99 {_ms(lat['p99'])} "
+        f"max {_ms(lat['max'])} ms | "
+        f"err {_errors(snap)}"
+    )
@@ -1,24 +1,52 @@
 # output.py
 
 import os
+import json
 import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from config import REPORTS_DIR
+from result import ScanResult, NEW, CHANGED, UNCHANGED, REMOVED
 
 
-def print_result(result: Dict):
+# Ký hiệu đầu dòng theo ScanResult.change (--diff)
+CHANGE_MARKS = {NEW: "+", CHANGED: "~", REMOVED: "-", UNCHANGED: "="}
+
+
+def analysis_note(result: ScanResult) -> str:
     """
-    In 1 dòng kết quả ra màn hình CLI.
+    Phần thêm vào cuối dòng kết quả khi --analyze: title và tên các chuỗi đáng chú ý,
+    vd '  "Admin login" {stack-trace, aws-key}'.
     """
-    status = result["status_code"]
-    length = result["length"]
-    elapsed = result["elapsed_ms"]
-    url = result["url"]
-    print(f"[{status}] {length:6d}B {elapsed:7.1f}ms  {url}")
+    info = result.analysis
+    if not info:
+        return ""
+    note = ""
+    if info.get("title"):
+        note += f'  "{info["title"]}"'
+    if info.get("findings"):
+        note += "  {" + ", ".join(info["findings"]) + "}"
+    return note
 
 
-def save_report(results: List[Dict], target_url: str) -> str:
+def print_result(result: ScanResult, was: Optional[ScanResult] = None):
+    """
+    In 1 dòng kết quả ra màn hình CLI (khi --diff có thêm ký hiệu +/~/- và
+    giá trị cũ `was` của path changed; khi --analyze có thêm title/chuỗi đáng chú ý).
+    """
+    status = result.status_code
+    length = result.length
+    elapsed = result.elapsed_ms
+    url = result.url
+    line = f"[{status}] {length:6d}B {elapsed:7.1f}ms  {url}"
+    if result.change:
+        line = f"{CHANGE_MARKS[result.change]} {line}"
+    if was is not None:
+        line += f"  (was [{was.status_code}] {was.length}B)"
+    print(line + analysis_note(result))
+
+
+def save_report(results: List[ScanResult], target_url: str) -> str:
     """
     Lưu kết quả vào file .txt trong thư mục reports/.
     """
@@ -33,9 +61,64 @@ def save_report(results: List[Dict], target_url: str) -> str:
         f.write(f"Total results: {len(results)}\n\n")
         for r in results:
             line = (
-                f"[{r['status_code']}] {r['length']}B "
-                f"{r['elapsed_ms']:.1f}ms {r['url']}\n"
+                f"[{r.status_code}] {r.length}B "
+                f"{r.elapsed_ms:.1f}ms {r.url}{analysis_note(r)}\n"
             )
             f.write(line)
 
     return filename
+
+
+def save_diff(
+    changes: List[ScanResult], target_url: str, summary: str, was: Dict[str, ScanResult]
+) -> str:
+    """
+    Lưu report --diff (chỉ path new/changed/removed) vào reports/diff_<target>_<timestamp>.txt,
+    mỗi dòng "<+|~|-> [status] lengthB URL", path changed kèm giá trị cũ.
+    """
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+
+    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_url = target_url.replace("://", "_").replace("/", "_")
+    filename = os.path.join(REPORTS_DIR, f"diff_{safe_url}_{ts}.txt")
+
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(f"Diff report for {target_url}\n")
+        f.write(f"Changes: {summary}\n\n")
+        for r in changes:
+            line = f"{CHANGE_MARKS[r.change]} [{r.status_code}] {r.length}B {r.url}"
+            old = was.get(r.url)
+            if old is not None:
+                line += f" (was [{old.status_code}] {old.length}B)"
+            f.write(line + "\n")
+
+    return filename
+
+
+def save_failed(failed: List[Dict], report_file: str) -> str:
+    """
+    Lưu danh sách path vẫn lỗi sau khi retry (dead-letter) cạnh file report:
+    report_xxx.txt -> report_xxx_failed.txt, mỗi dòng "<loại lỗi> <url>".
+    """
+    base, ext = os.path.splitext(report_file)
+    filename = f"{base}_failed{ext or '.txt'}"
+
+    with open(filename, "w", encoding="utf-8") as f:
+        for item in failed:
+            f.write(f"{item['error']} {item['url']}\n")
+
+    return filename
+
+
+def save_stats(stats: Dict, filename: str) -> str:
+    """
+    Lưu số liệu hiệu năng cuối scan (ScanStats.snapshot) ra file JSON.
+    """
+    folder = os.path.dirname(filename)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+
+    return filename
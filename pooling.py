@@ -0,0 +1,159 @@
+# pooling.py
+
+import socket
+import ssl
+import threading
+from typing import Dict
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from config import TCP_KEEPALIVE
+
+
+class ConnectionStats:
+    """
+    Đếm request, kết nối TCP mới và TLS handshake (mới / resume) của 1 client,
+    để kiểm tra chi phí bắt tay có được chia đều cho nhiều request không.
+    An toàn khi dùng từ nhiều thread.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+        self.tls_resumed = 0
+        self._lock = threading.Lock()
+
+    def add(self, requests: int = 0, connections: int = 0, tls_handshakes: int = 0, tls_resumed: int = 0):
+        with self._lock:
+            self.requests += requests
+            self.connections += connections
+            self.tls_handshakes += tls_handshakes
+            self.tls_resumed += tls_resumed
+
+    @property
+    def reused(self) -> int:
+        """
+        Số request chạy trên kết nối có sẵn (keep-alive / HTTP/2 multiplex).
+        """
+        return max(0, self.requests - self.connections)
+
+    def summary(self) -> str:
+        """
+        Chuỗi ngắn, vd "4000 requests, 20 new connections, 3980 reused (99.5%)".
+        """
+        with self._lock:
+            ratio = 100.0 * self.reused / self.requests if self.requests else 0.0
+            text = (
+                f"{self.requests} requests, {self.connections} new connections, "
+                f"{self.reused} reused ({ratio:.1f}%)"
+            )
+            if self.tls_handshakes:
+                text += f", TLS {self.tls_handshakes} handshakes / {self.tls_resumed} resumed"
+            return text
+
+
+class _ResumableSSLSocket(ssl.SSLSocket):
+    """
+    SSLSocket lưu lại TLS session của mình khi đóng. Với TLS 1.3, ticket chỉ tới
+    sau handshake (cùng dữ liệu đầu tiên), nên lúc đóng mới có session dùng lại được.
+    """
+
+    def _real_close(self):
+        try:
+            session = self.session if self._sslobj is not None else None
+        except (ValueError, OSError):
+            session = None
+        if session is not None and session.has_ticket and self.server_hostname:
+            self.context.sessions[self.server_hostname] = session
+        super()._real_close()
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """
+    SSLContext gắn lại TLS session đã có của cùng host khi mở kết nối mới
+    (urllib3 không tự làm), nên kết nối sau chỉ cần handshake rút gọn.
+    """
+
+    sslsocket_class = _ResumableSSLSocket
+
+    def wrap_socket(self, sock, *args, server_hostname=None, session=None, **kwargs):
+        if session is None and server_hostname:
+            session = self.sessions.get(server_hostname)
+        sslsock = super().wrap_socket(
+            sock, *args, server_hostname=server_hostname, session=session, **kwargs
+        )
+        self.stats.add(tls_handshakes=1, tls_resumed=int(sslsock.session_reused))
+        return sslsock
+
+
+def create_ssl_context(stats: ConnectionStats) -> ResumingSSLContext:
+    ctx = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    ctx.options |= ssl.OP_NO_COMPRESSION
+    ctx.minimum_version = ssl.TLSVersion.TLSv1_2
+    # urllib3 tự kiểm tra hostname khi context do người dùng truyền vào;
+    # để False thì verify=False (CERT_NONE) vẫn đặt được verify_mode
+    ctx.check_hostname = False
+    ctx.sessions: Dict[str, ssl.SSLSession] = {}
+    ctx.stats = stats
+    return ctx
+
+
+class _CountingPoolMixin:
+    stats: ConnectionStats = None
+
+    def _make_request(self, conn, *args, **kwargs):
+        # kết nối trong pool chưa mở (mới tạo, hoặc server đã đóng) => request này phải kết nối lại
+        self.stats.add(requests=1, connections=int(conn.sock is None))
+        return super()._make_request(conn, *args, **kwargs)
+
+
+class TunedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter cho scan:
+    - mỗi host giữ tối đa `pool_size` kết nối (= số worker) nên không kết nối nào
+      bị đóng rồi mở lại vì pool đầy
+    - cache pool cho `hosts` host (scan nhiều target không đẩy pool của nhau ra)
+    - bật TCP keep-alive, dùng chung 1 SSLContext có resume TLS session
+    - đếm request / kết nối mới vào `stats`
+    Kết nối qua proxy (-x, HTTP hoặc SOCKS) cũng được tinh chỉnh/đếm như vậy.
+    """
+
+    def __init__(self, pool_size: int, hosts: int, stats: ConnectionStats):
+        self.stats = stats
+        self.ssl_context = create_ssl_context(stats)
+        super().__init__(
+            pool_connections=max(10, hosts),
+            pool_maxsize=max(1, pool_size),
+            pool_block=False,
+        )
+
+    @staticmethod
+    def _socket_options():
+        socket_options = list(HTTPConnection.default_socket_options)
+        if TCP_KEEPALIVE:
+            socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        return socket_options
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault("socket_options", self._socket_options())
+        pool_kwargs.setdefault("ssl_context", self.ssl_context)
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self._count_pools(self.poolmanager)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        if proxy not in self.proxy_manager:
+            proxy_kwargs.setdefault("socket_options", self._socket_options())
+            proxy_kwargs.setdefault("ssl_context", self.ssl_context)
+            self._count_pools(super().proxy_manager_for(proxy, **proxy_kwargs))
+        return self.proxy_manager[proxy]
+
+    def _count_pools(self, manager):
+        # PoolManager tự tạo pool theo class, nên gắn `stats` qua class con riêng của adapter
+        # (giữ class gốc của manager: pool thường, hoặc pool SOCKS của SOCKSProxyManager)
+        extra = {"stats": self.stats}
+        manager.pool_classes_by_scheme = {
+            scheme: type(f"Counting{cls.__name__}", (_CountingPoolMixin, cls), extra)
+            for scheme, cls in manager.pool_classes_by_scheme.items()
+        }
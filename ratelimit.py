@@ -0,0 +1,176 @@
+# ratelimit.py
+
+import email.utils
+import threading
+import time
+from typing import List, Optional
+
+from config import (
+    ADAPTIVE_MIN_WINDOW,
+    ADAPTIVE_ERROR_THRESHOLD,
+    ADAPTIVE_LATENCY_FACTOR,
+    ADAPTIVE_LATENCY_SLACK_MS,
+    THROTTLE_CODES,
+    MAX_RETRY_AFTER,
+)
+from result import ScanResult
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Đổi header Retry-After (số giây hoặc HTTP-date) thành số giây cần chờ.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        seconds = when.timestamp() - time.time()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class TokenBucket:
+    """
+    Giới hạn tốc độ kiểu token bucket: trung bình `rate` request/giây,
+    cho phép dồn tối đa `burst` request.
+    An toàn khi dùng từ nhiều thread.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = float(rate)
+        self.burst = float(burst) if burst else max(1.0, self.rate)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Lấy 1 token, trả về số giây phải chờ trước khi gửi request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1.0
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._paused_until - now)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """
+        Tạm dừng cấp token trong `seconds` giây (Retry-After).
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveConcurrency:
+    """
+    Điều chỉnh số request đồng thời theo kiểu AIMD:
+    - slow start: nhân đôi giới hạn cho tới lần nghẽn đầu tiên
+    - sau đó mỗi cửa sổ mẫu ổn định thì +1
+    - tỉ lệ 429/503/lỗi cao => giảm một nửa
+    - p95 latency vượt xa baseline => giảm 20%
+    Retry-After làm mọi worker tạm dừng.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(min(self.max_limit, max(self.min_limit, 4)))
+
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._slow_start = True
+        self._base_latency: Optional[float] = None
+        self._latencies: List[float] = []
+        self._seen = 0
+        self._throttled = 0
+        self._cond = threading.Condition()
+
+    def try_acquire(self) -> float:
+        """
+        Thử giữ 1 slot. Trả về 0 nếu được, ngược lại là số giây nên chờ rồi thử lại.
+        """
+        with self._cond:
+            wait = self._paused_until - time.monotonic()
+            if wait > 0:
+                return wait
+            if self._in_flight < int(self.limit):
+                self._in_flight += 1
+                return 0.0
+            return 0.05
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self._paused_until - time.monotonic()
+                if wait <= 0 and self._in_flight < int(self.limit):
+                    self._in_flight += 1
+                    return
+                self._cond.wait(wait if wait > 0 else 0.1)
+
+    def release(self, res: Optional[ScanResult]):
+        """
+        Trả slot và ghi nhận kết quả (None = lỗi kết nối/timeout).
+        """
+        with self._cond:
+            self._in_flight -= 1
+            self._seen += 1
+            if res is None or res.status_code in THROTTLE_CODES:
+                self._throttled += 1
+            if res is not None:
+                self._latencies.append(res.elapsed_ms)
+                if res.status_code in THROTTLE_CODES:
+                    delay = parse_retry_after(res.header("Retry-After"))
+                    if delay:
+                        self._paused_until = max(
+                            self._paused_until, time.monotonic() + delay
+                        )
+
+            if self._seen >= max(ADAPTIVE_MIN_WINDOW, int(self.limit)):
+                self._adjust()
+            self._cond.notify_all()
+
+    def _adjust(self):
+        error_rate = self._throttled / self._seen
+        latencies = sorted(self._latencies)
+        p50 = latencies[len(latencies) // 2] if latencies else None
+        p95 = latencies[int(len(latencies) * 0.95)] if latencies else None
+
+        if p50 is not None and (self._base_latency is None or p50 < self._base_latency):
+            self._base_latency = p50
+
+        slow = (
+            p95 is not None
+            and self._base_latency is not None
+            and p95 > max(
+                self._base_latency * ADAPTIVE_LATENCY_FACTOR,
+                self._base_latency + ADAPTIVE_LATENCY_SLACK_MS,
+            )
+        )
+
+        if error_rate > ADAPTIVE_ERROR_THRESHOLD:
+            self._slow_start = False
+            self.limit = max(self.min_limit, self.limit * 0.5)
+        elif slow:
+            self._slow_start = False
+            self.limit = max(self.min_limit, self.limit * 0.8)
+        elif self._slow_start:
+            self.limit = min(self.max_limit, self.limit * 2)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1)
+
+        self._latencies = []
+        self._seen = 0
+        self._throttled = 0
@@ -0,0 +1,200 @@
+# result.py
+
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import DEFAULT_KEEP_HEADERS, HEADER_CACHE_SIZE, INTERN_HEADER_VALUES
+
+# header dạng tuple phẳng (tên1, giá trị1, tên2, giá trị2, ...): 1 object thay vì 1 tuple mỗi cặp
+Headers = Tuple[str, ...]
+
+# Giá trị ScanResult.change khi --diff (so với lần scan trước, xem store.py)
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+REMOVED = "removed"
+
+# Header luôn giữ vì engine cần (Retry-After khi bị 429/503); Location có slot riêng
+_ALWAYS_KEEP = frozenset(("retry-after",))
+_INTERN_VALUES = frozenset(h.lower() for h in INTERN_HEADER_VALUES)
+
+
+class ScanResult:
+    """
+    Kết quả 1 request, dạng gọn (__slots__, không có __dict__):
+    - headers: tuple phẳng (tên, giá trị, ...) chỉ gồm các header được giữ
+      (HeaderPolicy), tuple giống nhau được dùng chung giữa các kết quả
+    - words/lines: số từ/dòng của body (chỉ có khi client giữ body)
+    - body: dữ liệu tạm trong worker, engine xoá trước khi lưu kết quả
+    - matched: khớp matcher/filter và không phải wildcard (engine đặt trong worker)
+    - change: so với lần scan trước khi --diff (new/changed/unchanged/removed), không thì None
+    - analysis: kết quả phân tích body khi --analyze (title, hash, findings, links), không thì None
+    """
+
+    __slots__ = (
+        "url",
+        "status_code",
+        "length",
+        "elapsed_ms",
+        "location",
+        "headers",
+        "words",
+        "lines",
+        "body",
+        "matched",
+        "change",
+        "analysis",
+    )
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        length: int,
+        elapsed_ms: float,
+        location: Optional[str] = None,
+        headers: Headers = (),
+        words: Optional[int] = None,
+        lines: Optional[int] = None,
+        body: Optional[bytes] = None,
+        change: Optional[str] = None,
+        analysis: Optional[Dict] = None,
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.length = length
+        self.elapsed_ms = elapsed_ms
+        self.location = location
+        self.headers = headers
+        self.words = words
+        self.lines = lines
+        self.body = body
+        self.matched = False
+        self.change = change
+        self.analysis = analysis
+
+    def header(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Giá trị 1 header đã giữ (không phân biệt hoa thường).
+        """
+        name = name.lower()
+        headers = self.headers
+        for i in range(0, len(headers), 2):
+            if headers[i].lower() == name:
+                return headers[i + 1]
+        return default
+
+    def header_items(self) -> List[Tuple[str, str]]:
+        headers = self.headers
+        return list(zip(headers[::2], headers[1::2]))
+
+    def to_dict(self) -> Dict:
+        """
+        Dạng dict (lưu checkpoint / ghi file).
+        """
+        data = {
+            "url": self.url,
+            "status_code": self.status_code,
+            "length": self.length,
+            "elapsed_ms": self.elapsed_ms,
+            "location": self.location,
+            "headers": dict(self.header_items()),
+        }
+        if self.words is not None:
+            data["words"], data["lines"] = self.words, self.lines
+        if self.change is not None:
+            data["change"] = self.change
+        if self.analysis is not None:
+            data["analysis"] = self.analysis
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ScanResult":
+        return cls(
+            data["url"],
+            data["status_code"],
+            data["length"],
+            data["elapsed_ms"],
+            location=data.get("location"),
+            headers=tuple(x for item in (data.get("headers") or {}).items() for x in item),
+            words=data.get("words"),
+            lines=data.get("lines"),
+            change=data.get("change"),
+            analysis=data.get("analysis"),
+        )
+
+    def __repr__(self) -> str:
+        return f"ScanResult({self.status_code} {self.length}B {self.url})"
+
+
+def parse_keep_headers(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    "Server,X-Powered-By" -> ("Server", "X-Powered-By"); "all" -> None (giữ tất cả);
+    "none" / "" -> () ; None -> DEFAULT_KEEP_HEADERS.
+    """
+    if value is None:
+        return DEFAULT_KEEP_HEADERS
+    value = value.strip()
+    if value.lower() == "all":
+        return None
+    if value.lower() == "none":
+        return ()
+    return tuple(h.strip() for h in value.split(",") if h.strip())
+
+
+class HeaderPolicy:
+    """
+    Chọn header giữ lại trong kết quả và dùng chung các bộ header giống nhau:
+    - keep: tên header cần giữ (không phân biệt hoa thường), None = giữ tất cả
+    - tên header được intern, giá trị chỉ intern với header ít giá trị khác nhau
+      (INTERN_HEADER_VALUES): chuỗi intern không bao giờ được giải phóng, intern
+      Date/Set-Cookie/ETag của từng response chỉ làm bộ nhớ tăng dần
+    - tuple header trùng nhau trỏ về cùng 1 object (cache tối đa HEADER_CACHE_SIZE bộ khác nhau)
+    """
+
+    def __init__(self, keep: Optional[Iterable[str]] = DEFAULT_KEEP_HEADERS):
+        self.keep = None if keep is None else frozenset(h.lower() for h in keep) | _ALWAYS_KEEP
+        self._cache: Dict[Headers, Headers] = {}
+
+    def compact(self, headers) -> Headers:
+        keep = self.keep
+        intern = sys.intern
+        items = []
+        for key, value in headers.items():
+            name = key.lower()
+            if keep is None or name in keep:
+                items.append(intern(str(key)))
+                items.append(intern(str(value)) if name in _INTERN_VALUES else str(value))
+        items = tuple(items)
+        if not items:
+            return ()
+        shared = self._cache.get(items)
+        if shared is not None:
+            return shared
+        if len(self._cache) < HEADER_CACHE_SIZE:
+            self._cache[items] = items
+        return items
+
+
+def make_result(
+    url: str,
+    status_code: int,
+    headers,
+    length: int,
+    start: float,
+    policy: HeaderPolicy,
+    body: Optional[bytes] = None,
+) -> ScanResult:
+    """
+    Tạo ScanResult từ response của client (headers: mapping của thư viện HTTP).
+    """
+    return ScanResult(
+        url,
+        status_code,
+        length,
+        (time.time() - start) * 1000.0,
+        location=headers.get("Location"),
+        headers=policy.compact(headers),
+        body=body,
+    )
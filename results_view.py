@@ -0,0 +1,160 @@
+# results_view.py
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, List, Sequence, Tuple
+
+from config import UI_ROW_HEIGHT
+from result import ScanResult
+
+
+class VirtualResultsView(ttk.Frame):
+    """
+    Bảng kết quả "ảo": dữ liệu nằm trong list `rows`, Treeview chỉ giữ đúng số dòng
+    đang nhìn thấy và được điền lại khi cuộn / đổi kích thước. Thêm 100k+ kết quả
+    chỉ là list.extend, không tạo 100k item Tk.
+
+    columns: list (id, tiêu đề, width, anchor); `formatter` biến 1 kết quả thành values.
+    Khi đang ở cuối bảng thì tự cuộn theo kết quả mới (giống tail -f).
+    """
+
+    def __init__(
+        self,
+        master,
+        columns: Sequence[Tuple[str, str, int, str]],
+        formatter: Callable[[ScanResult], Tuple],
+    ):
+        super().__init__(master)
+        self.rows: List[ScanResult] = []
+        self.formatter = formatter
+        self.follow = True  # đang bám cuối bảng
+
+        self._offset = 0     # index của dòng đầu tiên đang hiển thị
+        self._visible = 1    # số dòng vừa khung
+        self._items: List[str] = []
+        self._empty = ("",) * len(columns)
+        self._refresh_pending = False
+
+        style = ttk.Style(self)
+        style.configure("Results.Treeview", rowheight=UI_ROW_HEIGHT)
+
+        self.tree = ttk.Treeview(
+            self,
+            columns=[c[0] for c in columns],
+            show="headings",
+            style="Results.Treeview",
+            selectmode="browse",
+        )
+        for cid, title, width, anchor in columns:
+            self.tree.heading(cid, text=title)
+            self.tree.column(cid, width=width, anchor=anchor)
+
+        # scrollbar điều khiển offset trong `rows`, không phải yview của Treeview
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.vsb.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3) or "break")
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3) or "break")
+        self.tree.bind("<Prior>", lambda e: self._scroll_by(-self._visible) or "break")
+        self.tree.bind("<Next>", lambda e: self._scroll_by(self._visible) or "break")
+        self.tree.bind("<Home>", lambda e: self._scroll_to(0) or "break")
+        self.tree.bind("<End>", lambda e: self._scroll_to(len(self.rows)) or "break")
+
+    # ---------- Model ----------
+
+    def extend(self, rows: List[ScanResult]):
+        """
+        Thêm 1 lô kết quả; bảng chỉ vẽ lại 1 lần (khi Tk rảnh).
+        """
+        if not rows:
+            return
+        self.rows.extend(rows)
+        if self.follow:
+            self._offset = self._max_offset()
+        self._schedule_refresh()
+
+    def clear(self):
+        self.rows.clear()
+        self._offset = 0
+        self.follow = True
+        self._schedule_refresh()
+
+    # ---------- Cuộn ----------
+
+    def _max_offset(self) -> int:
+        return max(0, len(self.rows) - self._visible)
+
+    def _scroll_to(self, offset: int):
+        offset = max(0, min(int(offset), self._max_offset()))
+        if offset != self._offset:
+            # item Treeview được dùng lại cho dòng khác => bỏ chọn để không chọn nhầm
+            self.tree.selection_set(())
+        self._offset = offset
+        self.follow = self._offset >= self._max_offset()
+        self._schedule_refresh()
+
+    def _scroll_by(self, rows: int):
+        self._scroll_to(self._offset + rows)
+
+    def _on_scrollbar(self, action: str, value: str, unit: str = ""):
+        if action == "moveto":
+            self._scroll_to(round(float(value) * len(self.rows)))
+        elif action == "scroll":
+            step = self._visible if unit == "pages" else 1
+            self._scroll_by(int(value) * step)
+
+    def _on_wheel(self, event):
+        # Windows: delta bội số 120; macOS: delta nhỏ (±1..)
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self._scroll_by(-3 * delta)
+        return "break"
+
+    def _on_resize(self, event):
+        visible = max(1, (event.height - self._header_height()) // UI_ROW_HEIGHT)
+        if visible != self._visible:
+            self._visible = visible
+            if self.follow:
+                self._offset = self._max_offset()
+            self._schedule_refresh()
+
+    def _header_height(self) -> int:
+        # bbox của dòng đầu cho biết tiêu đề cột cao bao nhiêu (phụ thuộc theme/font)
+        if self._items:
+            bbox = self.tree.bbox(self._items[0])
+            if bbox:
+                return bbox[1]
+        return UI_ROW_HEIGHT + 4
+
+    # ---------- Vẽ ----------
+
+    def _schedule_refresh(self):
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self._refresh)
+
+    def _refresh(self):
+        """
+        Điền `_visible` dòng từ offset hiện tại vào các item có sẵn của Treeview.
+        """
+        self._refresh_pending = False
+        total = len(self.rows)
+        self._offset = max(0, min(self._offset, self._max_offset()))
+        count = min(self._visible, total - self._offset)
+
+        while len(self._items) < count:
+            self._items.append(self.tree.insert("", tk.END, values=self._empty))
+        while len(self._items) > count:
+            self.tree.delete(self._items.pop())
+
+        rows = self.rows
+        for i, iid in enumerate(self._items):
+            self.tree.item(iid, values=self.formatter(rows[self._offset + i]))
+
+        if total:
+            self.vsb.set(self._offset / total, (self._offset + count) / total)
+        else:
+            self.vsb.set(0.0, 1.0)
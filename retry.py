@@ -0,0 +1,102 @@
+# retry.py
+
+import random
+import socket
+import ssl
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+
+from config import DEFAULT_RETRIES, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX
+
+# Các loại lỗi được đếm riêng: lỗi mạng + "throttled" (response 429/503)
+ERROR_CLASSES = ("timeout", "reset", "refused", "dns", "tls", "other", "throttled")
+
+
+def _exception_chain(exc: BaseException) -> Iterator[BaseException]:
+    """
+    Duyệt exception và các nguyên nhân bên trong (requests/urllib3/aiohttp
+    thường bọc lỗi socket gốc nhiều lớp).
+    """
+    seen = set()
+    stack = [exc]
+    while stack:
+        e = stack.pop(0)
+        if e is None or id(e) in seen:
+            continue
+        seen.add(id(e))
+        yield e
+        stack.append(e.__cause__)
+        stack.append(e.__context__)
+        stack.append(getattr(e, "reason", None))
+        stack.append(getattr(e, "os_error", None))
+        stack.extend(a for a in getattr(e, "args", ()) if isinstance(a, BaseException))
+
+
+def classify_error(exc: BaseException) -> str:
+    """
+    Phân loại lỗi mạng thành một trong ERROR_CLASSES.
+    """
+    for e in _exception_chain(exc):
+        name = type(e).__name__
+        if isinstance(e, socket.gaierror) or name in (
+            "NameResolutionError",
+            "ClientConnectorDNSError",
+        ):
+            return "dns"
+        if isinstance(e, ssl.SSLError) or "SSL" in name or "Certificate" in name:
+            return "tls"
+        if isinstance(e, (TimeoutError, socket.timeout)) or "Timeout" in name:
+            return "timeout"
+        if isinstance(e, ConnectionRefusedError):
+            return "refused"
+        if isinstance(e, (ConnectionResetError, BrokenPipeError)) or name in (
+            "RemoteDisconnected",
+            "RemoteProtocolError",
+            "ServerDisconnectedError",
+            "ProtocolError",
+            "ChunkedEncodingError",
+            "IncompleteRead",
+        ):
+            return "reset"
+    return "other"
+
+
+def parse_retries(spec: Optional[str]) -> Dict[str, int]:
+    """
+    Parse "3" (mọi loại lỗi) hoặc "timeout=3,dns=0" thành dict loại lỗi -> số lần retry.
+    Loại không được nhắc tới lấy theo DEFAULT_RETRIES.
+    """
+    retries = {cls: 0 for cls in ERROR_CLASSES}
+    for s in (DEFAULT_RETRIES, spec):
+        if not s:
+            continue
+        s = s.strip()
+        if s.isdigit():
+            retries = {cls: int(s) for cls in ERROR_CLASSES}
+            continue
+        for part in s.split(","):
+            key, _, value = part.partition("=")
+            key = key.strip().lower()
+            if key in retries and value.strip().isdigit():
+                retries[key] = int(value)
+    return retries
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Số lần retry theo loại lỗi + exponential backoff có jitter ("full jitter").
+    """
+    retries: Dict[str, int] = field(default_factory=lambda: parse_retries(None))
+    backoff_base: float = RETRY_BACKOFF_BASE
+    backoff_max: float = RETRY_BACKOFF_MAX
+
+    def max_retries(self, error_class: str) -> int:
+        return self.retries.get(error_class, 0)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Thời gian chờ trước lần thử thứ `attempt` (bắt đầu từ 1).
+        """
+        cap = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
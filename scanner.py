@@ -0,0 +1,531 @@
+# scanner.py
+
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from config import (
+    DEFAULT_THREADS,
+    DEFAULT_ASYNC_CONCURRENCY,
+    THROTTLE_CODES,
+    ANALYSIS_WORKERS,
+    DISCOVERED_BASE,
+)
+from filters import FilterConfig
+from ratelimit import TokenBucket, AdaptiveConcurrency, parse_retry_after
+from retry import RetryPolicy, classify_error
+from checkpoint import Checkpoint
+from calibration import Calibration, count_words_lines
+from metrics import ScanStats
+from result import ScanResult
+from targets import ScanTarget, TargetScheduler
+
+if TYPE_CHECKING:
+    # chỉ dùng cho type hint: requests (http_client) được nạp khi tạo client,
+    # analysis khi bật --analyze
+    from http_client import HttpClient
+    from analysis import Analyzer
+
+
+class ScanEngine:
+    """
+    Engine scan dùng chung cho CLI và GUI.
+    - Gửi request trên một pool gồm `threads` worker thread, hoặc `threads`
+      coroutine trên một event loop nếu `http_client` là AsyncHttpClient.
+    - Kết quả khớp filter được đẩy ra ngay qua `on_result`.
+    - `run()` trả về danh sách kết quả theo đúng thứ tự wordlist;
+      `run_many()` scan nhiều target trên cùng pool (round-robin, giới hạn theo host).
+    - `rate_limiter` giới hạn request/giây, `adaptive` co giãn số request
+      đồng thời (tối đa `threads`) theo độ trễ và tỉ lệ 429/503/lỗi.
+    - Lỗi mạng được retry theo `retry_policy`, đếm trong `errors` theo loại;
+      path vẫn lỗi sau khi hết lượt retry nằm trong `failed`.
+    - Response 429/503 là lỗi loại "throttled": gửi lại sau Retry-After (không có thì
+      backoff), vẫn bị throttle khi hết lượt thì vào `failed` (không tính là đã test);
+      Retry-After làm mọi worker tạm dừng, kể cả khi không có -rate.
+    - `stats` (ScanStats) đo req/s, percentile độ trễ, tỉ lệ lỗi/timeout và ETA.
+    - Nếu truyền `checkpoint`, các index đã test được bỏ qua và trạng thái
+      được ghi ra đĩa định kỳ + khi kết thúc/bị dừng.
+    - Nếu truyền `calibration`, trước khi scan sẽ gửi vài path ngẫu nhiên để
+      lấy fingerprint wildcard/soft-404, rồi loại các response khớp fingerprint.
+      Client cần `body_limit` > 0 để so được số từ/dòng và simhash.
+    - `cfg` (build_filter_config) quyết định kết quả khớp; tiêu chí theo body
+      (số từ/dòng, regex) cũng cần client có `body_limit` > 0.
+    - Nếu truyền `analyzer`, body của kết quả khớp được phân tích trên
+      `analysis_workers` thread riêng (AnalysisPool), không chiếm worker mạng;
+      `on_result` được gọi khi phân tích xong, link tìm được vào `target.feed`.
+    """
+
+    def __init__(
+        self,
+        http_client: "HttpClient",
+        cfg: FilterConfig,
+        threads: int = DEFAULT_THREADS,
+        rate_limiter: Optional[TokenBucket] = None,
+        adaptive: Optional[AdaptiveConcurrency] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        calibration: Optional[Calibration] = None,
+        analyzer: Optional["Analyzer"] = None,
+        analysis_workers: int = ANALYSIS_WORKERS,
+    ):
+        self.http_client = http_client  # HttpClient hoặc AsyncHttpClient
+        self.cfg = cfg
+        self.match = cfg.match
+        self.threads = max(1, int(threads))
+        self.rate_limiter = rate_limiter
+        self.adaptive = adaptive
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.calibration = calibration
+        self.analyzer = analyzer
+        self.analysis_workers = analysis_workers
+        self.analysis = None               # AnalysisPool của lượt scan đang chạy
+
+        self.done = 0
+        self.interrupted = False
+        self.errors: Counter = Counter()   # số lần lỗi theo loại (kể cả lần được retry)
+        self.retried = 0
+        self.wildcards = 0                 # response bị calibration loại
+        self.failed: List[Dict] = []       # dead-letter: {"url", "error"}
+        self.stats = ScanStats()           # req/s, percentile độ trễ, tỉ lệ lỗi, ETA
+
+        self._job_lock = threading.Lock()
+        self._job_cond = threading.Condition(self._job_lock)
+        self._result_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._paused_until = 0.0           # Retry-After khi không có rate_limiter (time.monotonic)
+
+    def stop(self):
+        """
+        Yêu cầu các worker dừng sau request đang chạy.
+        """
+        self._stop_event.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def error_summary(self) -> str:
+        """
+        Chuỗi ngắn mô tả lỗi, vd "timeout=3 reset=1 (retried 3, failed 1)".
+        """
+        with self._result_lock:
+            if not self.errors:
+                return "none"
+            parts = " ".join(f"{cls}={n}" for cls, n in sorted(self.errors.items()))
+            return f"{parts} (retried {self.retried}, failed {len(self.failed)})"
+
+    def run(
+        self,
+        base_url: str,
+        paths: Iterable[str],
+        on_result: Optional[Callable[[ScanResult], None]] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> List[ScanResult]:
+        """
+        Scan toàn bộ `paths` trên `base_url`.
+        `paths` là iterable path, hoặc Frontier khi scan đệ quy: thư mục con
+        tìm được sẽ được thêm vào frontier và scan xen kẽ trên cùng pool worker.
+        Callback được gọi tuần tự (có lock) nên không cần tự đồng bộ.
+        Kết quả đã có trong `checkpoint` được gộp vào danh sách trả về
+        nhưng không phát lại qua `on_result`.
+        """
+        target = ScanTarget(base_url, paths, checkpoint=checkpoint, calibration=self.calibration)
+        self.run_many([target], on_result=on_result, on_progress=on_progress)
+        return target.results
+
+    def run_many(
+        self,
+        targets: List[ScanTarget],
+        on_result: Optional[Callable[[ScanResult], None]] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        per_host: Optional[int] = None,
+    ) -> List[ScanTarget]:
+        """
+        Scan nhiều target trên cùng 1 pool worker (round-robin giữa các target,
+        tối đa `per_host` request đồng thời mỗi host). Kết quả/lỗi của từng
+        target nằm trong `target.results` / `target.failures`.
+        """
+        scheduler = TargetScheduler(targets, per_host=per_host)
+
+        self.done = sum(target.done for target in targets)
+        self.interrupted = False
+        self.errors.clear()
+        self.retried = 0
+        self.wildcards = 0
+        self.failed = []
+        self.stats = ScanStats()
+        self._paused_until = 0.0
+        self._stop_event.clear()
+
+        def finish(target: ScanTarget, path: Optional[str] = None, res: Optional[ScanResult] = None):
+            with self._job_cond:
+                if res is not None and target.frontier is not None:
+                    target.frontier.discover(path, res)
+                scheduler.release(target)
+                self._job_cond.notify_all()
+
+        def record(
+            target: ScanTarget,
+            idx: int,
+            path: str,
+            url: str,
+            res: Optional[ScanResult],
+            error: Optional[str],
+        ) -> Optional[Tuple[ScanTarget, int, ScanResult]]:
+            """
+            Ghi nhận 1 path đã test. Trả về job phân tích (target, idx, res) nếu kết quả
+            cần đưa vào AnalysisPool (worker tự đưa vào: thread thì chờ, async thì lùi lại);
+            kết quả đó chỉ vào `target.found` / `on_result` khi phân tích xong.
+            """
+            match = False
+            analyze = False
+            with self._result_lock:
+                self.done += 1
+                target.done += 1
+                self.stats.complete()
+                if res is None:
+                    target.failed.append((idx, {"url": url, "error": error}))
+                    self.failed.append(target.failed[-1][1])
+                else:
+                    match = res.matched
+                    if match:
+                        analyze = pool is not None
+                        if not analyze:
+                            target.found.append((idx, res))
+                            if on_result:
+                                on_result(res)
+                    # path tìm được từ link không có chỗ trong checkpoint
+                    if target.checkpoint and idx < DISCOVERED_BASE:
+                        target.checkpoint.mark(idx, res if match else None)
+                        target.checkpoint.maybe_save()
+                if on_progress:
+                    on_progress(self.done)
+            if analyze:
+                # tính trước khi trả slot: target chưa bị bỏ khi link còn đang được tìm
+                with self._job_cond:
+                    target.analyzing += 1
+                    scheduler.analyzing += 1
+            finish(target, path, res if match else None)
+            return (target, idx, res) if analyze else None
+
+        def analyze(job: Tuple[ScanTarget, int, ScanResult]):
+            # chạy trên thread của AnalysisPool
+            target, idx, res = job
+            body, res.body = res.body, None
+            links = None
+            try:
+                links = self.analyzer.analyze(res, body, target.base)
+            finally:
+                # phân tích lỗi thì kết quả vẫn được ghi nhận (không có res.analysis)
+                with self._job_cond:
+                    if links and target.feed is not None:
+                        target.feed.add(links)
+                    target.analyzing -= 1
+                    scheduler.analyzing -= 1
+                    self._job_cond.notify_all()
+                with self._result_lock:
+                    target.found.append((idx, res))
+                    if on_result:
+                        on_result(res)
+
+        pool = None
+        if self.analyzer is not None:
+            # import trễ: chỉ cần khi bật --analyze
+            from analysis import AnalysisPool
+            pool = AnalysisPool(analyze, workers=self.analysis_workers)
+            pool.start()
+        self.analysis = pool
+
+        try:
+            if getattr(self.http_client, "is_async", False):
+                # import trễ: asyncio chỉ cần cho engine async
+                import asyncio
+                asyncio.run(self._run_async(scheduler, finish, record))
+            else:
+                self._run_threads(scheduler, finish, record)
+        except KeyboardInterrupt:
+            self.interrupted = True
+            self.stop()
+        finally:
+            if pool is not None:
+                # phân tích nốt các kết quả đã vào queue (kể cả khi bị dừng)
+                pool.close()
+
+        for target in targets:
+            if target.checkpoint:
+                target.checkpoint.save()
+
+        # lỗi theo thứ tự target rồi thứ tự wordlist
+        self.failed = [item for target in targets for item in target.failures]
+        return targets
+
+    def _run_threads(self, scheduler: TargetScheduler, finish, record):
+        def next_job() -> Optional[Tuple[ScanTarget, int, Optional[str]]]:
+            with self._job_cond:
+                while not self.stopped:
+                    job = scheduler.take()
+                    if job is not None or not scheduler.busy:
+                        return job
+                    # hết job tạm thời (host đủ kết nối, hoặc chờ thư mục con / link): chờ job đang chạy
+                    self._job_cond.wait(0.1)
+                return None
+
+        def worker():
+            while not self.stopped:
+                job = next_job()
+                if job is None:
+                    return
+
+                target, idx, path = job
+                if path is None:
+                    self._calibrate(target)
+                    finish(target)
+                    continue
+                full_url = urljoin(target.base, path.lstrip("/"))
+                headers = target.diff.conditional_headers(path) if target.diff else None
+                res, error = self._fetch(full_url, headers)
+                job = record(target, idx, path, full_url, self._inspect(target, res, path), error)
+                if job is not None:
+                    self.analysis.put(job)  # queue đầy => chờ phân tích bắt kịp
+
+        workers = [
+            threading.Thread(target=worker, daemon=True)
+            for _ in range(self.threads)
+        ]
+        for t in workers:
+            t.start()
+
+        try:
+            for t in workers:
+                # join có timeout để Ctrl+C vẫn vào được main thread
+                while t.is_alive():
+                    t.join(0.2)
+        except KeyboardInterrupt:
+            self.stop()
+            for t in workers:
+                t.join()
+            raise
+
+    def _calibrate(self, target: ScanTarget):
+        """
+        Gửi các path dò của calibration tới target và học fingerprint wildcard.
+        """
+        for path, token in target.calibration.probes():
+            res, _ = self._fetch(urljoin(target.base, path.lstrip("/")))
+            if res is not None:
+                target.calibration.learn(res, res.body, token)
+        target.calibrated = True
+
+    def _inspect(
+        self, target: ScanTarget, res: Optional[ScanResult], path: str
+    ) -> Optional[ScanResult]:
+        """
+        Chạy matcher và xử lý body (nếu client có giữ) ngay trong worker, ngoài lock:
+        đặt `res.matched`, đếm từ/dòng, so với fingerprint wildcard, rồi bỏ body khỏi kết quả.
+        Khi có analyzer: body của kết quả khớp được giữ lại cho AnalysisPool, đếm từ/dòng
+        cũng để pool làm (trừ khi calibration cần).
+        Khi --diff: 304 cho path đã lưu dùng lại kết quả lần trước (bỏ qua matcher),
+        còn lại được phân loại new/changed/unchanged/removed.
+        """
+        if res is None:
+            return None
+        diff = target.diff
+        if diff is not None:
+            same = diff.not_modified(path, res)
+            if same is not None:
+                return same
+        body, res.body = res.body, None
+        res.matched = self.match(res, body)
+        if res.matched:  # kết quả bị loại không cần đếm từ/dòng
+            calibration = target.calibration
+            counted_later = self.analyzer is not None and calibration is None
+            if body is not None and res.words is None and not counted_later:
+                res.words, res.lines = count_words_lines(body)
+            if calibration is not None and calibration.is_wildcard(res, body, path):
+                res.matched = False
+                with self._result_lock:
+                    calibration.filtered += 1
+                    self.wildcards += 1
+        if diff is not None:
+            diff.classify(path, res, body)
+        if res.matched and self.analyzer is not None:
+            res.body = body
+        return res
+
+    def _fetch(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[Optional[ScanResult], Optional[str]]:
+        """
+        Gửi request (qua rate limit/adaptive), retry khi lỗi mạng hoặc bị 429/503.
+        `headers`: header thêm vào request (conditional request khi --diff).
+        Trả về (kết quả, None) hoặc (None, loại lỗi cuối cùng).
+        """
+        attempt = 0
+        while True:
+            if self.adaptive:
+                self.adaptive.acquire()
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            else:
+                wait = self._paused_until - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+
+            try:
+                res, error = self.http_client.fetch(url, headers), None
+            except self.http_client.errors as exc:
+                res, error = None, classify_error(exc)
+            self._observe(res, error)
+
+            wait = self._throttled(res)
+            if wait is not None:
+                res, error = None, "throttled"
+            if res is not None or not self._should_retry(error, attempt):
+                return res, error
+            attempt += 1
+            time.sleep(wait or self.retry_policy.backoff(attempt))
+
+    def _should_retry(self, error: str, attempt: int) -> bool:
+        with self._result_lock:
+            self.errors[error] += 1
+            if self.stopped or attempt >= self.retry_policy.max_retries(error):
+                return False
+            self.retried += 1
+            return True
+
+    def _throttled(self, res: Optional[ScanResult]) -> Optional[float]:
+        """
+        Response 429/503 => số giây Retry-After (0 nếu không có: retry dùng backoff),
+        None nếu không bị throttle.
+        """
+        if res is None or res.status_code not in THROTTLE_CODES:
+            return None
+        return parse_retry_after(res.header("Retry-After")) or 0.0
+
+    def _observe(self, res: Optional[ScanResult], error: Optional[str]):
+        """
+        Báo kết quả cho bộ điều tốc: trả slot adaptive, tôn trọng Retry-After
+        (dừng token bucket, không có -rate thì dừng mọi worker của engine);
+        ghi vào `stats` (req/s, độ trễ, lỗi).
+        """
+        self.stats.observe(res, error)
+        if self.adaptive:
+            self.adaptive.release(res)
+        if res is not None and res.status_code in THROTTLE_CODES:
+            delay = parse_retry_after(res.header("Retry-After"))
+            if delay:
+                if self.rate_limiter:
+                    self.rate_limiter.pause(delay)
+                else:
+                    with self._result_lock:
+                        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    async def _run_async(self, scheduler: TargetScheduler, finish, record):
+        import asyncio
+
+        # Mọi coroutine chạy chung 1 thread; lock chỉ để tránh đụng thread phân tích
+        # (--analyze) đang thêm link vào target.feed, không bao giờ phải chờ lâu
+        async def worker():
+            while not self.stopped:
+                with self._job_cond:
+                    job = scheduler.take()
+                if job is None:
+                    if not scheduler.busy:
+                        return
+                    # hết job tạm thời (host đủ kết nối, hoặc chờ thư mục con / link)
+                    await asyncio.sleep(0.05)
+                    continue
+
+                target, idx, path = job
+                if path is None:
+                    await self._calibrate_async(target)
+                    finish(target)
+                    continue
+                full_url = urljoin(target.base, path.lstrip("/"))
+                headers = target.diff.conditional_headers(path) if target.diff else None
+                res, error = await self._fetch_async(full_url, headers)
+                job = record(target, idx, path, full_url, self._inspect(target, res, path), error)
+                # queue phân tích đầy: nhường event loop thay vì chặn cả loop
+                while job is not None and not self.analysis.offer(job):
+                    await asyncio.sleep(0.01)
+
+        async with self.http_client:
+            await asyncio.gather(*(worker() for _ in range(self.threads)))
+
+    async def _calibrate_async(self, target: ScanTarget):
+        for path, token in target.calibration.probes():
+            res, _ = await self._fetch_async(urljoin(target.base, path.lstrip("/")))
+            if res is not None:
+                target.calibration.learn(res, res.body, token)
+        target.calibrated = True
+
+    async def _fetch_async(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[Optional[ScanResult], Optional[str]]:
+        """
+        Bản async của _fetch().
+        """
+        import asyncio
+
+        attempt = 0
+        while True:
+            if self.adaptive:
+                while True:
+                    wait = self.adaptive.try_acquire()
+                    if not wait:
+                        break
+                    await asyncio.sleep(wait)
+            if self.rate_limiter:
+                wait = self.rate_limiter.reserve()
+            else:
+                wait = self._paused_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                res, error = await self.http_client.fetch(url, headers), None
+            except self.http_client.errors as exc:
+                res, error = None, classify_error(exc)
+            self._observe(res, error)
+
+            wait = self._throttled(res)
+            if wait is not None:
+                res, error = None, "throttled"
+            if res is not None or not self._should_retry(error, attempt):
+                return res, error
+            attempt += 1
+            await asyncio.sleep(wait or self.retry_policy.backoff(attempt))
+
+
+def default_concurrency(engine: str) -> int:
+    """
+    Số worker mặc định theo engine (thread hoặc coroutine).
+    """
+    return DEFAULT_ASYNC_CONCURRENCY if engine == "async" else DEFAULT_THREADS
+
+
+def create_http_client(
+    engine: str, timeout: int, concurrency: int, http2: bool = False, **options
+):
+    """
+    Tạo client HTTP theo engine: "threads" -> HttpClient (hoặc Http2Client nếu
+    `http2`), "async" -> AsyncHttpClient.
+    `options` (stream, max_body, head_first, body_limit, hosts, keep_headers, template)
+    được chuyển thẳng cho client.
+    """
+    if engine == "async":
+        if http2:
+            raise RuntimeError("HTTP/2 is only supported with --engine threads")
+        # import trễ để không bắt buộc cài aiohttp khi chỉ dùng engine thread
+        from async_client import AsyncHttpClient
+        return AsyncHttpClient(timeout=timeout, limit=concurrency, **options)
+    if http2:
+        # import trễ: httpx/h2 chỉ cần khi bật --http2
+        from http2_client import Http2Client
+        return Http2Client(timeout=timeout, pool_size=concurrency, **options)
+    # import trễ: requests chỉ nạp khi thật sự scan (CLI -h / mở GUI không cần)
+    from http_client import HttpClient
+    return HttpClient(timeout=timeout, pool_size=concurrency, **options)
+
@@ -0,0 +1,142 @@
+# session.py
+
+import base64
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+from config import USER_AGENTS
+
+PROXY_SCHEMES = ("http", "https", "socks4", "socks4a", "socks5", "socks5h")
+
+
+def parse_header(line: str) -> Tuple[str, str]:
+    """
+    "Name: value" -> ("Name", "value"). Sai cú pháp => ValueError.
+    """
+    name, sep, value = line.partition(":")
+    name = name.strip()
+    if not sep or not name or any(c.isspace() for c in name):
+        raise ValueError(f'invalid header {line!r} (use "Name: value")')
+    return name, value.strip()
+
+
+def parse_proxy(url: str) -> str:
+    """
+    Chuẩn hoá URL proxy (-x): thêm "http://" nếu thiếu scheme, chỉ nhận HTTP(S)/SOCKS.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = "http://" + url
+    scheme = url.split("://", 1)[0].lower()
+    if scheme not in PROXY_SCHEMES:
+        raise ValueError(f"unsupported proxy scheme {scheme!r} (use {', '.join(PROXY_SCHEMES)})")
+    return url
+
+
+def basic_auth(credentials: str) -> str:
+    """
+    "user:pass" -> giá trị header Authorization kiểu Basic.
+    """
+    if ":" not in credentials:
+        raise ValueError("invalid --auth value (use user:password)")
+    token = base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+    return f"Basic {token}"
+
+
+@dataclass
+class SessionTemplate:
+    """
+    Phần mọi request của lượt scan đều mang theo, dựng 1 lần trước khi scan;
+    mỗi worker lấy 1 bản (worker_headers) gán vào session của nó, nên không
+    request nào phải dựng lại header/cookie/auth:
+    - headers: header thêm (-H), gồm cả Cookie (-b) và Authorization (--auth) đã mã hoá sẵn
+    - proxy: URL proxy HTTP(S)/SOCKS (-x), None = kết nối thẳng (hoặc proxy của biến môi trường)
+    - user_agents: mỗi worker chọn ngẫu nhiên 1 User-Agent (--random-agent), rỗng = giữ mặc định
+    """
+    headers: Dict[str, str] = field(default_factory=dict)
+    proxy: Optional[str] = None
+    user_agents: Tuple[str, ...] = ()
+
+    def set_header(self, name: str, value: str):
+        """
+        Đặt header, thay header cùng tên (không phân biệt hoa thường) đã có.
+        """
+        for key in [k for k in self.headers if k.lower() == name.lower()]:
+            del self.headers[key]
+        self.headers[name] = value
+
+    def header(self, name: str) -> Optional[str]:
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return None
+
+    @property
+    def has_cookies(self) -> bool:
+        return self.header("Cookie") is not None
+
+    @property
+    def socks(self) -> bool:
+        return bool(self.proxy) and self.proxy.lower().startswith("socks")
+
+    def worker_headers(self) -> Dict[str, str]:
+        """
+        Header cho session của 1 worker: `headers` + 1 User-Agent ngẫu nhiên
+        (nếu bật và -H chưa đặt User-Agent).
+        """
+        headers = dict(self.headers)
+        if self.user_agents and self.header("User-Agent") is None:
+            headers["User-Agent"] = random.choice(self.user_agents)
+        return headers
+
+    def describe(self) -> str:
+        """
+        Mô tả ngắn cho dòng banner CLI (không in giá trị cookie/auth).
+        """
+        parts = []
+        extra = [k for k in self.headers if k.lower() not in ("cookie", "authorization")]
+        if extra:
+            parts.append(f"headers {', '.join(extra)}")
+        if self.has_cookies:
+            parts.append("cookies")
+        if self.header("Authorization") is not None:
+            parts.append("auth")
+        if self.user_agents:
+            parts.append("random User-Agent")
+        if self.proxy:
+            # không in user:pass của proxy
+            proxy = urlsplit(self.proxy)
+            parts.append(f"proxy {proxy.scheme}://{proxy.hostname}:{proxy.port or ''}".rstrip(":"))
+        return ", ".join(parts)
+
+    def is_empty(self) -> bool:
+        return not (self.headers or self.proxy or self.user_agents)
+
+
+def build_session_template(
+    headers: Optional[Iterable[str]] = None,
+    cookies: Optional[str] = None,
+    auth: Optional[str] = None,
+    proxy: Optional[str] = None,
+    random_agent: bool = False,
+) -> SessionTemplate:
+    """
+    Tạo SessionTemplate từ tham số CLI (-H nhiều lần, -b, --auth, -x, --random-agent).
+    Giá trị sai => ValueError.
+    """
+    template = SessionTemplate()
+    for line in headers or ():
+        # -H trùng tên: cái sau thắng
+        template.set_header(*parse_header(line))
+    if cookies:
+        template.set_header("Cookie", cookies.strip())
+    if auth:
+        template.set_header("Authorization", basic_auth(auth))
+    if proxy:
+        template.proxy = parse_proxy(proxy)
+    if random_agent:
+        template.user_agents = USER_AGENTS
+    return template
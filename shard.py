@@ -0,0 +1,315 @@
+# shard.py
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, TextIO, Tuple
+
+from config import DISCOVERED_BASE
+from metrics import merge_stats
+from result import ScanResult
+
+# Tuỳ chọn chỉ có ý nghĩa ở coordinator, không chuyển cho tiến trình shard
+_COORDINATOR_OPTIONS = ("--workers", "-o", "-of", "--stats-json", "--stats-interval")
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    "2/4" -> (1, 4): shard thứ 2 (đếm từ 1) trong 4 shard, trả về index đếm từ 0.
+    Sai cú pháp => ValueError.
+    """
+    try:
+        i, n = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"invalid shard {spec!r} (use i/N, e.g. 1/4)") from None
+    if n < 1 or not 1 <= i <= n:
+        raise ValueError(f"invalid shard {spec!r}: need 1 <= i <= N")
+    return i - 1, n
+
+
+def shard_size(total: int, shard: Optional[Tuple[int, int]]) -> int:
+    """
+    Số path thuộc shard trong `total` path (index % n == i).
+    """
+    if not shard:
+        return total
+    return len(range(shard[0], total, shard[1]))
+
+
+def shard_checkpoint_path(path: str, shard: Tuple[int, int]) -> str:
+    """
+    x.ckpt.json -> x.shard2of4.ckpt.json: mỗi shard 1 checkpoint riêng.
+    """
+    suffix = ".ckpt.json" if path.endswith(".ckpt.json") else os.path.splitext(path)[1]
+    base = path[: len(path) - len(suffix)]
+    return f"{base}.shard{shard[0] + 1}of{shard[1]}{suffix}"
+
+
+def strip_options(argv: List[str], options=_COORDINATOR_OPTIONS) -> List[str]:
+    """
+    Bỏ các tuỳ chọn (kèm giá trị) của coordinator khỏi argv trước khi chuyển cho shard.
+    """
+    out = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        name = arg.split("=", 1)[0]
+        if name in options:
+            skip = "=" not in arg
+            continue
+        out.append(arg)
+    return out
+
+
+class ShardEmitter:
+    """
+    Phía shard (--shard-stream): ghi sự kiện JSON, mỗi dòng 1 event, ra stdout
+    cho coordinator. An toàn khi gọi từ nhiều thread.
+    Event nào cũng có `shard` = [i, N] (i đếm từ 0):
+    - start: thời điểm bắt đầu, danh sách target, số path mỗi target
+    - result: target, index (trong toàn bộ luồng path) và kết quả
+    - stats: tiến độ + ScanStats.export() (định kỳ)
+    - end: thời điểm xong, tiến độ, số liệu, lỗi, kết nối, path lỗi, checkpoint còn lại
+    """
+
+    def __init__(self, shard: Tuple[int, int], stream: Optional[TextIO] = None):
+        self.shard = list(shard)
+        self.stream = stream or sys.stdout
+        self._sent: Dict[str, int] = {}  # target -> số kết quả đã gửi
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **data):
+        line = json.dumps(dict(data, event=event, shard=self.shard), ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def emit_found(self, targets):
+        """
+        Gửi các kết quả mới của từng target (target.found chỉ được append).
+        """
+        for target in targets:
+            found = target.found
+            start = self._sent.get(target.url, 0)
+            end = len(found)
+            for idx, res in found[start:end]:
+                self.emit("result", target=target.url, idx=idx, result=res.to_dict())
+            self._sent[target.url] = end
+
+
+class ShardCoordinator:
+    """
+    Gộp luồng sự kiện của nhiều shard (tiến trình con --workers, hoặc file
+    event của các máy chạy --shard i/N):
+    - kết quả giữ index gốc => sắp lại đúng thứ tự wordlist như khi scan 1 tiến trình
+    - path tìm được từ link (--analyze) mà nhiều shard cùng tìm thấy chỉ giữ 1 lần
+    - tiến độ, lỗi, kết nối cộng dồn; số liệu hiệu năng gộp bằng merge_stats
+    `on_result(res)` được gọi (dưới lock) cho mỗi kết quả mới.
+    """
+
+    def __init__(self, on_result: Optional[Callable[[ScanResult], None]] = None):
+        self.on_result = on_result
+        self.targets: List[str] = []
+        self.total = 0             # số path mỗi target (toàn bộ, không chia shard)
+        self.shards: Dict[int, int] = {}  # shard id -> số shard (N) shard đó báo
+        self.interrupted = False
+        self.stopped = False       # có shard dừng trước khi xong (Ctrl+C, --max-time)
+        self.messages: List[str] = []
+
+        self._found: Dict[str, List[Tuple[int, ScanResult]]] = {}
+        self._urls: Dict[str, set] = {}  # target -> URL đã có kết quả
+        self._failed: Dict[str, List[Tuple[int, Dict]]] = {}
+        self._done: Dict[int, int] = {}
+        self._target_done: Counter = Counter()  # target -> số path đã test (shard đã xong)
+        self._stats: Dict[int, Dict] = {}
+        self._ended: Dict[int, Dict] = {}
+        self._started: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def feed(self, line: str):
+        """
+        Xử lý 1 dòng output của shard; dòng không phải event JSON được giữ lại
+        nếu là thông báo lỗi "[!] ...".
+        """
+        line = line.strip()
+        if not line.startswith("{"):
+            if line.startswith("[!]"):
+                with self._lock:
+                    if line not in self.messages:
+                        self.messages.append(line)
+            return
+        event = json.loads(line)
+        kind = event.get("event")
+        shard_id = event.get("shard", [0, 1])[0]
+        with self._lock:
+            if kind == "start":
+                self.shards[shard_id] = event["shard"][1]
+                self._started[shard_id] = event["time"]
+                self.total = event["total"]
+                for url in event["targets"]:
+                    if url not in self._found:
+                        self.targets.append(url)
+                        self._found[url] = []
+                        self._urls[url] = set()
+                        self._failed[url] = []
+            elif kind == "result":
+                res = ScanResult.from_dict(event["result"])
+                urls = self._urls[event["target"]]
+                if event["idx"] >= DISCOVERED_BASE and res.url in urls:
+                    return
+                urls.add(res.url)
+                self._found[event["target"]].append((event["idx"], res))
+                if self.on_result:
+                    self.on_result(res)
+            elif kind in ("stats", "end"):
+                self._done[shard_id] = event["done"]
+                self._stats[shard_id] = event["stats"]
+                if kind == "end":
+                    self._ended[shard_id] = event
+                    self.interrupted = self.interrupted or event["interrupted"]
+                    self.stopped = self.stopped or event["stopped"]
+                    self._target_done.update(event["target_done"])
+                    for item in event["failed"]:
+                        self._failed[item["target"]].append((item["idx"], item["failure"]))
+
+    @property
+    def done(self) -> int:
+        with self._lock:
+            return sum(self._done.values())
+
+    @property
+    def missing(self) -> List[int]:
+        """
+        Shard (đếm từ 1) chưa có event end.
+        """
+        with self._lock:
+            expected = max(self.shards.values(), default=0)
+            return [i + 1 for i in range(expected) if i not in self._ended]
+
+    def scan_total(self) -> int:
+        return self.total * len(self.targets)
+
+    def snapshot(self) -> Dict:
+        """
+        Số liệu gộp (dạng ScanStats.snapshot); thời gian chạy tính từ shard bắt đầu
+        sớm nhất tới shard xong muộn nhất (hoặc tới hiện tại nếu còn shard đang chạy).
+        """
+        with self._lock:
+            states = list(self._stats.values())
+            done = sum(self._done.values())
+            started = min(self._started.values(), default=time.time())
+            if self._ended and len(self._ended) == len(self._started):
+                finished = max(end["time"] for end in self._ended.values())
+            else:
+                finished = time.time()
+        return merge_stats(states, finished - started, done, self.scan_total())
+
+    def results(self, url: str) -> List[ScanResult]:
+        with self._lock:
+            return [res for _, res in sorted(self._found[url], key=lambda item: item[0])]
+
+    def history(self) -> List[Tuple[List[str], int]]:
+        """
+        (path dạng wordlist "/admin" tìm thấy, số path đã test) của từng target, gộp mọi
+        shard, để ghi thống kê trúng 1 lần cho cả scan (shard không chạy đệ quy).
+        """
+        with self._lock:
+            scans = []
+            for url in self.targets:
+                base = url.rstrip("/") + "/"
+                paths = ["/" + res.url[len(base):] for _, res in self._found[url] if res.url.startswith(base)]
+                scans.append((paths, self._target_done[url]))
+            return scans
+
+    def failures(self, url: str) -> List[Dict]:
+        with self._lock:
+            return [item for _, item in sorted(self._failed[url], key=lambda item: item[0])]
+
+    def found_count(self) -> int:
+        with self._lock:
+            return sum(len(found) for found in self._found.values())
+
+    def wildcards(self) -> int:
+        with self._lock:
+            return sum(end["wildcards"] for end in self._ended.values())
+
+    def checkpoints(self) -> List[str]:
+        with self._lock:
+            return [path for i in sorted(self._ended) for path in self._ended[i]["checkpoints"]]
+
+    def error_summary(self) -> str:
+        """
+        Giống ScanEngine.error_summary, cộng dồn mọi shard.
+        """
+        with self._lock:
+            errors: Counter = Counter()
+            retried = failed = 0
+            for end in self._ended.values():
+                errors.update(end["errors"])
+                retried += end["retried"]
+                failed += len(end["failed"])
+        if not errors:
+            return "none"
+        parts = " ".join(f"{cls}={n}" for cls, n in sorted(errors.items()))
+        return f"{parts} (retried {retried}, failed {failed})"
+
+    def connection_summary(self) -> str:
+        # import trễ: pooling nạp requests, đường CLI không cần lúc khởi động
+        from pooling import ConnectionStats
+
+        stats = ConnectionStats()
+        with self._lock:
+            for end in self._ended.values():
+                stats.add(**end["connections"])
+        return stats.summary()
+
+
+def run_workers(argv: List[str], workers: int, coordinator: ShardCoordinator) -> List[int]:
+    """
+    Chạy `workers` tiến trình `gui.py <argv> --shard i/N --shard-stream` trên máy này,
+    đưa output của từng tiến trình vào coordinator; trả về exit code của chúng.
+    Ctrl+C tới cả nhóm tiến trình: các shard tự dừng, lưu checkpoint và gửi event end.
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui.py")
+    argv = strip_options(argv)
+    procs = [
+        subprocess.Popen(
+            [sys.executable, script, *argv, "--shard", f"{i + 1}/{workers}", "--shard-stream"],
+            stdout=subprocess.PIPE,
+            encoding="utf-8",
+            errors="replace",
+        )
+        for i in range(workers)
+    ]
+
+    def pump(proc: subprocess.Popen):
+        for line in proc.stdout:
+            coordinator.feed(line)
+
+    readers = [threading.Thread(target=pump, args=(proc,), daemon=True) for proc in procs]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        while reader.is_alive():
+            try:
+                reader.join(0.5)
+            except KeyboardInterrupt:
+                # các shard cũng nhận SIGINT; chờ chúng gửi nốt kết quả
+                coordinator.interrupted = True
+    return [proc.wait() for proc in procs]
+
+
+def read_event_files(paths: List[str], coordinator: ShardCoordinator):
+    """
+    Nạp file event của các shard chạy trên máy khác (--merge).
+    """
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                coordinator.feed(line)
@@ -0,0 +1,287 @@
+# store.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import DIFF_BODY_LIMIT, HISTORY_RANK_LIMIT
+from result import ScanResult, NEW, CHANGED, UNCHANGED, REMOVED
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    target TEXT NOT NULL,
+    path TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    words INTEGER,
+    lines INTEGER,
+    location TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (target, path)
+)
+"""
+
+_HITS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hits (
+    path TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL,
+    last_hit REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO responses
+    (target, path, url, status, length, words, lines, location, etag, last_modified, body_hash, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (target, path) DO UPDATE SET
+    url = excluded.url, status = excluded.status, length = excluded.length,
+    words = excluded.words, lines = excluded.lines, location = excluded.location,
+    etag = excluded.etag, last_modified = excluded.last_modified,
+    body_hash = excluded.body_hash, last_seen = excluded.last_seen
+"""
+
+
+def _connect(path: str, schema: str) -> sqlite3.Connection:
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    # timeout: nhiều tiến trình scan có thể ghi cùng file
+    db = sqlite3.connect(path, timeout=30)
+    db.executescript(schema)
+    return db
+
+
+def body_hash(body: Optional[bytes]) -> Optional[str]:
+    """
+    Hash DIFF_BODY_LIMIT byte đầu body (None nếu client không giữ body).
+    """
+    if body is None:
+        return None
+    return hashlib.blake2b(body[:DIFF_BODY_LIMIT], digest_size=8).hexdigest()
+
+
+class TargetDiff:
+    """
+    So sánh 1 target với lần scan trước (--diff), dùng trong worker của ScanEngine:
+    - conditional_headers(path): If-None-Match / If-Modified-Since từ ETag /
+      Last-Modified đã lưu => server trả 304 nếu không đổi
+    - not_modified(path, res): 304 cho path đã lưu => dùng lại kết quả cũ, không chạy matcher
+    - classify(path, res, body): gắn res.change = new / changed / unchanged cho kết quả khớp;
+      path lần trước khớp mà giờ không khớp nữa => removed
+    Path lỗi mạng không được tính (không coi là removed). An toàn khi gọi từ nhiều thread.
+    """
+
+    def __init__(self, target: str, previous: Dict[str, Tuple[ScanResult, Optional[str]]]):
+        self.target = target
+        self.previous = previous      # path -> (kết quả lần trước, hash body)
+        self.counts: Counter = Counter()
+        self.removed: List[Tuple[str, ScanResult]] = []
+        self.was: Dict[str, ScanResult] = {}  # URL changed -> kết quả lần trước
+        self.not_modified_count = 0
+        self._seen: Dict[str, Tuple[ScanResult, Optional[str]]] = {}  # path -> kết quả cần lưu
+        self._lock = threading.Lock()
+
+    def conditional_headers(self, path: str) -> Optional[Dict[str, str]]:
+        entry = self.previous.get(path)
+        if entry is None:
+            return None
+        old = entry[0]
+        headers = {}
+        etag = old.header("ETag")
+        if etag:
+            headers["If-None-Match"] = etag
+        modified = old.header("Last-Modified")
+        if modified:
+            headers["If-Modified-Since"] = modified
+        return headers or None
+
+    def not_modified(self, path: str, res: ScanResult) -> Optional[ScanResult]:
+        """
+        304 cho path đã lưu => bản sao kết quả cũ (độ trễ mới), đã matched và unchanged.
+        """
+        if res.status_code != 304:
+            return None
+        entry = self.previous.get(path)
+        if entry is None:
+            return None
+        old, digest = entry
+        same = ScanResult(
+            old.url,
+            old.status_code,
+            old.length,
+            res.elapsed_ms,
+            location=old.location,
+            headers=old.headers,
+            words=old.words,
+            lines=old.lines,
+            change=UNCHANGED,
+        )
+        same.matched = True
+        with self._lock:
+            self.counts[UNCHANGED] += 1
+            self.not_modified_count += 1
+            self._seen[path] = (same, digest)
+        return same
+
+    def classify(self, path: str, res: ScanResult, body: Optional[bytes]):
+        entry = self.previous.get(path)
+        if not res.matched:
+            if entry is not None:
+                with self._lock:
+                    self.counts[REMOVED] += 1
+                    self.removed.append((path, entry[0]))
+            return
+
+        digest = body_hash(body)
+        if entry is None:
+            change = NEW
+        else:
+            old, old_digest = entry
+            if (
+                old.status_code != res.status_code
+                or old.length != res.length
+                or old.location != res.location
+                or (digest and old_digest and digest != old_digest)
+            ):
+                change = CHANGED
+            else:
+                change = UNCHANGED
+        res.change = change
+        with self._lock:
+            self.counts[change] += 1
+            self._seen[path] = (res, digest)
+            if change == CHANGED:
+                self.was[res.url] = entry[0]
+
+    def summary(self) -> str:
+        counts = self.counts
+        return (
+            f"{counts[NEW]} new, {counts[CHANGED]} changed, {counts[REMOVED]} removed, "
+            f"{counts[UNCHANGED]} unchanged ({self.not_modified_count} not modified)"
+        )
+
+
+class ResponseStore:
+    """
+    Metadata response các lần scan trước trong 1 file SQLite, khoá (target, path):
+    status, size, số từ/dòng, Location, ETag/Last-Modified, hash body, thời điểm thấy
+    lần đầu/lần cuối. Chỉ lưu path khớp filter (path "tìm thấy").
+    Chỉ dùng từ main thread: nạp trước khi scan (load), ghi 1 transaction khi xong (save).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = _connect(path, _SCHEMA)
+
+    def load(self, target: str) -> TargetDiff:
+        previous = {}
+        rows = self._db.execute(
+            "SELECT path, url, status, length, words, lines, location, etag, last_modified, body_hash "
+            "FROM responses WHERE target = ?",
+            (target,),
+        )
+        for path, url, status, length, words, lines, location, etag, modified, digest in rows:
+            headers = ()
+            if etag:
+                headers += ("ETag", etag)
+            if modified:
+                headers += ("Last-Modified", modified)
+            old = ScanResult(
+                url, status, length, 0.0, location=location, headers=headers, words=words, lines=lines
+            )
+            previous[path] = (old, digest)
+        return TargetDiff(target, previous)
+
+    def save(self, diff: TargetDiff):
+        """
+        Ghi kết quả của lượt scan: cập nhật path còn khớp, xoá path removed.
+        """
+        now = time.time()
+        rows = [
+            (
+                diff.target,
+                path,
+                res.url,
+                res.status_code,
+                res.length,
+                res.words,
+                res.lines,
+                res.location,
+                res.header("ETag"),
+                res.header("Last-Modified"),
+                digest,
+                now,
+                now,
+            )
+            for path, (res, digest) in diff._seen.items()
+        ]
+        with self._db:
+            self._db.executemany(_UPSERT, rows)
+            self._db.executemany(
+                "DELETE FROM responses WHERE target = ? AND path = ?",
+                [(diff.target, path) for path, _ in diff.removed],
+            )
+
+    def close(self):
+        self._db.close()
+
+
+class HitHistory:
+    """
+    Thống kê path tìm thấy qua các lần scan trước, mọi target (cho --order smart),
+    cùng file SQLite với ResponseStore:
+    - hits: số lần scan (target) tìm thấy path, last_hit: lần gần nhất
+    - meta "scans": số lần scan (target) đã được ghi nhận
+    Xác suất trúng của path ~ hits / scans, nên xếp theo hits giảm dần
+    (bằng nhau thì path trúng gần đây hơn trước).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = _connect(path, _HITS_SCHEMA)
+
+    @property
+    def scans(self) -> int:
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'scans'").fetchone()
+        return row[0] if row else 0
+
+    def ranking(self, limit: int = HISTORY_RANK_LIMIT) -> List[str]:
+        """
+        Tối đa `limit` path có xác suất trúng cao nhất, giảm dần.
+        """
+        rows = self._db.execute(
+            "SELECT path FROM hits ORDER BY hits DESC, last_hit DESC LIMIT ?", (limit,)
+        )
+        return [path for (path,) in rows]
+
+    def record(self, paths: Iterable[str]):
+        """
+        Ghi nhận 1 lần scan 1 target tìm thấy `paths` (path trùng chỉ tính 1 lần).
+        """
+        now = time.time()
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO hits (path, hits, last_hit) VALUES (?, 1, ?) "
+                "ON CONFLICT (path) DO UPDATE SET hits = hits + 1, last_hit = excluded.last_hit",
+                [(path, now) for path in set(paths)],
+            )
+            self._db.execute(
+                "INSERT INTO meta (key, value) VALUES ('scans', 1) "
+                "ON CONFLICT (key) DO UPDATE SET value = value + 1"
+            )
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,230 @@
+# targets.py
+
+from collections import Counter, deque
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from config import DISCOVERED_BASE
+from calibration import Calibration
+from checkpoint import Checkpoint
+from frontier import Frontier
+from result import ScanResult
+
+if TYPE_CHECKING:
+    # chỉ dùng cho type hint: sqlite3 (store) chỉ nạp khi bật --diff, analysis khi --analyze
+    from store import TargetDiff
+    from analysis import LinkFeed
+
+
+def normalize_target(line: str) -> Optional[str]:
+    """
+    Chuẩn hoá 1 target: bỏ khoảng trắng/comment, thêm "http://" nếu thiếu scheme.
+    Trả về None nếu dòng bị bỏ.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if "://" not in line:
+        line = "http://" + line
+    return line
+
+
+def parse_targets(text: str) -> List[str]:
+    """
+    Tách danh sách target (cách nhau bởi xuống dòng, khoảng trắng hoặc dấu phẩy),
+    bỏ trùng nhưng giữ thứ tự.
+    """
+    targets = []
+    seen = set()
+    for line in text.splitlines():
+        if line.strip().startswith("#"):
+            continue
+        for item in line.replace(",", " ").split():
+            target = normalize_target(item)
+            if target and target not in seen:
+                seen.add(target)
+                targets.append(target)
+    return targets
+
+
+def load_targets(path: str) -> List[str]:
+    """
+    Đọc file danh sách target (-l), mỗi dòng 1 URL.
+    """
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return parse_targets(f.read())
+
+
+def host_key(url: str) -> str:
+    """
+    Khoá giới hạn kết nối theo host: "host:port" (chữ thường).
+    """
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return f"{(parts.hostname or '').lower()}:{port}"
+
+
+class ScanTarget:
+    """
+    1 target trong lượt scan: base URL, nguồn path (iterable hoặc Frontier)
+    và trạng thái riêng (checkpoint, calibration, kết quả, lỗi).
+    `diff` (TargetDiff): so với lần scan trước (--diff), None nếu không bật.
+    `feed` (LinkFeed): path tìm được từ link trong body (--analyze), được scan
+    trước path của wordlist; None nếu không bật.
+    `shard` = (i, n): chỉ scan các path có index % n == i (--shard, --workers);
+    index vẫn là vị trí trong toàn bộ luồng path nên kết quả các shard gộp lại
+    theo đúng thứ tự wordlist.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        paths: Iterable[str],
+        checkpoint: Optional[Checkpoint] = None,
+        calibration: Optional[Calibration] = None,
+        shard: Optional[Tuple[int, int]] = None,
+        diff: Optional["TargetDiff"] = None,
+        feed: Optional["LinkFeed"] = None,
+    ):
+        self.url = url
+        self.base = url.rstrip("/") + "/"
+        self.host = host_key(url)
+        self.frontier = paths if isinstance(paths, Frontier) else None
+        self.checkpoint = checkpoint
+        self.calibration = calibration
+        self.shard = shard
+        self.diff = diff
+        self.feed = feed
+
+        self.found: List[Tuple[int, ScanResult]] = []
+        self.failed: List[Tuple[int, Dict]] = []
+        self.done = 0
+        self.pending = 0  # job đang chạy của target này
+        self.analyzing = 0  # kết quả đang chờ/đang phân tích (có thể sinh thêm path)
+        self.calibrated = calibration is None or calibration.ready
+        self.calibrating = False
+
+        if checkpoint:
+            self.found.extend(checkpoint.matches)
+            self.done = checkpoint.done_count
+            if self.frontier is not None:
+                # giữ nguyên dir_id của các thư mục đã tìm thấy => index job không đổi
+                self.frontier.restore(checkpoint.directories)
+                checkpoint.directories = self.frontier.directories
+
+        self._jobs = self.frontier if self.frontier is not None else iter(enumerate(paths))
+
+    @property
+    def results(self) -> List[ScanResult]:
+        """
+        Kết quả khớp filter theo đúng thứ tự wordlist.
+        """
+        return [res for _, res in sorted(self.found, key=lambda item: item[0])]
+
+    @property
+    def failures(self) -> List[Dict]:
+        return [item for _, item in sorted(self.failed, key=lambda item: item[0])]
+
+    def found_paths(self) -> List[str]:
+        """
+        Path dạng wordlist ("/admin") của các kết quả khớp, khi scan đệ quy thì
+        bỏ tiền tố thư mục con (thống kê trúng cho --order smart).
+        """
+        frontier = self.frontier
+        paths = []
+        for idx, res in self.found:
+            if not res.url.startswith(self.base):
+                continue
+            path = res.url[len(self.base):]
+            if frontier is not None and frontier.stride <= idx < DISCOVERED_BASE:
+                prefix = frontier.directories[idx // frontier.stride - 1].lstrip("/")
+                if path.startswith(prefix):
+                    path = path[len(prefix):]
+            paths.append("/" + path)
+        return paths
+
+    def next_job(self) -> Optional[Tuple[int, str]]:
+        """
+        Path kế tiếp chưa test (bỏ qua index đã xong trong checkpoint).
+        None nghĩa là *hiện tại* hết path (Frontier / LinkFeed có thể có thêm sau).
+        """
+        if self.feed is not None:
+            job = self.feed.take()
+            if job is not None:
+                return job
+        shard = self.shard
+        for idx, path in self._jobs:
+            if shard and idx % shard[1] != shard[0]:
+                continue
+            if self.checkpoint and self.checkpoint.is_done(idx):
+                continue
+            return idx, path
+        return None
+
+
+class TargetScheduler:
+    """
+    Chia job (target x path) cho một pool worker chung:
+    - round-robin giữa các target: mỗi lần lấy job chuyển sang target kế tiếp
+    - mỗi host chỉ có tối đa `per_host` request đang chạy (None = không giới hạn),
+      host chậm bị bỏ qua tới lượt sau nên không giữ chân worker
+    - target bật calibration phát ra 1 job dò (path None) trước các path thường
+
+    Không tự khoá: ScanEngine gọi dưới lock của nó.
+    """
+
+    def __init__(self, targets: List[ScanTarget], per_host: Optional[int] = None):
+        self.per_host = per_host
+        self.inflight = 0
+        self.analyzing = 0  # kết quả đang phân tích (--analyze), có thể sinh thêm job
+        self._active = deque(targets)
+        self._host_inflight: Counter = Counter()
+
+    def take(self) -> Optional[Tuple[ScanTarget, int, Optional[str]]]:
+        """
+        Job kế tiếp (target, idx, path), hoặc None nếu hiện tại chưa có job chạy được.
+        """
+        active = self._active
+        for _ in range(len(active)):
+            target = active[0]
+            active.rotate(-1)
+            if self.per_host and self._host_inflight[target.host] >= self.per_host:
+                continue
+
+            if not target.calibrated:
+                if target.calibrating:
+                    continue  # chờ job dò xong mới phát path thường
+                target.calibrating = True
+                self._acquire(target)
+                return target, -1, None
+
+            job = target.next_job()
+            if job is None:
+                # còn job đang chạy (Frontier: thư mục con) hoặc đang phân tích (LinkFeed: link)
+                # thì có thể có thêm path, chưa bỏ target
+                growing = (target.frontier is not None and target.pending) or (
+                    target.feed is not None and (target.pending or target.analyzing)
+                )
+                if not growing:
+                    active.remove(target)
+                continue
+            self._acquire(target)
+            return target, job[0], job[1]
+        return None
+
+    @property
+    def busy(self) -> bool:
+        """
+        Còn request đang chạy hoặc kết quả đang phân tích (có thể sinh thêm job).
+        """
+        return self.inflight > 0 or self.analyzing > 0
+
+    def release(self, target: ScanTarget):
+        self.inflight -= 1
+        target.pending -= 1
+        self._host_inflight[target.host] -= 1
+
+    def _acquire(self, target: ScanTarget):
+        self.inflight += 1
+        target.pending += 1
+        self._host_inflight[target.host] += 1
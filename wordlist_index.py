@@ -0,0 +1,214 @@
+# wordlist_index.py
+
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from typing import Iterator, List, Sequence, Union
+
+from dictionary import iter_wordlist
+
+# File index nằm cạnh wordlist: common.txt -> common.txt.kwi
+INDEX_SUFFIX = ".kwi"
+INDEX_MAGIC = b"KSWLIDX2"
+
+# magic, size nguồn, mtime_ns nguồn, số path, vị trí bảng offset, vị trí + số ô bảng băm
+# (dùng byte order của máy, giống array('Q') / memoryview.cast("Q"))
+_HEADER = struct.Struct("=8sQQQQQQ")
+
+
+def _hash_slots(count: int) -> int:
+    # lũy thừa của 2, tải tối đa 1/2
+    size = 1024
+    while size < count * 2:
+        size <<= 1
+    return size
+
+
+def index_path_for(source: str) -> str:
+    return source + INDEX_SUFFIX
+
+
+def compile_wordlist(source: str, index_path: str = None) -> str:
+    """
+    Biên dịch wordlist thành file index nhị phân:
+      [header][path UTF-8 nối liền nhau][bảng (n+1) offset uint64][bảng băm uint32]
+    Path đã được chuẩn hoá (bỏ dòng trống/comment, thêm "/").
+    Bảng băm (địa chỉ mở, khoá crc32 của path, ô = index + 1) cho phép tra
+    path có trong wordlist không mà không phải duyệt cả file.
+    Ghi ra file tạm rồi os.replace để không bao giờ để lại index dở dang.
+    """
+    index_path = index_path or index_path_for(source)
+    st = os.stat(source)
+
+    offsets = array("Q", [0])
+    hashes = array("I")
+    crc32 = zlib.crc32
+    tmp = index_path + ".tmp"
+    with open(tmp, "wb") as out:
+        out.write(b"\0" * _HEADER.size)
+        pos = 0
+        for path in iter_wordlist(source):
+            data = path.encode("utf-8")
+            out.write(data)
+            pos += len(data)
+            offsets.append(pos)
+            hashes.append(crc32(data))
+
+        count = len(offsets) - 1
+        table_pos = _HEADER.size + pos
+        offsets.tofile(out)
+
+        size = _hash_slots(count)
+        mask = size - 1
+        slots = array("I", bytes(4 * size))
+        for i, key in enumerate(hashes):
+            j = key & mask
+            while slots[j]:
+                j = (j + 1) & mask
+            slots[j] = i + 1
+        del hashes
+        hash_pos = table_pos + 8 * (count + 1)
+        slots.tofile(out)
+
+        out.seek(0)
+        out.write(
+            _HEADER.pack(
+                INDEX_MAGIC, st.st_size, st.st_mtime_ns, count, table_pos, hash_pos, size
+            )
+        )
+    os.replace(tmp, index_path)
+    return index_path
+
+
+class CompiledWordlist(Sequence):
+    """
+    Wordlist đã biên dịch, đọc qua mmap: mở gần như tức thì, không copy dữ liệu,
+    hỗ trợ len() và truy cập ngẫu nhiên theo index (dùng cho resume / chia shard),
+    `find(path)` / `path in words` tra bảng băm (dùng cho --analyze).
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self._file = open(index_path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # file rỗng
+            self._file.close()
+            raise ValueError(f"Invalid wordlist index: {index_path}")
+
+        try:
+            magic, self.source_size, self.source_mtime_ns, self._count, table_pos, hash_pos, size = (
+                _HEADER.unpack_from(self._mm, 0)
+            )
+        except struct.error:
+            magic = None
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"Invalid wordlist index: {index_path}")
+
+        self._offsets = memoryview(self._mm)[
+            table_pos:table_pos + 8 * (self._count + 1)
+        ].cast("Q")
+        self._slots = memoryview(self._mm)[hash_pos:hash_pos + 4 * size].cast("I")
+        self._mask = size - 1
+
+    def is_fresh(self, source: str) -> bool:
+        """
+        Index còn khớp với file nguồn (size + mtime) không.
+        """
+        try:
+            st = os.stat(source)
+        except OSError:
+            return False
+        return st.st_size == self.source_size and st.st_mtime_ns == self.source_mtime_ns
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("wordlist index out of range")
+        start = _HEADER.size
+        return self._mm[start + self._offsets[i]:start + self._offsets[i + 1]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return self.iter_from(0)
+
+    def find(self, path: str) -> int:
+        """
+        Index của `path` trong wordlist, -1 nếu không có.
+        """
+        data = path.encode("utf-8")
+        mm, offsets, slots, mask, base = self._mm, self._offsets, self._slots, self._mask, _HEADER.size
+        j = zlib.crc32(data) & mask
+        while True:
+            slot = slots[j]
+            if not slot:
+                return -1
+            i = slot - 1
+            if mm[base + offsets[i]:base + offsets[i + 1]] == data:
+                return i
+            j = (j + 1) & mask
+
+    def __contains__(self, path) -> bool:
+        return isinstance(path, str) and self.find(path) >= 0
+
+    def iter_from(self, first: int, step: int = 1) -> Iterator[str]:
+        """
+        Duyệt path từ index `first`, bước `step` (vd shard i/N: iter_from(i, N)).
+        """
+        mm, offsets, base = self._mm, self._offsets, _HEADER.size
+        for i in range(first, self._count, step):
+            yield mm[base + offsets[i]:base + offsets[i + 1]].decode("utf-8")
+
+    def close(self):
+        for name in ("_offsets", "_slots"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+                setattr(self, name, None)
+        self._mm.close()
+        self._file.close()
+
+
+def load_compiled(source: str, build: bool = True) -> CompiledWordlist:
+    """
+    Mở index của `source`; (biên dịch lại) nếu chưa có hoặc đã cũ.
+    Ném OSError nếu không ghi được index, ValueError nếu index hỏng.
+    """
+    index_path = index_path_for(source)
+    os.stat(source)  # FileNotFoundError nếu wordlist không tồn tại
+
+    if os.path.exists(index_path):
+        try:
+            compiled = CompiledWordlist(index_path)
+        except (OSError, ValueError, struct.error):
+            compiled = None
+        if compiled is not None:
+            if compiled.is_fresh(source):
+                return compiled
+            compiled.close()
+
+    if not build:
+        raise ValueError(f"No fresh index for {source}")
+    compile_wordlist(source, index_path)
+    return CompiledWordlist(index_path)
+
+
+def open_wordlist(source: str) -> Sequence[str]:
+    """
+    Loader mặc định: dùng index đã biên dịch (tự tạo/cập nhật khi cần);
+    nếu không ghi được index (thư mục chỉ đọc...) thì đọc file vào list như cũ.
+    """
+    try:
+        return load_compiled(source)
+    except FileNotFoundError:
+        raise
+    except (OSError, ValueError, struct.error):
+        return list(iter_wordlist(source))
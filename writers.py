@@ -0,0 +1,300 @@
+# writers.py
+
+import csv
+import datetime
+import html
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from config import WRITER_BUFFER_SIZE, WRITER_FLUSH_INTERVAL, OUTPUT_FORMATS
+from result import ScanResult
+
+# Trường ghi cho mỗi kết quả (theo thứ tự cột CSV)
+RECORD_FIELDS = (
+    "status_code",
+    "length",
+    "words",
+    "lines",
+    "elapsed_ms",
+    "url",
+    "location",
+    "content_type",
+    "headers",
+    "change",
+    "analysis",
+)
+
+
+def result_record(res: ScanResult) -> Dict:
+    """
+    Kết quả scan -> bản ghi để ghi file (thêm content_type, làm tròn elapsed_ms;
+    `change` chỉ có khi --diff, `analysis` chỉ có khi --analyze).
+    """
+    record = {
+        "status_code": res.status_code,
+        "length": res.length,
+        "words": res.words,
+        "lines": res.lines,
+        "elapsed_ms": round(res.elapsed_ms, 1),
+        "url": res.url,
+        "location": res.location,
+        "content_type": res.header("Content-Type"),
+        "headers": dict(res.header_items()),
+    }
+    if res.change is not None:
+        record["change"] = res.change
+    if res.analysis is not None:
+        record["analysis"] = res.analysis
+    return record
+
+
+class ResultWriter:
+    """
+    Ghi kết quả ra file ngay khi có (không đợi hết scan), qua buffer
+    WRITER_BUFFER_SIZE byte, flush xuống đĩa tối đa mỗi WRITER_FLUSH_INTERVAL giây.
+    Scan bị crash thì chỉ mất phần chưa flush.
+
+    Lớp con cài đặt `_begin`, `_write` và `_end` (phần mở đầu / 1 bản ghi / kết thúc file).
+    An toàn khi gọi từ nhiều thread.
+    """
+
+    fmt = ""
+    newline = None
+
+    def __init__(self, path: str, targets: Optional[List[str]] = None):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self.targets = targets or []
+        self.count = 0
+        self.status_counter: Counter = Counter()
+        self.started = datetime.datetime.now().isoformat(timespec="seconds")
+        self._file = open(
+            path, "w", encoding="utf-8", buffering=WRITER_BUFFER_SIZE, newline=self.newline
+        )
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._dirty = False
+        self._begin()
+
+    def write(self, res: ScanResult):
+        record = result_record(res)
+        with self._lock:
+            self._write(record)
+            self.count += 1
+            self.status_counter[record["status_code"]] += 1
+            self._dirty = True
+            self._maybe_flush()
+
+    def maybe_flush(self):
+        """
+        Flush nếu đã quá WRITER_FLUSH_INTERVAL giây (gọi định kỳ khi không có kết quả mới).
+        """
+        with self._lock:
+            self._maybe_flush()
+
+    def close(self, stats: Optional[Dict] = None):
+        """
+        Ghi phần kết thúc (tổng kết, `stats` nếu có) rồi đóng file.
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            self._end(stats)
+            self._file.close()
+
+    def _maybe_flush(self):
+        now = time.monotonic()
+        if self._dirty and now - self._last_flush >= WRITER_FLUSH_INTERVAL:
+            self._file.flush()
+            self._dirty = False
+            self._last_flush = now
+
+    def _summary(self, stats: Optional[Dict]) -> Dict:
+        summary = {
+            "targets": self.targets,
+            "started": self.started,
+            "finished": datetime.datetime.now().isoformat(timespec="seconds"),
+            "count": self.count,
+            "status_counts": {str(code): n for code, n in sorted(self.status_counter.items())},
+        }
+        if stats is not None:
+            summary["stats"] = stats
+        return summary
+
+    def _begin(self):
+        pass
+
+    def _write(self, record: Dict):
+        raise NotImplementedError
+
+    def _end(self, stats: Optional[Dict]):
+        pass
+
+
+class JsonlWriter(ResultWriter):
+    """
+    1 dòng JSON cho mỗi kết quả; file luôn đọc được kể cả khi scan bị ngắt.
+    """
+
+    fmt = "jsonl"
+
+    def _write(self, record: Dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class CsvWriter(ResultWriter):
+    """
+    CSV có dòng tiêu đề; cột headers (và analysis khi --analyze) là JSON.
+    """
+
+    fmt = "csv"
+    newline = ""  # csv module tự ghi "\r\n"
+
+    def _begin(self):
+        self._csv = csv.writer(self._file)
+        self._csv.writerow(RECORD_FIELDS)
+
+    def _write(self, record: Dict):
+        record = dict(record, headers=json.dumps(record["headers"], ensure_ascii=False))
+        if "analysis" in record:
+            record["analysis"] = json.dumps(record["analysis"], ensure_ascii=False)
+        self._csv.writerow(["" if record.get(f) is None else record[f] for f in RECORD_FIELDS])
+
+
+class JsonWriter(ResultWriter):
+    """
+    1 object JSON: {"results": [...], "targets", "count", "status_counts", "stats"}.
+    Mảng results được ghi dần; phần tổng kết ghi lúc đóng file.
+    """
+
+    fmt = "json"
+
+    def _begin(self):
+        self._file.write('{"results": [')
+
+    def _write(self, record: Dict):
+        if self.count:
+            self._file.write(",")
+        self._file.write("\n  " + json.dumps(record, ensure_ascii=False))
+
+    def _end(self, stats: Optional[Dict]):
+        summary = json.dumps(self._summary(stats), ensure_ascii=False, indent=2)
+        # nối các trường tổng kết vào sau mảng results: bỏ "{" đầu của summary
+        self._file.write("\n],\n" + summary[1:].lstrip("\n") + "\n")
+
+
+_HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Kingsearch report</title>
+<style>
+body { font-family: sans-serif; margin: 20px; }
+table { border-collapse: collapse; width: 100%; font-size: 13px; }
+th, td { border: 1px solid #ccc; padding: 3px 6px; text-align: left; vertical-align: top; }
+th { background: #eee; }
+td.num { text-align: right; }
+tr.s2 td.code { color: #080; } tr.s3 td.code { color: #06c; }
+tr.s4 td.code { color: #c60; } tr.s5 td.code { color: #c00; }
+pre { margin: 0; white-space: pre-wrap; }
+#filter { margin-bottom: 8px; width: 300px; }
+</style>
+</head>
+<body>
+<h2>Kingsearch report</h2>
+<p>Targets: {targets}<br>Started: {started}</p>
+<input id="filter" placeholder="Filter (status / URL)..." oninput="filterRows(this.value)">
+<table>
+<thead><tr><th>Status</th><th>Length</th><th>Words</th><th>Lines</th><th>Time (ms)</th><th>URL</th><th>Location</th><th>Headers</th></tr></thead>
+<tbody>
+"""
+
+_HTML_FOOT = """</tbody>
+</table>
+<p>{summary}</p>
+<script>
+function filterRows(q) {
+  q = q.toLowerCase();
+  for (const tr of document.querySelectorAll("tbody tr"))
+    tr.style.display = tr.textContent.toLowerCase().includes(q) ? "" : "none";
+}
+</script>
+</body>
+</html>
+"""
+
+
+class HtmlWriter(ResultWriter):
+    """
+    Report HTML tự chứa (CSS/JS nội tuyến, không cần file ngoài); các dòng
+    bảng được ghi dần, phần tổng kết ghi lúc đóng file.
+    """
+
+    fmt = "html"
+
+    def _begin(self):
+        self._file.write(
+            _HTML_HEAD.replace(
+                "{targets}", html.escape(", ".join(self.targets))
+            ).replace("{started}", self.started)
+        )
+
+    def _write(self, record: Dict):
+        def cell(value, cls=""):
+            text = "" if value is None else html.escape(str(value))
+            return f'<td class="{cls}">{text}</td>' if cls else f"<td>{text}</td>"
+
+        url = html.escape(record["url"])
+        headers = html.escape(
+            "\n".join(f"{k}: {v}" for k, v in record["headers"].items())
+        )
+        self._file.write(
+            f'<tr class="s{record["status_code"] // 100}">'
+            + cell(record["status_code"], "code")
+            + cell(record["length"], "num")
+            + cell(record["words"], "num")
+            + cell(record["lines"], "num")
+            + cell(record["elapsed_ms"], "num")
+            + f'<td><a href="{url}">{url}</a></td>'
+            + cell(record["location"])
+            + f"<td><details><summary>{len(record['headers'])}</summary><pre>{headers}</pre></details></td>"
+            + "</tr>\n"
+        )
+
+    def _end(self, stats: Optional[Dict]):
+        summary = self._summary(stats)
+        text = f"Results: {summary['count']} | Finished: {summary['finished']} | Status: " + ", ".join(
+            f"{code}={n}" for code, n in summary["status_counts"].items()
+        )
+        if stats is not None:
+            lat = stats["latency_ms"]
+            text += (
+                f" | {stats['requests']} requests, {stats['avg_req_per_s']} req/s, "
+                f"p50/p95/p99 {lat['p50']}/{lat['p95']}/{lat['p99']} ms, "
+                f"error rate {stats['error_rate'] * 100:.2f}%"
+            )
+        self._file.write(_HTML_FOOT.replace("{summary}", html.escape(text)))
+
+
+WRITERS = {
+    cls.fmt: cls for cls in (JsonlWriter, CsvWriter, JsonWriter, HtmlWriter)
+}
+
+_EXTENSIONS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".json": "json", ".html": "html", ".htm": "html"}
+
+
+def open_writer(path: str, fmt: Optional[str] = None, targets: Optional[List[str]] = None) -> ResultWriter:
+    """
+    Mở writer theo `fmt` (-of); không có thì đoán theo đuôi file, mặc định JSONL.
+    """
+    if not fmt:
+        fmt = _EXTENSIONS.get(os.path.splitext(path)[1].lower(), "jsonl")
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown output format {fmt!r} (choose from {', '.join(OUTPUT_FORMATS)})")
+    return WRITERS[fmt](path, targets)